@@ -43,6 +43,8 @@ class ModuleDocFragment(object):
     notes:
     - The role C(ravendb.ravendb.ravendb_python_client_prerequisites) must be applied before using this module.
     - Requires the ASP.NET Core Runtime to be installed on the target system.
+    - Connections to the same server are reused within a task (e.g. across the items a bulk module reconciles);
+      every task runs in a new process, so they are not shared between tasks.
 
     requirements:
     - python >= 3.9
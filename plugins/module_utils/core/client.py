@@ -7,12 +7,24 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+import atexit
+import threading
+import time
+
 from .deps import require_ravendb
+from .tls import TLSConfig
+from .transport import DEFAULT_RETRIES, get_transport
+
+
+DEFAULT_STORE_TTL_SECONDS = 300
 
 
 class StoreContext(object):
-    def __init__(self, store):
+    def __init__(self, store, pool=None):
         self.store = store
+        self.pool = pool
+        # request-scoped read caches owned by the services (e.g. index snapshots)
+        self.cache = {}
 
     def maintenance_server(self):
         return self.store.maintenance.server
@@ -20,16 +32,123 @@ class StoreContext(object):
     def maintenance_for_db(self, db_name):
         return self.store.maintenance.for_database(db_name)
 
+    def base_url(self):
+        return self.store.urls[0].rstrip("/")
+
+    def tls(self):
+        return TLSConfig(
+            getattr(self.store, "certificate_pem_path", None),
+            getattr(self.store, "trust_store_path", None),
+        )
+
+    def http(self, tls=None, retries=DEFAULT_RETRIES):
+        """Shared pooled transport for raw REST calls against this store's nodes."""
+        return get_transport(tls or self.tls(), retries=retries)
+
     def close(self):
+        if self.pool is not None:
+            self.pool.release(self.store)
+            return
         try:
             self.store.close()
         except Exception:
             raise
 
 
+class StorePool(object):
+    """
+    Keeps initialized DocumentStores keyed by (url, database, certificate, ca)
+    so that repeated contexts within one process skip TLS handshakes, topology
+    fetches and request executor warmup. Idle stores are closed after `ttl` seconds.
+
+    The pool is in-process: every Ansible task runs its module in a fresh
+    interpreter, so stores are shared between the contexts of one task (bulk
+    modules, per-node probes, worker threads), never across tasks.
+    """
+
+    def __init__(self, ttl=DEFAULT_STORE_TTL_SECONDS):
+        self.ttl = float(ttl)
+        self._entries = {}
+        self._building = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url, database=None, certificate_path=None, ca_cert_path=None):
+        return ((url or "").rstrip("/"), database, certificate_path, ca_cert_path)
+
+    def _checkout(self, key):
+        # caller holds self._lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        entry["refs"] += 1
+        entry["last_used"] = time.time()
+        return entry["store"]
+
+    def acquire(self, key, factory):
+        self.evict_idle()
+        with self._lock:
+            store = self._checkout(key)
+            if store is not None:
+                return store
+            key_lock = self._building.setdefault(key, threading.Lock())
+
+        # build outside the pool lock: only callers waiting for this same key block on a slow store
+        with key_lock:
+            with self._lock:
+                store = self._checkout(key)
+                if store is not None:
+                    return store
+            store = factory()
+            with self._lock:
+                self._entries[key] = {"store": store, "refs": 1, "last_used": time.time()}
+                self._building.pop(key, None)
+            return store
+
+    def release(self, store):
+        with self._lock:
+            for entry in self._entries.values():
+                if entry["store"] is store:
+                    entry["refs"] = max(0, entry["refs"] - 1)
+                    entry["last_used"] = time.time()
+                    break
+        self.evict_idle()
+
+    def evict_idle(self, now=None):
+        now = time.time() if now is None else now
+        expired = []
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry["refs"] == 0 and now - entry["last_used"] >= self.ttl:
+                    expired.append(self._entries.pop(key)["store"])
+        for store in expired:
+            _close_quietly(store)
+
+    def close_all(self):
+        with self._lock:
+            stores = [e["store"] for e in self._entries.values()]
+            self._entries.clear()
+        for store in stores:
+            _close_quietly(store)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _close_quietly(store):
+    try:
+        store.close()
+    except Exception:
+        pass
+
+
+_POOL = StorePool()
+atexit.register(_POOL.close_all)
+
+
 class DocumentStoreFactory(object):
     @staticmethod
-    def create(url, database=None, certificate_path=None, ca_cert_path=None):
+    def _build(url, database=None, certificate_path=None, ca_cert_path=None):
         require_ravendb()
         from ravendb import DocumentStore
 
@@ -39,4 +158,26 @@ class DocumentStoreFactory(object):
         if ca_cert_path:
             s.trust_store_path = ca_cert_path
         s.initialize()
-        return StoreContext(store=s)
+        return s
+
+    @staticmethod
+    def create(url, database=None, certificate_path=None, ca_cert_path=None, pooled=True):
+        """
+        Return a StoreContext for the given connection parameters.
+        With pooled=True the underlying store is shared with other contexts
+        created for the same (url, database, certificate, ca) in this process,
+        i.e. within the current task; closing the context hands it back to the
+        pool instead of disposing it.
+        """
+        if not pooled:
+            return StoreContext(store=DocumentStoreFactory._build(url, database, certificate_path, ca_cert_path))
+
+        key = StorePool.key(url, database, certificate_path, ca_cert_path)
+        store = _POOL.acquire(
+            key, lambda: DocumentStoreFactory._build(url, database, certificate_path, ca_cert_path)
+        )
+        return StoreContext(store=store, pool=_POOL)
+
+    @staticmethod
+    def pool():
+        return _POOL
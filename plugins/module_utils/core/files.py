@@ -10,6 +10,8 @@ __metaclass__ = type
 import errno
 import os
 
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core import secret_resolver
+
 
 def write_key_safe(path, key):
     """
@@ -38,10 +40,8 @@ def read_key(path):
 
 
 def read_secret(value_or_path):
-    if value_or_path is None:
-        return None
-
-    if isinstance(value_or_path, str) and os.path.isfile(value_or_path):
-        return read_key(value_or_path)
-
-    return str(value_or_path).strip()
+    """
+    Resolve a secret value: a file path (or ``file:<path>``), ``env:<NAME>``,
+    ``cmd:<command>`` (when allowed) or the literal value. Memoized; see secret_resolver.
+    """
+    return secret_resolver.resolve(value_or_path)
@@ -40,18 +40,48 @@ def db_no_changes(base):
     return "{} No changes.".format(base)
 
 
+def _db_counts(counts):
+    return "Created: {created}. Updated: {updated}. Deleted: {deleted}. Unchanged: {unchanged}.".format(**counts)
+
+
+def dbs_applied(counts):
+    return "Databases reconciled. " + _db_counts(counts)
+
+
+def dbs_would_apply(counts):
+    return "Databases would be reconciled. " + _db_counts(counts)
+
+
+def dbs_no_changes(count):
+    return "All {} declared databases are up to date. No changes.".format(count)
+
+
+def dbs_failed(names, counts):
+    return "Failed to reconcile databases: {}. {}".format(", ".join(names), _db_counts(counts))
+
+
+def db_topology_changed(n, added, removed):
+    return "Database '{}' topology updated. Added: {}. Removed: {}.".format(
+        n, _names_or_dash(added), _names_or_dash(removed))
+
+
+def db_topology_would_change(n, added, removed):
+    return "Database '{}' topology would be updated. Add: {}. Remove: {}.".format(
+        n, _names_or_dash(added), _names_or_dash(removed))
+
+
 def rf_required_on_create():
     return "replication_factor is required when creating a database."
 
 
-def settings_applied(prefix, keys):
+def settings_applied(prefix, keys, reload=True):
     ks = ", ".join(sorted(keys)) if not isinstance(keys, str) else keys
-    return "{} Applied settings ({}) and reloaded.".format(prefix, ks)
+    return "{} Applied settings ({}){}.".format(prefix, ks, " and reloaded" if reload else " without reload")
 
 
-def settings_would_apply(prefix, keys):
+def settings_would_apply(prefix, keys, reload=True):
     ks = ", ".join(sorted(keys)) if not isinstance(keys, str) else keys
-    return "{} Would apply settings ({}) and reload.".format(prefix, ks)
+    return "{} Would apply settings ({}){}.".format(prefix, ks, " and reload" if reload else " without reload")
 
 
 def would_assign_encryption_key(db):
@@ -166,6 +196,74 @@ def idx_not_exist_cannot_apply_mode(name):
     return "Index '{}' does not exist. Cannot apply mode.".format(name)
 
 
+def idx_wait_stalled(name, status):
+    return "Index '{}' is {} and will not become non-stale.".format(name, str(status).lower())
+
+
+def idx_wait_done(name, elapsed):
+    return "Index '{}' is non-stale (waited {}s).".format(name, elapsed)
+
+
+def idx_wait_timeout(name, max_wait):
+    return "Index '{}' is still stale after {}s.".format(name, max_wait)
+
+
+def _names_or_dash(names):
+    return ", ".join(names) if names else "-"
+
+
+def idx_set_applied(created, updated, deleted):
+    return "Indexes reconciled. Created: {}. Updated: {}. Deleted: {}.".format(
+        _names_or_dash(created), _names_or_dash(updated), _names_or_dash(deleted))
+
+
+def idx_set_would_apply(created, updated, deleted):
+    return "Indexes would be reconciled. Create: {}. Update: {}. Delete: {}.".format(
+        _names_or_dash(created), _names_or_dash(updated), _names_or_dash(deleted))
+
+
+def idx_set_no_changes(count):
+    return "All {} declared indexes are up to date. No changes.".format(count)
+
+
+def _db_wide_suffix(database_wide):
+    return " (database-wide)" if database_wide else ""
+
+
+def idx_bulk_applied(mode, names, database_wide=False):
+    return "Indexes {}{}: {}.".format(mode, _db_wide_suffix(database_wide), ", ".join(names))
+
+
+def idx_bulk_would_apply(mode, names, database_wide=False):
+    return "Indexes would be {}{}: {}.".format(mode, _db_wide_suffix(database_wide), ", ".join(names))
+
+
+def idx_bulk_no_changes(mode, count):
+    return "All {} selected indexes are already {}. No changes.".format(count, mode)
+
+
+def idx_bulk_missing(names):
+    return "Index(es) not found: {}.".format(", ".join(names))
+
+
+def idx_info_collected(count):
+    return "Collected statistics for {} indexes.".format(count)
+
+
+def idx_rollout_done(changed_dbs, total, elapsed):
+    return "Index rollout finished in {}s. Changed {} of {} databases: {}.".format(
+        elapsed, len(changed_dbs), total, _names_or_dash(changed_dbs))
+
+
+def idx_rollout_would_apply(changed_dbs, total):
+    return "Index rollout would change {} of {} databases: {}.".format(
+        len(changed_dbs), total, _names_or_dash(changed_dbs))
+
+
+def idx_rollout_halted(db_name, reason):
+    return "Index rollout halted at database '{}': {}".format(db_name, reason)
+
+
 def node_already_present(tag, role, url):
     return "Node '{}' already present as {} at {}.".format(tag, role, url)
 
@@ -198,6 +296,14 @@ def cs_would_create(name, t):
     return "Would create connection string '{}' (type {}).".format(name, t)
 
 
+def cs_updated(name, t, fields):
+    return "Updated connection string '{}' (type {}): {}.".format(name, t, ", ".join(fields))
+
+
+def cs_would_update(name, t, fields):
+    return "Would update connection string '{}' (type {}): {}.".format(name, t, ", ".join(fields))
+
+
 def cs_deleted(name, t):
     return "Deleted connection string '{}' (type {}).".format(name, t)
 
@@ -208,3 +314,23 @@ def cs_would_delete(name, t):
 
 def cs_no_changes():
     return "Connection strings: no changes."
+
+
+def _cs_counts(counts):
+    return "Created: {created}. Updated: {updated}. Deleted: {deleted}. Unchanged: {unchanged}.".format(**counts)
+
+
+def cs_bulk_applied(counts):
+    return "Connection strings reconciled. " + _cs_counts(counts)
+
+
+def cs_bulk_would_apply(counts):
+    return "Connection strings would be reconciled. " + _cs_counts(counts)
+
+
+def cs_bulk_failed(names, counts):
+    return "Failed to reconcile connection strings: {}. {}".format(", ".join(names), _cs_counts(counts))
+
+
+def cs_test_failed(base, failures):
+    return "{} Connection test failed for: {}.".format(base, ", ".join(failures))
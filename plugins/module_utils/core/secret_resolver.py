@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c), RavenDB
+# GNU General Public License v3.0 or later (see COPYING or
+# https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import shlex
+import stat
+import subprocess
+import threading
+
+
+# seconds an external secret command may run
+DEFAULT_COMMAND_TIMEOUT = 30
+
+# reference prefixes resolved without an explicit opt-in; cmd: runs programs and must be allowed
+DEFAULT_ALLOWED = frozenset(["env"])
+
+# property keys (at any depth of a connection string spec) whose values are secret references
+SECRET_KEYS = frozenset([
+    "connection_string", "password", "api_key", "encoded_api_key", "client_secret",
+    "aws_access_key", "aws_secret_key", "aws_session_token", "access_key", "secret_key",
+    "account_key", "sas_token", "google_credentials_json", "certificate_as_base64", "certificates_base64",
+])
+
+
+def _read_file(path):
+    with open(path, "r") as f:
+        return f.read().strip()
+
+
+def _from_env(ref):
+    if ref not in os.environ:
+        raise ValueError("Environment variable '{}' referenced by a secret is not set.".format(ref))
+    return os.environ[ref].strip()
+
+
+def _from_command(ref, timeout=DEFAULT_COMMAND_TIMEOUT):
+    argv = shlex.split(ref)
+    if not argv:
+        raise ValueError("Empty secret command.")
+    try:
+        proc = subprocess.run(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise RuntimeError("Secret command '{}' failed: {}".format(argv[0], e.__class__.__name__))
+    if proc.returncode != 0:
+        # the output may hold the secret or parts of it; report the exit code only
+        raise RuntimeError("Secret command '{}' exited with code {}.".format(argv[0], proc.returncode))
+    return proc.stdout.decode("utf-8").strip()
+
+
+class SecretResolver(object):
+    """
+    Resolves secret references:
+      - ``file:<path>`` or an existing file path: file contents, stripped
+      - ``env:<NAME>``: environment variable
+      - ``cmd:<command line>``: stdout of the command (run without a shell),
+        only once ``allow("cmd")`` was called
+      - anything else: the value itself, stripped
+    A provider prefix that is not allowed fails instead of being sent as a literal.
+    Files are memoized on (path, mtime, size), so a file referenced by many
+    fields is read once and re-read only when it changes. Environment and
+    command results are memoized per reference for the life of the process.
+    Further providers can be added with `register`.
+    """
+
+    def __init__(self, allowed=DEFAULT_ALLOWED):
+        self.providers = {"env": _from_env, "cmd": _from_command}
+        self.allowed = set(allowed)
+        self._files = {}
+        self._refs = {}
+        self._literals = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def allow(self, prefix):
+        """Enable a provider prefix that is off by default (e.g. ``cmd``)."""
+        self.allowed.add(prefix)
+
+    def register(self, prefix, provider):
+        """Route ``<prefix>:<ref>`` values to `provider(ref) -> str` and allow the prefix."""
+        self.providers[prefix] = provider
+        self.allowed.add(prefix)
+        with self._lock:
+            self._refs = dict((k, v) for k, v in self._refs.items() if k[0] != prefix)
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+            self._refs.clear()
+            self._literals.clear()
+
+    def _file(self, path):
+        """Contents of `path` when it is a regular file, else None."""
+        try:
+            st = os.stat(path)
+        except (OSError, ValueError):
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        version = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._files.get(path)
+            if cached is not None and cached[0] == version:
+                self.hits += 1
+                return cached[1]
+        value = _read_file(path)
+        with self._lock:
+            self._files[path] = (version, value)
+            self.misses += 1
+        return value
+
+    def _provided(self, prefix, ref):
+        key = (prefix, ref)
+        with self._lock:
+            if key in self._refs:
+                self.hits += 1
+                return self._refs[key]
+        value = self.providers[prefix](ref)
+        with self._lock:
+            self._refs[key] = value
+            self.misses += 1
+        return value
+
+    def resolve(self, value):
+        if value is None:
+            return None
+        if not isinstance(value, str):
+            return str(value).strip()
+
+        prefix, sep, ref = value.partition(":")
+        if sep and prefix == "file":
+            path = os.path.expanduser(ref)
+            resolved = self._file(path)
+            if resolved is None:
+                raise ValueError("Secret file '{}' does not exist.".format(path))
+            return resolved
+        if sep and prefix in self.providers:
+            if prefix not in self.allowed:
+                raise ValueError("Secret references with the '{}:' prefix are not enabled.".format(prefix))
+            return self._provided(prefix, ref)
+
+        if value in self._literals:
+            return value.strip()
+        resolved = self._file(value)
+        if resolved is not None:
+            return resolved
+        with self._lock:
+            self._literals.add(value)
+        return value.strip()
+
+    def references(self, spec, keys=SECRET_KEYS):
+        """Distinct secret values found under `keys` anywhere in a nested dict/list spec."""
+        found = []
+
+        def _walk(node, secret=False):
+            if isinstance(node, dict):
+                for k, v in node.items():
+                    _walk(v, secret or k in keys)
+            elif isinstance(node, (list, tuple)):
+                for v in node:
+                    _walk(v, secret)
+            elif secret and node is not None and node not in found:
+                found.append(node)
+
+        _walk(spec)
+        return found
+
+    def prefetch(self, *specs, **kwargs):
+        """
+        Resolve every secret reference of the given specs in one pass, so that
+        building them afterwards only hits the memo. Returns the number of
+        distinct references resolved.
+        """
+        keys = kwargs.get("keys", SECRET_KEYS)
+        refs = []
+        for spec in specs:
+            for ref in self.references(spec, keys):
+                if ref not in refs:
+                    refs.append(ref)
+        for ref in refs:
+            self.resolve(ref)
+        return len(refs)
+
+
+_default = SecretResolver()
+
+
+def default_resolver():
+    return _default
+
+
+def resolve(value):
+    return _default.resolve(value)
+
+
+def prefetch(*specs, **kwargs):
+    return _default.prefetch(*specs, **kwargs)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c), RavenDB
+# GNU General Public License v3.0 or later (see COPYING or
+# https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import atexit
+import threading
+
+from .tls import TLSConfig
+
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_POOL_MAXSIZE = 16
+RETRY_STATUS_CODES = (502, 503, 504)
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS"])
+
+
+def _requests():
+    try:
+        import requests
+        return requests
+    except ImportError:
+        raise RuntimeError("Python 'requests' is required for RavenDB REST calls. Install 'requests'.")
+
+
+def _build_retry(retries, backoff_factor):
+    from urllib3.util.retry import Retry
+
+    kwargs = dict(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        raise_on_status=False,
+    )
+    try:
+        return Retry(allowed_methods=IDEMPOTENT_METHODS, **kwargs)
+    except TypeError:
+        # urllib3 < 1.26
+        return Retry(method_whitelist=IDEMPOTENT_METHODS, **kwargs)
+
+
+class HttpTransport(object):
+    """
+    Keep-alive HTTP client for the raw REST endpoints the Python client does not cover.
+    Applies a default timeout to every call and retries idempotent verbs with backoff.
+    """
+
+    def __init__(self, tls=None, validate_certificate=None, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, backoff_factor=DEFAULT_BACKOFF_FACTOR,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE):
+        requests = _requests()
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = timeout
+        self.session = requests.Session()
+
+        cert, verify = (tls or TLSConfig()).to_requests_tuple()
+        if cert:
+            self.session.cert = cert
+        self.session.verify = False if validate_certificate is False else verify
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_maxsize,
+            pool_maxsize=pool_maxsize,
+            max_retries=_build_retry(retries, backoff_factor),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method, url, timeout=None, **kwargs):
+        return self.session.request(method, url, timeout=(self.timeout if timeout is None else timeout), **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        try:
+            self.session.close()
+        except Exception:
+            pass
+
+
+_TRANSPORTS = {}
+_LOCK = threading.Lock()
+
+
+def transport_key(tls=None, validate_certificate=None, retries=DEFAULT_RETRIES):
+    cert, verify = (tls or TLSConfig()).to_requests_tuple()
+    if validate_certificate is False:
+        verify = False
+    return cert, verify, retries
+
+
+def get_transport(tls=None, validate_certificate=None, retries=DEFAULT_RETRIES):
+    """
+    Return the process-wide transport for this TLS configuration.
+    Every caller with the same client certificate and CA shares one connection pool,
+    so a task opens at most one TLS session per node. Callers that drive their own
+    retries (e.g. health checks) ask for ``retries=0`` and get a separate pool.
+    """
+    key = transport_key(tls, validate_certificate, retries)
+    with _LOCK:
+        transport = _TRANSPORTS.get(key)
+        if transport is None:
+            transport = HttpTransport(tls, validate_certificate=validate_certificate, retries=retries)
+            _TRANSPORTS[key] = transport
+        return transport
+
+
+def close_all():
+    with _LOCK:
+        transports = list(_TRANSPORTS.values())
+        _TRANSPORTS.clear()
+    for t in transports:
+        t.close()
+
+
+atexit.register(close_all)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c), RavenDB
+# GNU General Public License v3.0 or later (see COPYING or
+# https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+def parse_version(version_string):
+    """(major, minor, patch) of a RavenDB version string such as '7.1.2' or '6.0.105-nightly'; (0, 0, 0) when unknown."""
+    if not version_string:
+        return (0, 0, 0)
+
+    base = ""
+    for ch in str(version_string):
+        if (ch.isdigit() or ch == "."):
+            base += ch
+        else:
+            break
+    parts = (base or "0").split(".")
+    parts = (parts + ["0", "0"])[:3]
+
+    try:
+        return (int(parts[0]), int(parts[1]), int(parts[2]))
+    except Exception:
+        return (0, 0, 0)
+
+
+def at_least(version_string, minimum):
+    return parse_version(version_string) >= parse_version(minimum)
+
+
+def server_version(http, base_url, timeout=10):
+    """ProductVersion reported by GET /build/version of the node at `base_url`, through transport `http`."""
+    r = http.get(base_url.rstrip("/") + "/build/version", timeout=timeout)
+    r.raise_for_status()
+    try:
+        data = r.json()
+        return str(data.get("ProductVersion") or "").strip()
+    except Exception:
+        return (r.text or "").strip()
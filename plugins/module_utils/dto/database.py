@@ -25,7 +25,8 @@ class EncryptionSpec(object):
 
 
 class DatabaseSpec(object):
-    def __init__(self, url, name, replication_factor=None, settings=None, encryption=None, members=None):
+    def __init__(self, url, name, replication_factor=None, settings=None, encryption=None, members=None,
+                 settings_reload="all", promotion_timeout=900):
         if settings is None:
             settings = {}
         if encryption is None:
@@ -39,3 +40,5 @@ class DatabaseSpec(object):
         self.settings = settings
         self.encryption = encryption
         self.members = members
+        self.settings_reload = settings_reload
+        self.promotion_timeout = promotion_timeout
@@ -13,7 +13,8 @@ class HealthcheckSpec(object):
         self, url, validate_certificate, certificate_path, ca_cert_path,
         checks,
         max_time_to_wait, retry_interval_seconds, db_retry_interval_seconds,
-        on_db_timeout
+        on_db_timeout, urls=None, cluster=False, retry_backoff="fixed",
+        wait_mode="poll", thresholds=None, trace_path=None
     ):
         self.url = url
         self.validate_certificate = bool(validate_certificate)
@@ -24,3 +25,9 @@ class HealthcheckSpec(object):
         self.retry_interval_seconds = int(retry_interval_seconds)
         self.db_retry_interval_seconds = int(db_retry_interval_seconds)
         self.on_db_timeout = on_db_timeout
+        self.urls = list(urls or [])
+        self.cluster = bool(cluster)
+        self.retry_backoff = retry_backoff
+        self.wait_mode = wait_mode
+        self.thresholds = dict(thresholds or {})
+        self.trace_path = trace_path
@@ -7,41 +7,72 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+import time
+
 from ansible_collections.ravendb.ravendb.plugins.module_utils.core.result import ModuleResult
 from ansible_collections.ravendb.ravendb.plugins.module_utils.core import messages as msg
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core import secret_resolver
 from ansible_collections.ravendb.ravendb.plugins.module_utils.services import connection_string_service as cssvc
+from ansible_collections.ravendb.ravendb.plugins.module_utils.services import capability_service as capsvc
+from ansible_collections.ravendb.ravendb.plugins.module_utils.dto.connection_string import ConnectionStringSpec
 
 
 class ConnectionStringReconciler():
-    def __init__(self, ctx):
+    def __init__(self, ctx, capability_ttl=capsvc.DEFAULT_TTL, clock=time.time):
         self.ctx = ctx
+        self.capability_ttl = capability_ttl
+        self.clock = clock
+
+    def _capabilities(self, tls):
+        caps, _ = capsvc.get_capabilities(self.ctx, tls, ttl=self.capability_ttl)
+        return caps
+
+    def _check_supported(self, spec, caps, tls):
+        cssvc.require_min_version_for_type(spec, self.ctx, tls, server_version=caps["version"])
+        if not cssvc.type_supported_on_server(self.ctx, spec.cs_type, tls, buckets=caps["buckets"]):
+            raise RuntimeError("Connection string type '{}' is not supported by this server.".format(spec.cs_type))
 
     def ensure_present(self, spec, tls, check_mode):
+        """
+        Create the connection string, or PUT it again when its stored definition
+        differs from the declared one. An unchanged definition is never re-sent, so
+        ETL tasks that use it are not restarted.
+        """
         name = str(spec.name).strip()
         cs_type = spec.cs_type
         type = (cs_type or "").upper()
 
-        cssvc.require_min_version_for_type(spec, self.ctx, tls)
-        if not cssvc.type_supported_on_server(self.ctx, type, tls):
-            raise RuntimeError("Connection string type '{}' is not supported by this server.".format(cs_type))
-
-        if cssvc.exists(self.ctx, type, name, tls):
-            return ModuleResult.ok(msg=msg.cs_exists(name, cs_type), changed=False)
+        self._check_supported(spec, self._capabilities(tls), tls)
 
         builder = cssvc.builder_for(cs_type)
         obj = builder(name, spec.properties or {})
+        current = cssvc.current_json(self.ctx, type, name, tls)
 
-        if check_mode:
-            return ModuleResult.ok(msg=msg.cs_would_create(name, cs_type), changed=True)
+        if current is None:
+            if check_mode:
+                return ModuleResult.ok(msg=msg.cs_would_create(name, cs_type), changed=True)
+            cssvc.put(self.ctx, obj)
+            return ModuleResult.ok(msg=msg.cs_created(name, cs_type), changed=True)
 
+        changes = cssvc.diff_connection_string(obj, current)
+        if not changes:
+            return ModuleResult.ok(msg=msg.cs_exists(name, cs_type), changed=False)
+
+        fields = [c["path"] for c in changes]
+        if check_mode:
+            return ModuleResult.ok(msg=msg.cs_would_update(name, cs_type, fields), changed=True, changes=changes)
         cssvc.put(self.ctx, obj)
-        return ModuleResult.ok(msg=msg.cs_created(name, cs_type), changed=True)
+        return ModuleResult.ok(msg=msg.cs_updated(name, cs_type, fields), changed=True, changes=changes)
 
     def ensure_absent(self, cs_type, name, tls, check_mode):
         name = str(name).strip()
         type = (cs_type or "").upper()
 
-        if not cssvc.type_supported_on_server(self.ctx, type, tls):
+        try:
+            buckets = self._capabilities(tls)["buckets"]
+        except Exception:
+            buckets = None
+        if not cssvc.type_supported_on_server(self.ctx, type, tls, buckets=buckets):
             return ModuleResult.ok(msg=msg.cs_not_found(name, cs_type), changed=False)
 
         if not cssvc.exists(self.ctx, type, name, tls):
@@ -52,3 +83,119 @@ class ConnectionStringReconciler():
 
         cssvc.remove(self.ctx, cs_type, name)
         return ModuleResult.ok(msg=msg.cs_deleted(name, cs_type), changed=True)
+
+    def _apply_one(self, spec, state, current, tls, check_mode, caps, salt):
+        """Outcome dict of one declared (or pruned) connection string against the `current` listing."""
+        started = self.clock()
+        stored = (current.get(cssvc.cs_kind_info(spec.cs_type)["bucket"]) or {}).get(spec.name)
+        exists = stored is not None
+        changes = []
+        try:
+            if state == "absent":
+                if not exists:
+                    status, text = "unchanged", msg.cs_not_found(spec.name, spec.cs_type)
+                elif check_mode:
+                    status, text = "deleted", msg.cs_would_delete(spec.name, spec.cs_type)
+                else:
+                    cssvc.remove(self.ctx, spec.cs_type, spec.name)
+                    status, text = "deleted", msg.cs_deleted(spec.name, spec.cs_type)
+            else:
+                self._check_supported(spec, caps, tls)
+                obj = cssvc.builder_for(spec.cs_type)(spec.name, spec.properties or {})
+                if exists:
+                    changes = cssvc.diff_connection_string(obj, stored, salt)
+                    fields = [c["path"] for c in changes]
+                    if not changes:
+                        status, text = "unchanged", msg.cs_exists(spec.name, spec.cs_type)
+                    elif check_mode:
+                        status, text = "updated", msg.cs_would_update(spec.name, spec.cs_type, fields)
+                    else:
+                        cssvc.put(self.ctx, obj)
+                        status, text = "updated", msg.cs_updated(spec.name, spec.cs_type, fields)
+                else:
+                    if check_mode:
+                        status, text = "created", msg.cs_would_create(spec.name, spec.cs_type)
+                    else:
+                        cssvc.put(self.ctx, obj)
+                        status, text = "created", msg.cs_created(spec.name, spec.cs_type)
+        except Exception as e:
+            status, text = "failed", str(e)
+
+        return {
+            "name": spec.name,
+            "cs_type": spec.cs_type,
+            "status": status,
+            "changed": status in ("created", "updated", "deleted"),
+            "msg": text,
+            "changes": changes,
+            "duration": round(self.clock() - started, 3),
+        }
+
+    def ensure_set(self, items, tls, check_mode, prune=False):
+        """
+        Reconcile many connection strings of one database against a single read of
+        all buckets: missing or changed ones are PUT, matching ones are left untouched.
+        items: list of (ConnectionStringSpec, state) with state 'present' or 'absent'.
+        With `prune`, names found in the buckets of the declared types but not declared are deleted.
+        Returns ModuleResult with per-item `connection_strings` outcomes and `timings` per type.
+        """
+        started = self.clock()
+        caps = self._capabilities(tls)
+        current = cssvc.get_all_connection_strings_json(self.ctx, tls)
+        read_seconds = round(self.clock() - started, 3)
+
+        work = list(items)
+        if prune:
+            declared = set((spec.cs_type, spec.name) for spec, _ in items)
+            for cs_type in sorted(set(spec.cs_type for spec, _ in items)):
+                for name in sorted(current.get(cssvc.cs_kind_info(cs_type)["bucket"]) or {}):
+                    if (cs_type, name) not in declared:
+                        work.append((ConnectionStringSpec(cs_type, name), "absent"))
+
+        try:
+            # one pass over every secret reference; the builders below then only hit the memo
+            secret_resolver.prefetch(*[spec.properties for spec, state in work if state == "present"])
+        except Exception:
+            # a broken reference fails only the entries that use it, when they are built
+            pass
+
+        salt = cssvc.new_salt()
+        outcomes = [self._apply_one(spec, state, current, tls, check_mode, caps, salt) for spec, state in work]
+
+        timings = {}
+        for o in outcomes:
+            t = timings.setdefault(o["cs_type"], {"count": 0, "changed": 0, "seconds": 0.0})
+            t["count"] += 1
+            t["changed"] += int(o["changed"])
+            t["seconds"] = round(t["seconds"] + o["duration"], 3)
+
+        by_status = dict((s, []) for s in ("created", "updated", "deleted", "unchanged", "failed"))
+        for o in outcomes:
+            by_status[o["status"]].append("{}/{}".format(o["cs_type"], o["name"]))
+
+        changed = any(o["changed"] for o in outcomes)
+        extras = dict(by_status, connection_strings=outcomes, timings=timings,
+                      read_seconds=read_seconds, elapsed=round(self.clock() - started, 2))
+        extras["failed_connection_strings"] = extras.pop("failed")
+        counts = dict((s, len(names)) for s, names in by_status.items())
+        if by_status["failed"]:
+            return ModuleResult(changed=changed, failed=True, msg=msg.cs_bulk_failed(by_status["failed"], counts), extras=extras)
+        if not changed:
+            return ModuleResult.ok(msg=msg.cs_no_changes(), changed=False, **extras)
+        if check_mode:
+            return ModuleResult.ok(msg=msg.cs_bulk_would_apply(counts), changed=True, **extras)
+        return ModuleResult.ok(msg=msg.cs_bulk_applied(counts), changed=True, **extras)
+
+    def test_connections(self, res, specs, tls, max_workers=cssvc.DEFAULT_TEST_WORKERS, timeout=cssvc.DEFAULT_TEST_TIMEOUT):
+        """
+        Attach server-side connectivity results of `specs` to `res` as `connectivity`;
+        an unreachable target fails the result (changes already made are kept and reported).
+        """
+        if res.failed or not specs:
+            return res
+        results = cssvc.test_connections(self.ctx, specs, tls, max_workers=max_workers, timeout=timeout)
+        extras = dict(res.extras, connectivity=results)
+        failures = ["{}/{} ({})".format(r["cs_type"], r["name"], r["target"]) for r in results if r["ok"] is False]
+        if failures:
+            return ModuleResult(changed=res.changed, failed=True, msg=msg.cs_test_failed(res.msg, failures), extras=extras)
+        return ModuleResult(changed=res.changed, msg=res.msg, extras=extras)
@@ -6,6 +6,9 @@
 
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
+
+import time
+
 from ansible_collections.ravendb.ravendb.plugins.module_utils.core.result import ModuleResult
 from ansible_collections.ravendb.ravendb.plugins.module_utils.core import messages as msg
 from ansible_collections.ravendb.ravendb.plugins.module_utils.core import files as file
@@ -15,6 +18,10 @@ from ansible_collections.ravendb.ravendb.plugins.module_utils.services import en
 from ansible_collections.ravendb.ravendb.plugins.module_utils.services.cluster_service import fetch_topology, collect_tags
 
 
+# seconds between topology polls while a new replica catches up
+TOPOLOGY_POLL_INTERVAL = 5
+
+
 class DatabaseReconciler:
     def __init__(self, ctx):
         self.ctx = ctx
@@ -24,10 +31,14 @@ class DatabaseReconciler:
         Ensure the specified database exists.
         Returns: ModuleResult: contains `changed` (bool) and `msg` (str).
         """
-        existing_databases = dbs.list_databases(self.ctx)
-        created = False
+        return self._ensure_present(spec, tls, check_mode, dbs.get_record(self.ctx, spec.name))
 
-        if spec.name not in existing_databases:
+    def _ensure_present(self, spec, tls, check_mode, record, cluster_tags=None):
+        """
+        ensure_present against an already fetched `record` (None when the database is missing).
+        `cluster_tags` lets bulk callers fetch the cluster topology once.
+        """
+        if record is None:
             if spec.replication_factor is None:
                 return ModuleResult.error(msg=msg.rf_required_on_create())
 
@@ -39,10 +50,11 @@ class DatabaseReconciler:
                             len(wanted), spec.replication_factor
                         )
                     )
-                try:
-                    cluster_tags = set(collect_tags(fetch_topology(self.ctx)))
-                except Exception as e:
-                    return ModuleResult.error(msg="Failed to fetch cluster topology: {}".format(str(e)))
+                if cluster_tags is None:
+                    try:
+                        cluster_tags = set(collect_tags(fetch_topology(self.ctx)))
+                    except Exception as e:
+                        return ModuleResult.error(msg="Failed to fetch cluster topology: {}".format(str(e)))
 
                 missing = [t for t in wanted if t not in cluster_tags]
                 if missing:
@@ -65,46 +77,147 @@ class DatabaseReconciler:
             if check_mode:
                 return ModuleResult.ok(msg=msg.db_would_create(spec.name), changed=True)
 
-            dbs.create_database(self.ctx, spec.name, spec.replication_factor, spec.encryption.enabled, members=(spec.members or None), tls=tls)
-            created = True
-            base_msg = msg.db_created(spec.name, encrypted=spec.encryption.enabled)
+            dbs.create_database(self.ctx, spec.name, spec.replication_factor, spec.encryption.enabled, members=(spec.members or None), tls=tls,
+                                settings=(spec.settings or None))
+            return ModuleResult.ok(msg=msg.db_created(spec.name, encrypted=spec.encryption.enabled), changed=True)
 
         else:
-            record = dbs.get_record(self.ctx, spec.name)
             actual_flag = bool(getattr(record, "encrypted", False))
             if spec.encryption.enabled != actual_flag:
                 # toggling between encrypted db and regular db is forbidden
                 return ModuleResult.error(msg=msg.encryption_mismatch(spec.name, actual_flag, spec.encryption.enabled))
             base_msg = msg.db_exists(spec.name)
 
-            if spec.members:
-                return ModuleResult.error(
-                    msg=(
-                        "topology_members is only supported on database creation; "
-                        "modifying an existing database topology is not supported."
-                    )
-                )
+            topo = self._reconcile_topology(spec, record, tls, check_mode, cluster_tags)
+            if topo.failed:
+                return topo
+            if topo.changed:
+                base_msg = topo.msg
+            extras = topo.extras
 
         if spec.settings:
             current = setsvc.get_current(self.ctx, spec.name)
             to_apply = setsvc.diff(spec.settings, current)
             if to_apply:
+                reload_keys, _ = setsvc.classify(to_apply, current)
+                reload = bool(reload_keys) and spec.settings_reload != setsvc.RELOAD_NONE
                 if check_mode:
-                    return ModuleResult.ok(msg=msg.settings_would_apply(base_msg, list(to_apply.keys())), changed=True)
-                setsvc.apply(self.ctx, spec.name, to_apply)
-                return ModuleResult.ok(msg=msg.settings_applied(base_msg, list(to_apply.keys())), changed=True)
+                    return ModuleResult.ok(msg=msg.settings_would_apply(base_msg, list(to_apply.keys()), reload=reload),
+                                           changed=True, **extras)
+                try:
+                    setsvc.apply(self.ctx, spec.name, to_apply, current=current, reload=spec.settings_reload)
+                except setsvc.RollingReloadUnsupported as e:
+                    return ModuleResult.error(msg=str(e))
+                return ModuleResult.ok(msg=msg.settings_applied(base_msg, list(to_apply.keys()), reload=reload),
+                                       changed=True, **extras)
 
-        if created:
-            return ModuleResult.ok(msg=base_msg, changed=True)
+        if topo.changed:
+            return ModuleResult.ok(msg=base_msg, changed=True, **extras)
         return ModuleResult.ok(msg=msg.db_no_changes(base_msg), changed=False)
 
+    def _topology_plan(self, spec, current, cluster_tags):
+        """
+        Returns (to_add, to_remove, error). `to_add` may hold None entries:
+        additional replicas the server places itself (replication_factor growth).
+        """
+        if spec.members:
+            wanted = list(dict.fromkeys(spec.members))
+            if spec.replication_factor is not None and len(wanted) != spec.replication_factor:
+                return None, None, "topology_members length ({}) must equal replication_factor ({}).".format(
+                    len(wanted), spec.replication_factor)
+            if cluster_tags is None:
+                cluster_tags = set(collect_tags(fetch_topology(self.ctx)))
+            unknown = [t for t in wanted if t not in cluster_tags]
+            if unknown:
+                return None, None, "Unknown node tags in topology_members: {}".format(", ".join(unknown))
+            return [t for t in wanted if t not in current], [t for t in current if t not in wanted], None
+
+        if spec.replication_factor is None or spec.replication_factor == len(current):
+            return [], [], None
+        if spec.replication_factor < len(current):
+            return None, None, (
+                "Reducing replication_factor of '{}' from {} to {} requires topology_members "
+                "to choose the nodes to keep.".format(spec.name, len(current), spec.replication_factor)
+            )
+        return [None] * (spec.replication_factor - len(current)), [], None
+
+    def _reconcile_topology(self, spec, record, tls, check_mode, cluster_tags=None):
+        """
+        Grow or shrink the topology of an existing database.
+        New replicas are added one at a time: each joins as promotable and the next
+        one is only added after the cluster promoted it, i.e. after it caught up
+        through replication, so scaling out never floods the network with several
+        full copies at once. Nodes are removed only after all additions completed.
+        For an encrypted database, the key from `encryption_key` is distributed to each
+        new node before it is added.
+        """
+        members, promotables, rehabs = dbs.topology_nodes(record)
+        current = list(dict.fromkeys(members + promotables + rehabs))
+        if not current:
+            # no flat topology in the record (e.g. a sharded database): nothing to reconcile against
+            return ModuleResult.ok(changed=False)
+        try:
+            to_add, to_remove, err = self._topology_plan(spec, current, cluster_tags)
+        except Exception as e:
+            return ModuleResult.error(msg="Failed to fetch cluster topology: {}".format(str(e)))
+        if err:
+            return ModuleResult.error(msg=err)
+        if not to_add and not to_remove:
+            return ModuleResult.ok(changed=False)
+
+        if check_mode:
+            planned = [t or "(auto)" for t in to_add]
+            return ModuleResult.ok(msg=msg.db_topology_would_change(spec.name, planned, to_remove), changed=True,
+                                   topology={"added": planned, "removed": to_remove, "waits": {}})
+
+        encrypted = bool(getattr(record, "encrypted", False))
+        if encrypted and None in to_add:
+            return ModuleResult.error(
+                msg="Growing encrypted database '{}' requires topology_members so its key can be distributed.".format(spec.name))
+
+        added, removed, waits = [], [], {}
+        for tag in to_add:
+            before = set(current + added)
+            if encrypted and spec.encryption.key_path:
+                encsvc.distribute_key(self.ctx, spec.name, file.read_key(spec.encryption.key_path), tls, only_tags=[tag])
+            dbs.add_database_node(self.ctx, spec.name, tag)
+            if tag is None:
+                members_now, promotables_now, rehabs_now = dbs.topology_nodes(dbs.get_record(self.ctx, spec.name))
+                fresh = [t for t in members_now + promotables_now + rehabs_now if t not in before]
+                if not fresh:
+                    return ModuleResult.error(msg="Could not determine the node the server added '{}' to.".format(spec.name))
+                tag = fresh[0]
+            added.append(tag)
+            wait = dbs.wait_member_promoted(self.ctx, spec.name, tag, spec.promotion_timeout, TOPOLOGY_POLL_INTERVAL)
+            waits[tag] = {k: wait.get(k) for k in ("ok", "attempts", "elapsed", "error", "detail")}
+            if not wait.get("ok"):
+                return ModuleResult.error(
+                    msg="Node {} did not catch up with database '{}' within {}s ({}). Added so far: {}.".format(
+                        tag, spec.name, spec.promotion_timeout, wait.get("error"), ", ".join(added)),
+                    topology={"added": added, "removed": removed, "waits": waits},
+                )
+
+        for tag in to_remove:
+            dbs.remove_database_node(self.ctx, spec.name, tag)
+            wait = dbs.wait_member_removed(self.ctx, spec.name, tag, spec.promotion_timeout, TOPOLOGY_POLL_INTERVAL)
+            waits[tag] = {k: wait.get(k) for k in ("ok", "attempts", "elapsed", "error", "detail")}
+            if not wait.get("ok"):
+                return ModuleResult.error(
+                    msg="Node {} was not removed from database '{}' within {}s ({}). Removed so far: {}.".format(
+                        tag, spec.name, spec.promotion_timeout, wait.get("error"), ", ".join(removed) or "none"),
+                    topology={"added": added, "removed": removed, "waits": waits},
+                )
+            removed.append(tag)
+
+        return ModuleResult.ok(msg=msg.db_topology_changed(spec.name, added, removed), changed=True,
+                               topology={"added": added, "removed": removed, "waits": waits})
+
     def ensure_absent(self, name, check_mode):
         """
         Ensure the specified database is absent.
         Returns: ModuleResult: contains `changed` (bool) and `msg` (str).
         """
-        existing = dbs.list_databases(self.ctx)
-        if name not in existing:
+        if not dbs.database_exists(self.ctx, name):
             return ModuleResult.ok(msg=msg.db_not_exists(name), changed=False)
 
         if check_mode:
@@ -112,3 +225,94 @@ class DatabaseReconciler:
 
         dbs.delete_database(self.ctx, name)
         return ModuleResult.ok(msg=msg.db_deleted(name), changed=True)
+
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class DatabaseSetReconciler(object):
+    """
+    Reconcile many databases in one pass: list existing databases once, fetch
+    the cluster topology at most once, then create, update or delete each
+    database through a bounded worker pool.
+    """
+
+    def __init__(self, ctx, max_workers=DEFAULT_MAX_WORKERS, page_size=dbs.DEFAULT_PAGE_SIZE, clock=time.time):
+        self.ctx = ctx
+        self.max_workers = max(1, int(max_workers))
+        self.page_size = page_size
+        self.clock = clock
+        self.single = DatabaseReconciler(ctx)
+
+    def _cluster_tags(self, specs):
+        if not any(spec.members for spec, _ in specs):
+            return None
+        return set(collect_tags(fetch_topology(self.ctx)))
+
+    def _one(self, spec, state, exists, tls, check_mode, cluster_tags):
+        started = self.clock()
+        try:
+            if state == "absent":
+                if not exists:
+                    res, status = ModuleResult.ok(msg=msg.db_not_exists(spec.name), changed=False), "unchanged"
+                elif check_mode:
+                    res, status = ModuleResult.ok(msg=msg.db_would_delete(spec.name), changed=True), "deleted"
+                else:
+                    dbs.delete_database(self.ctx, spec.name)
+                    res, status = ModuleResult.ok(msg=msg.db_deleted(spec.name), changed=True), "deleted"
+            else:
+                record = dbs.get_record(self.ctx, spec.name) if exists else None
+                res = self.single._ensure_present(spec, tls, check_mode, record, cluster_tags)
+                if res.failed:
+                    status = "failed"
+                elif not res.changed:
+                    status = "unchanged"
+                else:
+                    status = "updated" if exists else "created"
+        except Exception as e:
+            res, status = ModuleResult.error(msg=str(e)), "failed"
+
+        return {
+            "name": spec.name,
+            "status": status,
+            "changed": bool(res.changed),
+            "msg": res.msg,
+            "duration": round(self.clock() - started, 3),
+        }
+
+    def run(self, items, tls, check_mode):
+        """
+        items: list of (DatabaseSpec, state) with state 'present' or 'absent'.
+        Returns ModuleResult with per-database `databases` outcomes and name lists per status.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        started = self.clock()
+        existing = set(dbs.iter_database_names(self.ctx, page_size=self.page_size))
+        try:
+            cluster_tags = self._cluster_tags(items)
+        except Exception as e:
+            return ModuleResult.error(msg="Failed to fetch cluster topology: {}".format(str(e)))
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, len(items)))) as pool:
+            futures = [
+                pool.submit(self._one, spec, state, spec.name in existing, tls, check_mode, cluster_tags)
+                for spec, state in items
+            ]
+            outcomes = [f.result() for f in futures]
+
+        by_status = dict((s, []) for s in ("created", "updated", "deleted", "unchanged", "failed"))
+        for outcome in outcomes:
+            by_status[outcome["status"]].append(outcome["name"])
+
+        changed = any(o["changed"] for o in outcomes)
+        extras = dict(by_status, databases=outcomes, elapsed=round(self.clock() - started, 2))
+        extras["failed_databases"] = extras.pop("failed")
+        counts = dict((s, len(names)) for s, names in by_status.items())
+        if by_status["failed"]:
+            return ModuleResult(changed=changed, failed=True, msg=msg.dbs_failed(by_status["failed"], counts), extras=extras)
+        if not changed:
+            return ModuleResult.ok(msg=msg.dbs_no_changes(len(items)), changed=False, **extras)
+        if check_mode:
+            return ModuleResult.ok(msg=msg.dbs_would_apply(counts), changed=True, **extras)
+        return ModuleResult.ok(msg=msg.dbs_applied(counts), changed=True, **extras)
@@ -14,38 +14,134 @@ from ansible_collections.ravendb.ravendb.plugins.module_utils.core.tls import TL
 from ansible_collections.ravendb.ravendb.plugins.module_utils.core.client import DocumentStoreFactory
 from ansible_collections.ravendb.ravendb.plugins.module_utils.services.cluster_service import fetch_topology_http
 from ansible_collections.ravendb.ravendb.plugins.module_utils.services.healthcheck_service import hostname_is_ip
+from ansible_collections.ravendb.ravendb.plugins.module_utils.services.retry_service import RetryStrategy, AttemptTrace
+from ansible_collections.ravendb.ravendb.plugins.module_utils.services import notification_service as notifications
 
 
 CHECK_NODE_ALIVE = 'node_alive'
 CHECK_CLUSTER_CONN = 'cluster_connectivity'
 CHECK_DB_GROUPS_AVAILABLE = 'db_groups_available'
 CHECK_DB_GROUPS_AVAILABLE_EXCL = 'db_groups_available_excluding_target'
+CHECK_REPLICATION = 'replication_caught_up'
 
 
 class HealthcheckReconciler(object):
+    trace = None
+
+    def _on_attempt(self, check, url):
+        return self.trace.for_check(check, node=url) if self.trace else None
+
+    def _trace_done(self, check, url, result):
+        if self.trace:
+            self.trace.done(check, result, node=url)
+
+    def _node_urls(self, spec, tls):
+        urls = list(spec.urls)
+        if spec.cluster:
+            topo = fetch_topology_http(spec.url, tls)
+            for group in (topo.members, topo.promotables, topo.watchers):
+                urls.extend(u for u in (group or {}).values() if u)
+        return list(dict.fromkeys(u.rstrip("/") for u in urls))
+
+    def _run_nodes(self, spec, tls, results, summary_bits, warnings):
+        """Fan node_alive/cluster_connectivity out to every node concurrently."""
+        urls = self._node_urls(spec, tls)
+
+        def validate_for(url):
+            if spec.validate_certificate and hostname_is_ip(url):
+                warnings.append("validate_certificate automatically disabled for IP host {}.".format(url))
+                return False
+            return spec.validate_certificate
+
+        nodes = hcsvc.probe_nodes(
+            urls, tls, validate_for,
+            CHECK_NODE_ALIVE in spec.checks, CHECK_CLUSTER_CONN in spec.checks,
+            spec.max_time_to_wait, spec.retry_interval_seconds,
+            strategy=RetryStrategy.named(spec.retry_backoff, spec.retry_interval_seconds),
+            wait_mode=spec.wait_mode,
+            trace=self.trace,
+        )
+        results["nodes"] = nodes
+
+        failed = [u for u, r in nodes.items() if not r.get("ok")]
+        if failed:
+            return ModuleResult.error(
+                "node checks failed on: {}".format(", ".join(failed)),
+                diagnostics=results
+            )
+
+        slowest = max((r.get("elapsed") or 0.0) for r in nodes.values()) if nodes else 0.0
+        summary_bits.append("nodes OK {}/{} (slowest:{}s)".format(len(nodes), len(nodes), slowest))
+        return None
+
+    def _run_threshold(self, check, spec, tls, session, strategy, sleep, results, summary_bits):
+        kwargs = {}
+        if check == CHECK_REPLICATION:
+            topo = fetch_topology_http(spec.url, tls)
+            node_urls = {}
+            for group in (topo.watchers, topo.promotables, topo.members):
+                node_urls.update(group or {})
+            kwargs["node_urls"] = node_urls
+        result = hcsvc.wait_for_threshold(
+            check, session, spec.url, dict(hcsvc.DEFAULT_THRESHOLDS, **spec.thresholds),
+            spec.max_time_to_wait, spec.retry_interval_seconds,
+            strategy=strategy, sleep=sleep, on_attempt=self._on_attempt(check, spec.url), **kwargs
+        )
+        results[check] = result
+        self._trace_done(check, spec.url, result)
+        if not result.get("ok"):
+            return ModuleResult.error(
+                "{} failed: {}".format(check, result.get("error") or "unknown error"),
+                diagnostics=results
+            )
+        summary_bits.append("{} OK (attempts:{})".format(check, result.get("attempts", 0)))
+        return None
+
     def run(self, spec):
         results = {}
         summary_bits = []
         tls = TLSConfig(spec.certificate_path, spec.ca_cert_path)
+        self.trace = AttemptTrace(spec.trace_path) if spec.trace_path else None
         effective_validate = spec.validate_certificate
         warnings = []
 
-        if (CHECK_NODE_ALIVE in spec.checks or CHECK_CLUSTER_CONN in spec.checks) and hostname_is_ip(spec.url):
+        if spec.urls or spec.cluster:
+            if CHECK_NODE_ALIVE in spec.checks or CHECK_CLUSTER_CONN in spec.checks:
+                failure = self._run_nodes(spec, tls, results, summary_bits, warnings)
+                if failure is not None:
+                    return failure
+            node_checks = ()
+        else:
+            node_checks = spec.checks
+
+        if (CHECK_NODE_ALIVE in node_checks or CHECK_CLUSTER_CONN in node_checks) and hostname_is_ip(spec.url):
             if effective_validate:
                 effective_validate = False
                 warnings.append("validate_certificate automatically disabled for IP host (NodeAlive/ClusterConnectivity).")
 
         session = hcsvc.build_session(tls, validate_certificate=effective_validate)
+        node_strategy = RetryStrategy.named(spec.retry_backoff, spec.retry_interval_seconds)
+        watcher = None
+        threshold_checks = [c for c in spec.checks if c in hcsvc.THRESHOLD_CHECKS]
+        if node_checks or threshold_checks or CHECK_DB_GROUPS_AVAILABLE in spec.checks or CHECK_DB_GROUPS_AVAILABLE_EXCL in spec.checks:
+            watcher = notifications.open_watcher(spec.wait_mode, spec.url, tls, effective_validate)
+        sleep = watcher.sleep if watcher else None
+        if watcher and not watcher.connected:
+            warnings.append("wait_mode=events: notification stream unavailable ({}), polling instead.".format(watcher.error))
 
         try:
-            if CHECK_NODE_ALIVE in spec.checks:
+            if CHECK_NODE_ALIVE in node_checks:
                 result = hcsvc.wait_for_node_alive(
                     session,
                     spec.url,
                     spec.max_time_to_wait,
                     spec.retry_interval_seconds,
+                    strategy=node_strategy,
+                    sleep=sleep,
+                    on_attempt=self._on_attempt(CHECK_NODE_ALIVE, spec.url),
                 )
                 results[CHECK_NODE_ALIVE] = result
+                self._trace_done(CHECK_NODE_ALIVE, spec.url, result)
                 if not result.get('ok'):
                     return ModuleResult.error(
                         "node_alive failed: {}".format(result.get('error', 'unknown error')),
@@ -54,14 +150,18 @@ class HealthcheckReconciler(object):
 
                 summary_bits.append("node_alive OK (attempts:{})".format(result.get('attempts', 0)))
 
-            if CHECK_CLUSTER_CONN in spec.checks:
+            if CHECK_CLUSTER_CONN in node_checks:
                 result = hcsvc.wait_for_cluster_connectivity(
                     session,
                     spec.url,
                     spec.max_time_to_wait,
                     spec.retry_interval_seconds,
+                    strategy=node_strategy,
+                    sleep=sleep,
+                    on_attempt=self._on_attempt(CHECK_CLUSTER_CONN, spec.url),
                 )
                 results[CHECK_CLUSTER_CONN] = result
+                self._trace_done(CHECK_CLUSTER_CONN, spec.url, result)
                 if not result.get('ok'):
                     return ModuleResult.error(
                         "cluster_connectivity failed: {}".format(result.get('error', 'unknown error')),
@@ -95,6 +195,7 @@ class HealthcheckReconciler(object):
                 except Exception:
                     excluded = None
 
+                db_check = CHECK_DB_GROUPS_AVAILABLE_EXCL if CHECK_DB_GROUPS_AVAILABLE_EXCL in spec.checks else CHECK_DB_GROUPS_AVAILABLE
                 ctx = DocumentStoreFactory.create(spec.url, None, spec.certificate_path, spec.ca_cert_path)
                 try:
                     result = hcsvc.wait_for_node_databases_online(
@@ -102,12 +203,16 @@ class HealthcheckReconciler(object):
                         spec.max_time_to_wait,
                         spec.db_retry_interval_seconds,
                         excluded,
+                        strategy=RetryStrategy.named(spec.retry_backoff, spec.db_retry_interval_seconds),
+                        sleep=sleep,
+                        on_attempt=self._on_attempt(db_check, spec.url),
                     )
 
                     if isinstance(result, dict):
                         result["excluded_tag"] = excluded
-                    key = CHECK_DB_GROUPS_AVAILABLE_EXCL if CHECK_DB_GROUPS_AVAILABLE_EXCL in spec.checks else CHECK_DB_GROUPS_AVAILABLE
+                    key = db_check
                     results[key] = result
+                    self._trace_done(key, spec.url, result)
 
                     if not result.get("ok"):
                         err = result.get("error") or "unknown error"
@@ -136,12 +241,24 @@ class HealthcheckReconciler(object):
                         )
                 finally:
                     ctx.close()
+
+            for check in threshold_checks:
+                failure = self._run_threshold(check, spec, tls, session, node_strategy, sleep, results, summary_bits)
+                if failure is not None:
+                    return failure
         finally:
+            if watcher:
+                results["events"] = watcher.summary()
+                watcher.close()
             try:
                 session.close()
             except Exception:
                 pass
 
+        if self.trace and self.trace.error:
+            warnings.append("trace_path: could not write {} ({}); no trace was recorded.".format(
+                self.trace.path, self.trace.error))
+
         msg = "; ".join(summary_bits) if summary_bits else "No checks selected."
         out = ModuleResult.ok(msg=msg, changed=False, results=results)
         if warnings:
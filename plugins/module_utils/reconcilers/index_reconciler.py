@@ -7,6 +7,9 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+import time
+from collections import deque
+
 from ansible_collections.ravendb.ravendb.plugins.module_utils.core.result import ModuleResult
 from ansible_collections.ravendb.ravendb.plugins.module_utils.core import messages as msg
 from ansible_collections.ravendb.ravendb.plugins.module_utils.dto.index import IndexDefinitionSpec
@@ -14,25 +17,29 @@ from ansible_collections.ravendb.ravendb.plugins.module_utils.services import in
 from ansible_collections.ravendb.ravendb.plugins.module_utils.services import index_config_service as cfgsvc
 
 
+# server-managed indexes that prune must never delete
+_PRUNE_SKIP_PREFIXES = ("Auto/", "ReplacementOf/")
+
+
 class IndexReconciler(object):
     def __init__(self, ctx, db_name):
         self.ctx = ctx
         self.db_name = db_name
 
-    def _apply_index(self, name, raw_def, check_mode):
-        """Create or update an index with the given raw definition."""
+    def _apply_index(self, name, existing, raw_def, configuration, check_mode):
+        """
+        Deploy the index with one PUT of a complete definition: declared map/reduce
+        (when given) plus merged per-index configuration.
+        """
         if check_mode:
             return ModuleResult.ok(msg=msg.idx_would_create(name), changed=True)
 
-        idxsvc.create_index(self.ctx, self.db_name, name, raw_def)
+        idxsvc.create_index(self.ctx, self.db_name, name, raw_def, configuration, existing=existing)
         return ModuleResult.ok(msg=msg.idx_created(name), changed=True)
 
     def ensure_absent(self, name, check_mode):
         """Delete the index if it exists."""
-        existing_defs = idxsvc.list_definitions(self.ctx, self.db_name)
-        existing_names = [getattr(i, "name", None) for i in existing_defs]
-
-        if name not in existing_names:
+        if not idxsvc.index_exists(self.ctx, self.db_name, name):
             return ModuleResult.ok(msg=msg.idx_already_absent(name), changed=False)
 
         if check_mode:
@@ -45,30 +52,40 @@ class IndexReconciler(object):
         """
         Create or update the index definition, optionally apply mode and per-index configuration.
         """
-        existing_defs = idxsvc.list_definitions(self.ctx, self.db_name)
-        existing_names = [getattr(i, "name", None) for i in existing_defs]
+        existing_def = idxsvc.get_definition(self.ctx, self.db_name, spec.name)
         base_msg = None
         changed_any = False
+        changed_fields = []
 
         if isinstance(spec.definition, IndexDefinitionSpec):
             raw_def = spec.definition.to_dict()
         else:
             raw_def = None
 
-        if spec.name not in existing_names:
+        if existing_def is None:
             if raw_def is None:
                 return ModuleResult.error("index_definition is required when creating a new index.")
 
-            result = self._apply_index(spec.name, raw_def, check_mode)
+            result = self._apply_index(spec.name, None, raw_def, spec.configuration, check_mode)
             base_msg, changed_any = result.msg, True
 
         else:
-            existing_def = idxsvc.get_definition(self.ctx, self.db_name, spec.name)
-            if raw_def and not idxsvc.index_matches(existing_def, raw_def):
-                result = self._apply_index(spec.name, raw_def, check_mode)
+            changed_fields = idxsvc.index_changes(existing_def, raw_def, spec.configuration)
+            definition_changed = any(f in idxsvc.DEFINITION_FIELDS for f in changed_fields)
+            to_apply = cfgsvc.diff(spec.configuration, cfgsvc.configuration_of(existing_def))
+
+            if changed_fields:
+                # resend the declared code only when it actually differs, so a
+                # configuration-only change keeps the server's stored source text
+                result = self._apply_index(spec.name, existing_def, raw_def if definition_changed else None,
+                                           spec.configuration, check_mode)
                 base_msg, changed_any = result.msg, True
-            else:
+            if not definition_changed:
                 base_msg = msg.idx_exists(spec.name)
+            if to_apply:
+                keys_str = ", ".join(sorted(to_apply.keys()))
+                cfg_msg = msg.idx_cfg_would_apply(spec.name, keys_str) if check_mode else msg.idx_cfg_applied(spec.name, keys_str)
+                base_msg = "{} {}".format(base_msg, cfg_msg)
 
         if spec.mode:
             mode_changed, mode_msg = idxsvc.apply_mode(self.ctx, self.db_name, spec.name, spec.mode, spec.cluster_wide, check_mode)
@@ -81,15 +98,222 @@ class IndexReconciler(object):
             else:
                 base_msg = mode_msg or base_msg
 
-        if spec.configuration:
-            current = cfgsvc.get_current(self.ctx, self.db_name, spec.name)
-            to_apply = cfgsvc.diff(spec.configuration, current)
-            if to_apply:
-                keys_str = ", ".join(sorted(to_apply.keys()))
-                if check_mode:
-                    return ModuleResult.ok(msg="{} {}".format(base_msg, msg.idx_cfg_would_apply(spec.name, keys_str)), changed=True)
+        return ModuleResult.ok(msg=base_msg, changed=changed_any, changed_fields=changed_fields)
+
+    def ensure_mode_bulk(self, patterns, mode, cluster_wide, check_mode):
+        """
+        Apply `mode` to every index selected by `patterns` (names, globs or "all"),
+        reading the indexing status once and acting only on indexes not already in
+        that mode. Pause/resume covering every index use one database-wide operation.
+        """
+        statuses = idxsvc.get_indexing_status(self.ctx, self.db_name)
+        names = list(statuses)
+        selected, missing = idxsvc.select_index_names(names, patterns)
+        if missing:
+            return ModuleResult.error(msg.idx_bulk_missing(missing))
+
+        targets = [n for n in selected if idxsvc.needs_mode_change(statuses[n], mode)]
+        database_wide = bool(targets) and mode in ("paused", "resumed") and len(selected) == len(names)
+        extras = dict(
+            selected=selected,
+            changed_indexes=targets,
+            unchanged_indexes=[n for n in selected if n not in targets],
+            database_wide=database_wide,
+        )
+
+        if not targets:
+            return ModuleResult.ok(msg=msg.idx_bulk_no_changes(mode, len(selected)), changed=False, **extras)
+
+        if check_mode:
+            return ModuleResult.ok(msg=msg.idx_bulk_would_apply(mode, targets, database_wide), changed=True, **extras)
+
+        idxsvc.apply_bulk_mode(self.ctx, self.db_name, targets, mode, cluster_wide, database_wide)
+        return ModuleResult.ok(msg=msg.idx_bulk_applied(mode, targets, database_wide), changed=True, **extras)
+
+    def wait_non_stale(self, res, name, max_wait, poll_interval, on_timeout):
+        """
+        Block until the index (and any side-by-side replacement) is non-stale and
+        fold the outcome into `res`. On timeout, fail or continue per `on_timeout`.
+        """
+        wait = idxsvc.wait_for_non_stale(self.ctx, self.db_name, name, max_wait, poll_interval)
+        detail = wait.get("detail") if isinstance(wait.get("detail"), dict) else {}
+        extras = dict(res.extras)
+        extras["wait"] = {
+            "non_stale": bool(wait.get("ok")),
+            "timed_out": (not wait.get("ok")) and wait.get("error") == "timeout",
+            "attempts": wait.get("attempts"),
+            "elapsed": wait.get("elapsed"),
+            "progress": detail,
+        }
+
+        if wait.get("ok"):
+            text = msg.idx_wait_done(name, wait.get("elapsed"))
+        elif wait.get("error") == "timeout":
+            text = msg.idx_wait_timeout(name, max_wait)
+            if on_timeout == "fail":
+                return ModuleResult(changed=res.changed, failed=True, msg="{} {}".format(res.msg, text), extras=extras)
+        else:
+            return ModuleResult(changed=res.changed, failed=True, msg="{} {}".format(res.msg, wait.get("error")), extras=extras)
+
+        return ModuleResult(changed=res.changed, msg="{} {}".format(res.msg, text), extras=extras)
+
+    def ensure_set(self, specs, prune, check_mode):
+        """
+        Reconcile a whole set of indexes against one snapshot of the database.
+        All new or changed definitions are sent in a single PutIndexesOperation;
+        with prune=True, indexes that are not declared are deleted.
+        """
+        snap = idxsvc.snapshot(self.ctx, self.db_name)
+        created, updated, unchanged, to_put = [], [], [], []
+        changes = {}
+
+        for spec in specs:
+            raw_def = spec.definition.to_dict() if isinstance(spec.definition, IndexDefinitionSpec) else None
+            existing = snap.by_name.get(spec.name)
+
+            if existing is None:
+                if raw_def is None:
+                    return ModuleResult.error(
+                        "index_definition is required when creating a new index ('{}').".format(spec.name))
+                created.append(spec.name)
+                to_put.append(idxsvc.build_merged_definition(spec.name, None, raw_def, spec.configuration))
+                continue
+
+            fields = idxsvc.index_changes(existing, raw_def, spec.configuration)
+            if fields:
+                updated.append(spec.name)
+                changes[spec.name] = fields
+                # resend the declared code only when it actually differs, so a
+                # configuration-only change keeps the server's stored source text
+                definition_changed = any(f in idxsvc.DEFINITION_FIELDS for f in fields)
+                to_put.append(idxsvc.build_merged_definition(
+                    spec.name, existing, raw_def if definition_changed else None, spec.configuration))
+            else:
+                unchanged.append(spec.name)
+
+        deleted = []
+        if prune:
+            declared = set(s.name for s in specs)
+            deleted = [
+                n for n in snap.names()
+                if n not in declared and not str(n).startswith(_PRUNE_SKIP_PREFIXES)
+            ]
+
+        extras = dict(created=created, updated=updated, deleted=deleted, unchanged=unchanged, changes=changes)
+        if not (created or updated or deleted):
+            return ModuleResult.ok(msg=msg.idx_set_no_changes(len(specs)), changed=False, **extras)
+
+        if check_mode:
+            return ModuleResult.ok(msg=msg.idx_set_would_apply(created, updated, deleted), changed=True, **extras)
+
+        idxsvc.put_index_definitions(self.ctx, self.db_name, to_put)
+        for name in deleted:
+            idxsvc.delete_index(self.ctx, self.db_name, name)
+
+        return ModuleResult.ok(msg=msg.idx_set_applied(created, updated, deleted), changed=True, **extras)
 
-                cfgsvc.apply(self.ctx, self.db_name, spec.name, to_apply)
-                return ModuleResult.ok(msg="{} {}".format(base_msg, msg.idx_cfg_applied(spec.name, keys_str)), changed=True)
 
-        return ModuleResult.ok(msg=base_msg, changed=changed_any)
+class IndexRollout(object):
+    """
+    Staggered deployment of one index set to many databases.
+    At most `concurrency` databases re-index at a time; the next database is started
+    once an in-flight one has no stale declared index left. Deploying is a single PUT
+    and waiting is polling, so one thread drives the whole rollout.
+    A failed deployment, a stalled index or a database exceeding `max_wait` halts the
+    rollout: databases not started yet are reported as skipped.
+    """
+
+    def __init__(self, ctx, db_names, concurrency=1, max_wait=600, poll_interval=5,
+                 clock=time.time, sleep=time.sleep):
+        self.ctx = ctx
+        self.db_names = list(db_names)
+        self.concurrency = max(1, int(concurrency))
+        self.max_wait = float(max_wait)
+        self.poll_interval = float(poll_interval)
+        self.clock = clock
+        self.sleep = sleep
+
+    def _deploy(self, db_name, specs, prune, check_mode):
+        started = self.clock()
+        res = IndexReconciler(self.ctx, db_name).ensure_set(specs, prune, check_mode)
+        outcome = {
+            "database": db_name,
+            "status": "failed" if res.failed else ("changed" if res.changed else "unchanged"),
+            "msg": res.msg,
+            "created": res.extras.get("created", []),
+            "updated": res.extras.get("updated", []),
+            "deleted": res.extras.get("deleted", []),
+            "deploy_seconds": round(self.clock() - started, 2),
+            "wait_seconds": 0.0,
+        }
+        return outcome, started
+
+    def _poll(self, outcome, started, touched):
+        """Return True when the database is done (non-stale, stalled or timed out)."""
+        stale = idxsvc.stale_progress(self.ctx, outcome["database"], touched)
+        now = self.clock()
+        outcome["wait_seconds"] = round(now - started - outcome["deploy_seconds"], 2)
+        outcome["progress"] = stale
+
+        stalled = [p["name"] for p in stale if p["status"] in idxsvc.STALLED_STATUSES]
+        if stalled:
+            outcome["status"] = "failed"
+            outcome["msg"] = msg.idx_wait_stalled(stalled[0], next(p["status"] for p in stale if p["name"] == stalled[0]))
+            return True
+        if not stale:
+            outcome["status"] = "done"
+            return True
+        if now - started >= self.max_wait:
+            outcome["status"] = "timed_out"
+            outcome["msg"] = msg.idx_wait_timeout(", ".join(p["name"] for p in stale), int(self.max_wait))
+            return True
+        return False
+
+    def run(self, specs, prune, check_mode):
+        started_all = self.clock()
+        pending = deque(self.db_names)
+        in_flight = []
+        outcomes = []
+        halted = False
+
+        while pending or in_flight:
+            while pending and not halted and len(in_flight) < self.concurrency:
+                db_name = pending.popleft()
+                outcome, started = self._deploy(db_name, specs, prune, check_mode)
+                outcomes.append(outcome)
+                touched = outcome["created"] + outcome["updated"]
+                if outcome["status"] == "failed":
+                    halted = True
+                elif touched and not check_mode:
+                    in_flight.append((outcome, started, touched))
+
+            if halted and not in_flight:
+                break
+            if not in_flight:
+                continue
+
+            self.sleep(self.poll_interval)
+            still = []
+            for outcome, started, touched in in_flight:
+                if not self._poll(outcome, started, touched):
+                    still.append((outcome, started, touched))
+                elif outcome["status"] in ("failed", "timed_out"):
+                    halted = True
+            in_flight = still
+
+        for db_name in pending:
+            outcomes.append({"database": db_name, "status": "skipped"})
+
+        changed = any(o.get("created") or o.get("updated") or o.get("deleted") for o in outcomes)
+        elapsed = round(self.clock() - started_all, 2)
+        failed = [o for o in outcomes if o["status"] in ("failed", "timed_out")]
+        extras = dict(rollout=outcomes, elapsed=elapsed)
+
+        if failed:
+            return ModuleResult(changed=changed, failed=True, extras=extras,
+                                msg=msg.idx_rollout_halted(failed[0]["database"], failed[0].get("msg")))
+        if check_mode:
+            return ModuleResult.ok(msg=msg.idx_rollout_would_apply(
+                [o["database"] for o in outcomes if o["status"] == "changed"], len(outcomes)), changed=changed, **extras)
+        return ModuleResult.ok(msg=msg.idx_rollout_done(
+            [o["database"] for o in outcomes if o["status"] != "unchanged"], len(outcomes), elapsed), changed=changed, **extras)
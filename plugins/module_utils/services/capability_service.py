@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c), RavenDB
+# GNU General Public License v3.0 or later (see COPYING or
+# https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core import version as versions
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core.transport import get_transport
+from ansible_collections.ravendb.ravendb.plugins.module_utils.services import connection_string_service as cssvc
+
+
+# seconds a probed capability record stays valid; 0 disables the cache
+DEFAULT_TTL = 300
+
+CACHE_DIRNAME = "ravendb-capabilities"
+
+# minimum server version of features gated by require_min_version_for_type
+FEATURE_MIN_VERSIONS = {
+    "ai_connection_strings": "7.1.0",
+    "snowflake_connection_strings": "7.1.0",
+    "queue_amazon_sqs": "7.1.0",
+    "queue_azure_queue_storage": "6.2.0",
+}
+
+
+def default_cache_dir():
+    return os.path.join(tempfile.gettempdir(), CACHE_DIRNAME)
+
+
+def cache_key(url):
+    """Cache key of a cluster: the normalized server URL, hashed for use as a file name."""
+    normalized = (url or "").strip().rstrip("/").lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _cache_path(url, directory=None):
+    return os.path.join(directory or default_cache_dir(), cache_key(url) + ".json")
+
+
+def features_for(version):
+    return dict((name, versions.at_least(version, needed)) for name, needed in FEATURE_MIN_VERSIONS.items())
+
+
+def load(url, ttl, directory=None, clock=time.time):
+    """The cached capability record of `url`, or None when missing, unreadable or older than `ttl` seconds."""
+    if not ttl or ttl <= 0:
+        return None
+    try:
+        with open(_cache_path(url, directory)) as f:
+            caps = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    if not isinstance(caps, dict) or caps.get("url") != url.rstrip("/"):
+        return None
+    if clock() - float(caps.get("probed_at") or 0) > ttl:
+        return None
+    return caps
+
+
+def store(url, caps, directory=None):
+    """Write the record atomically so concurrent tasks never read a partial file."""
+    path = _cache_path(url, directory)
+    folder = os.path.dirname(path)
+    try:
+        if not os.path.isdir(folder):
+            os.makedirs(folder, mode=0o700)
+        fd, tmp = tempfile.mkstemp(dir=folder, prefix=".caps-")
+        with os.fdopen(fd, "w") as f:
+            json.dump(caps, f, sort_keys=True)
+        os.replace(tmp, path)
+    except (IOError, OSError):
+        # the cache is an optimization only; the next task will probe again
+        pass
+
+
+def probe(ctx, tls, clock=time.time):
+    """
+    Server version, connection-string buckets and derived feature flags of the
+    cluster behind `ctx`. `buckets` is None when the connection-string listing
+    could not be read.
+    """
+    version = versions.server_version(get_transport(tls), ctx.store.urls[0])
+    try:
+        data = cssvc.get_all_connection_strings_json(ctx, tls)
+        buckets = sorted(k for k in data if k.endswith("ConnectionStrings"))
+    except Exception:
+        buckets = None
+    return {
+        "url": ctx.store.urls[0].rstrip("/"),
+        "version": version,
+        "buckets": buckets,
+        "features": features_for(version),
+        "probed_at": clock(),
+    }
+
+
+def get_capabilities(ctx, tls, ttl=DEFAULT_TTL, directory=None, clock=time.time):
+    """
+    Capability record of the cluster, shared by every task (and host) of a run
+    through a file cache on the machine executing the module, keyed by cluster URL.
+    Returns (caps, cached).
+    """
+    url = ctx.store.urls[0]
+    caps = load(url, ttl, directory, clock)
+    if caps is not None:
+        return caps, True
+    caps = probe(ctx, tls, clock)
+    if ttl and ttl > 0 and caps["buckets"] is not None:
+        store(url, caps, directory)
+    return caps, False
@@ -7,6 +7,8 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core.transport import get_transport
+
 
 class ClusterTopology:
     def __init__(self, members, watchers, promotables):
@@ -16,11 +18,9 @@ class ClusterTopology:
 
 
 def fetch_topology_http(leader_url, tls, timeout=10):
-    import requests
-    cert, verify = tls.to_requests_tuple()
     endpoint = leader_url.rstrip('/') + "/cluster/topology"
 
-    r = requests.get(endpoint, cert=cert, verify=verify, timeout=timeout)
+    r = get_transport(tls).get(endpoint, timeout=timeout)
     r.raise_for_status()
     data = r.json()
     topo = data.get("Topology") or data.get("topology") or data
@@ -7,7 +7,16 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import enum
+import hashlib
+import json
+import os
+import re
+import time
+
 from ansible_collections.ravendb.ravendb.plugins.module_utils.core import files as file
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core.transport import get_transport
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core import version as versions
 
 
 _CS_KIND_MAP = {
@@ -21,7 +30,35 @@ _CS_KIND_MAP = {
 }
 
 
-def _cs_kind_info(cs_type_upper):
+# leaf fields holding credentials; compared and reported only as salted fingerprints
+SECRET_FIELDS = frozenset([
+    "ConnectionString", "Password", "ApiKey", "EncodedApiKey", "ClientSecret",
+    "AwsAccessKey", "AwsSecretKey", "AwsSessionToken", "AccessKey", "SecretKey",
+    "AccountKey", "SasToken", "GoogleCredentialsJson", "CertificateAsBase64", "CertificatesBase64",
+])
+
+# free-form client option maps (e.g. Kafka's sasl.password); every value below them is a secret
+SECRET_CONTAINERS = frozenset(["ConnectionOptions"])
+
+# any other field whose name looks like a credential
+_SECRET_NAME = re.compile(r"password|secret|token|key", re.IGNORECASE)
+
+DEFAULT_TEST_TIMEOUT = 15
+DEFAULT_TEST_WORKERS = 8
+
+# queue broker (as serialized) -> test-connection route segment
+_QUEUE_TEST_ROUTES = {
+    "Kafka": ("kafka", "KafkaConnectionSettings"),
+    "RabbitMq": ("rabbitmq", "RabbitMqConnectionSettings"),
+    "AzureQueueStorage": ("azurequeuestorage", "AzureQueueStorageConnectionSettings"),
+    "AmazonSqs": ("amazonsqs", "AmazonSqsConnectionSettings"),
+}
+
+# top-level fields that identify the connection string rather than configure it
+_IDENTITY_FIELDS = frozenset(["Name", "Type"])
+
+
+def cs_kind_info(cs_type_upper):
     t = (cs_type_upper or "").upper()
     info = _CS_KIND_MAP.get(t)
     if not info:
@@ -469,14 +506,6 @@ def _build_ai(name, p):
     )
 
 
-def _requests():
-    try:
-        import requests
-        return requests
-    except ImportError:
-        raise RuntimeError("Python 'requests' is required for Connection String operations. Install 'requests'.")
-
-
 def fetch_connection_string(ctx, cs_type, name, tls=None):
 
     from ravendb.documents.operations.connection_string.get_connection_string_operation import GetConnectionStringsOperation
@@ -485,63 +514,27 @@ def fetch_connection_string(ctx, cs_type, name, tls=None):
     cs_enum = _cs_enum(cs_type)
 
     res = ctx.store.maintenance.send(GetConnectionStringsOperation(name, cs_enum))
-    attr = _cs_kind_info(cs_kind)["attr"]
+    attr = cs_kind_info(cs_kind)["attr"]
     by_name = getattr(res, attr, None) or {}
     return by_name.get(name)
 
 
-def _get_all_connection_strings_json(ctx, tls):
+def get_all_connection_strings_json(ctx, tls):
     base = ctx.store.urls[0].rstrip("/")
     db = ctx.store.database
     url = "{}/databases/{}/admin/connection-strings".format(base.rstrip("/"), db)
 
-    cert = verify = None
-    if tls:
-        cert, verify = tls.to_requests_tuple()
-
-    resp = _requests().get(url, cert=cert, verify=verify, timeout=10)
+    resp = get_transport(tls).get(url, timeout=10)
     resp.raise_for_status()
     return resp.json()
 
 
 def _get_server_version(ctx, tls):
-    base = ctx.store.urls[0].rstrip("/")
-    url = "{}/build/version".format(base)
-
-    cert = verify = None
-    if tls:
-        cert, verify = tls.to_requests_tuple()
-
-    r = _requests().get(url, cert=cert, verify=verify, timeout=10)
-    r.raise_for_status()
-    try:
-        data = r.json()
-        return str(data.get("ProductVersion") or "").strip()
-    except Exception:
-        return (r.text or "").strip()
-
+    return versions.server_version(get_transport(tls), ctx.store.urls[0])
 
-def _parse_version(version_string):
 
-    if not version_string:
-        return (0, 0, 0)
-
-    base = ""
-    for ch in str(version_string):
-        if (ch.isdigit() or ch == "."):
-            base += ch
-        else:
-            break
-    parts = (base or "0").split(".")
-    parts = (parts + ["0", "0"])[:3]
-
-    try:
-        return (int(parts[0]), int(parts[1]), int(parts[2]))
-    except Exception:
-        return (0, 0, 0)
-
-
-def require_min_version_for_type(spec, ctx, tls):
+def require_min_version_for_type(spec, ctx, tls, server_version=None):
+    """`server_version` (e.g. from the capability cache) saves the /build/version request."""
     cs_type = (spec.cs_type or "").upper()
     props = spec.properties or {}
 
@@ -560,11 +553,8 @@ def require_min_version_for_type(spec, ctx, tls):
     if not needed:
         return
 
-    server_raw = _get_server_version(ctx, tls)
-    have = _parse_version(server_raw)
-    need = _parse_version(needed)
-
-    if have < need:
+    server_raw = server_version if server_version is not None else _get_server_version(ctx, tls)
+    if not versions.at_least(server_raw, needed):
         custom_msg = (
             "{} (AmazonSqs)".format(cs_type)
             if cs_type == "QUEUE" and (props.get("broker_type") or "").upper() == "AMAZONSQS"
@@ -579,21 +569,90 @@ def require_min_version_for_type(spec, ctx, tls):
         )
 
 
-def type_supported_on_server(ctx, cs_type_upper, tls):
+def type_supported_on_server(ctx, cs_type_upper, tls, buckets=None):
+    """`buckets` (e.g. from the capability cache) saves the connection-strings request."""
+    if buckets is not None:
+        return cs_kind_info(cs_type_upper)["bucket"] in buckets
     try:
-        data = _get_all_connection_strings_json(ctx, tls)
+        data = get_all_connection_strings_json(ctx, tls)
     except Exception:
         return False
-    bucket = _cs_kind_info(cs_type_upper)["bucket"]
+    bucket = cs_kind_info(cs_type_upper)["bucket"]
     return bucket in data
 
 
 def exists_via_rest(ctx, cs_type_upper, name, tls):
-    data = _get_all_connection_strings_json(ctx, tls)
-    bucket = _cs_kind_info(cs_type_upper)["bucket"]
+    data = get_all_connection_strings_json(ctx, tls)
+    bucket = cs_kind_info(cs_type_upper)["bucket"]
     return name in (data.get(bucket) or {})
 
 
+def current_json(ctx, cs_type, name, tls):
+    """The server's stored definition of one connection string as JSON, or None when it does not exist."""
+    try:
+        data = get_all_connection_strings_json(ctx, tls)
+        return (data.get(cs_kind_info(cs_type)["bucket"]) or {}).get(name)
+    except Exception:
+        obj = fetch_connection_string(ctx, cs_type, name, tls)
+        return _plain(obj.to_json()) if obj is not None else None
+
+
+def new_salt():
+    return os.urandom(16)
+
+
+def fingerprint(value, salt):
+    """Salted digest of a secret: equal values match within one run, but nothing can be read back from it."""
+    raw = value if isinstance(value, str) else json.dumps(value, sort_keys=True)
+    return "sha256:" + hashlib.sha256(salt + raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, dict):
+        return dict((k, _plain(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+def _is_secret(key):
+    return key in SECRET_FIELDS or bool(_SECRET_NAME.search(key))
+
+
+def _diff(desired, current, path, salt, out, secret=False):
+    for key, want in desired.items():
+        if want is None or (not path and key in _IDENTITY_FIELDS):
+            continue
+        have = current.get(key) if isinstance(current, dict) else None
+        where = path + [key]
+        if isinstance(want, dict):
+            _diff(want, have if isinstance(have, dict) else {}, where, salt, out,
+                  secret or key in SECRET_CONTAINERS)
+        elif secret or _is_secret(key):
+            # a secret the server does not return cannot be compared; leave it alone
+            if have is None:
+                continue
+            before, after = fingerprint(have, salt), fingerprint(want, salt)
+            if before != after:
+                out.append({"path": ".".join(where), "secret": True, "before": before, "after": after})
+        elif want != have:
+            out.append({"path": ".".join(where), "secret": False, "before": have, "after": want})
+
+
+def diff_connection_string(cs_obj, current, salt=None):
+    """
+    Fields of the desired connection string that differ from the server's `current` JSON.
+    Only fields set in the desired definition are compared; secrets are compared and
+    reported as salted fingerprints, so their values never show up in results or logs.
+    Returns a list of {path, secret, before, after}.
+    """
+    out = []
+    _diff(_plain(cs_obj.to_json()), current or {}, [], salt if salt is not None else new_salt(), out)
+    return out
+
+
 def put(ctx, cs_obj):
     from ravendb.documents.operations.connection_string.put_connection_string_operation import PutConnectionStringOperation
     ctx.store.maintenance.send(PutConnectionStringOperation(cs_obj))
@@ -628,3 +687,87 @@ def exists(ctx, cs_type, name, tls):
         return exists_via_rest(ctx, (cs_type or "").upper(), name, tls)
     except Exception:
         return fetch_connection_string(ctx, cs_type, name, tls) is not None
+
+
+def _test_requests(db, cs_type, body):
+    """
+    Server test-connection calls for one connection string, from its serialized
+    definition: a list of (target, path, params, payload) where payload is
+    ("data", str) or ("json", obj). Empty when the type has no such endpoint.
+    """
+    t = (cs_type or "").upper()
+    base = "/databases/{}/admin/etl".format(db)
+    if t == "SQL":
+        return [(body.get("FactoryName") or "sql", base + "/sql/test-connection",
+                 {"factoryName": body.get("FactoryName")}, ("data", body.get("ConnectionString") or ""))]
+    if t == "SNOWFLAKE":
+        return [("snowflake", base + "/snowflake/test-connection", {}, ("data", body.get("ConnectionString") or ""))]
+    if t == "ELASTIC_SEARCH":
+        return [(node, base + "/elasticsearch/test-connection", {"url": node}, ("json", body.get("Authentication") or {}))
+                for node in body.get("Nodes") or []]
+    if t == "QUEUE":
+        route = _QUEUE_TEST_ROUTES.get(body.get("BrokerType"))
+        if not route:
+            return []
+        segment, settings = route
+        return [(body.get("BrokerType"), base + "/queue/{}/test-connection".format(segment), {},
+                 ("json", body.get(settings) or {}))]
+    if t == "RAVEN":
+        return [(url, "/admin/test-connection", {"url": url}, ("data", ""))
+                for url in body.get("TopologyDiscoveryUrls") or []]
+    return []
+
+
+def _run_test(ctx, tls, request, timeout):
+    target, path, params, (kind, payload) = request
+    url = ctx.store.urls[0].rstrip("/") + path
+    started = time.time()
+    try:
+        kwargs = {kind: payload}
+        resp = get_transport(tls).post(url, params=params, timeout=timeout, **kwargs)
+        latency = round((time.time() - started) * 1000.0, 1)
+        if resp.status_code >= 400:
+            return {"target": target, "ok": False, "latency_ms": latency,
+                    "error": "HTTP {}: {}".format(resp.status_code, (resp.text or "").strip()[:200])}
+        try:
+            result = resp.json() or {}
+        except ValueError:
+            result = {}
+        ok = bool(result.get("Success", True))
+        return {"target": target, "ok": ok, "latency_ms": latency, "error": None if ok else result.get("Error")}
+    except Exception as e:
+        return {"target": target, "ok": False, "latency_ms": round((time.time() - started) * 1000.0, 1), "error": str(e)}
+
+
+def test_connections(ctx, items, tls, max_workers=DEFAULT_TEST_WORKERS, timeout=DEFAULT_TEST_TIMEOUT):
+    """
+    Ask the server to test every target of the given connection strings, all
+    calls in flight at once through a bounded worker pool.
+    items: list of ConnectionStringSpec. Returns one dict per target (name, cs_type,
+    target, ok, latency_ms, error) in declaration order; types without a
+    test-connection endpoint (OLAP, AI) are reported as skipped.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    db = ctx.store.database
+    planned = []
+    for spec in items:
+        body = _plain(builder_for(spec.cs_type)(spec.name, spec.properties or {}).to_json())
+        calls = _test_requests(db, spec.cs_type, body)
+        if not calls:
+            planned.append((spec, None))
+        planned.extend((spec, request) for request in calls)
+
+    calls = [request for _, request in planned if request is not None]
+    with ThreadPoolExecutor(max_workers=max(1, min(int(max_workers), len(calls) or 1))) as pool:
+        results = iter(list(pool.map(lambda request: _run_test(ctx, tls, request, timeout), calls)))
+
+    out = []
+    for spec, request in planned:
+        if request is None:
+            entry = {"target": None, "ok": None, "latency_ms": None, "error": None, "skipped": True}
+        else:
+            entry = dict(next(results), skipped=False)
+        entry.update(name=spec.name, cs_type=spec.cs_type)
+        out.append(entry)
+    return out
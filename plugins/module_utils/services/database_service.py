@@ -6,26 +6,54 @@
 
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
-from ansible_collections.ravendb.ravendb.plugins.module_utils.core.tls import TLSConfig
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core.transport import get_transport
+from ansible_collections.ravendb.ravendb.plugins.module_utils.services.retry_service import retry_until, BreakRetry
 
 
-def list_databases(ctx, start=0, max=128):
-    """Return a list of database names from the server."""
+DEFAULT_PAGE_SIZE = 128
+
+
+def list_databases(ctx, start=0, max=DEFAULT_PAGE_SIZE):
+    """Return one page of database names from the server."""
     from ravendb.serverwide.operations.common import GetDatabaseNamesOperation
     return ctx.maintenance_server().send(GetDatabaseNamesOperation(start, max))
 
 
+def iter_database_names(ctx, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Yield the names of all databases on the server, fetching `page_size` names
+    per request so large clusters are streamed instead of truncated.
+    """
+    start = 0
+    while True:
+        page = list_databases(ctx, start=start, max=page_size) or []
+        for name in page:
+            yield name
+        if len(page) < page_size:
+            return
+        start += len(page)
+
+
 def get_record(ctx, db_name):
     """
     Fetch the database record for the specified database.
+    Returns None when the database does not exist.
     """
     from ravendb.serverwide.operations.common import GetDatabaseRecordOperation
     return ctx.maintenance_server().send(GetDatabaseRecordOperation(db_name))
 
 
-def create_database(ctx, db_name, replication_factor, encrypted, members=None, tls=None):
+def database_exists(ctx, db_name):
+    """Existence probe for a single database: one record lookup, independent of the number of databases."""
+    return get_record(ctx, db_name) is not None
+
+
+def create_database(ctx, db_name, replication_factor, encrypted, members=None, tls=None, settings=None):
+    """
+    Create the database. `settings` go straight into the new record, so they are
+    effective from the first load without a reload.
+    """
     if members:
-        import requests
         body = {
             "DatabaseName": db_name,
             "ReplicationFactor": replication_factor,
@@ -37,10 +65,11 @@ def create_database(ctx, db_name, replication_factor, encrypted, members=None, t
                 "DynamicNodesDistribution": False,
             },
         }
+        if settings:
+            body["Settings"] = dict(settings)
         base = ctx.store.urls[0].rstrip("/")
         url = base + "/admin/databases"  # todo: move to client operation when it will be supported
-        cert, verify = (tls or TLSConfig()).to_requests_tuple()
-        r = requests.put(url, json=body, cert=cert, verify=verify, timeout=30)
+        r = get_transport(tls).put(url, json=body, timeout=30)
         r.raise_for_status()
         return
 
@@ -49,9 +78,73 @@ def create_database(ctx, db_name, replication_factor, encrypted, members=None, t
     rec = DatabaseRecord(db_name)
     if encrypted:
         rec.encrypted = True
+    if settings:
+        rec.settings = dict(settings)
     ctx.maintenance_server().send(CreateDatabaseOperation(rec, replication_factor))
 
 
 def delete_database(ctx, db_name):
     from ravendb.serverwide.operations.common import DeleteDatabaseOperation
     ctx.maintenance_server().send(DeleteDatabaseOperation(db_name))
+
+
+def _topology(record):
+    """Topology of a database record as JSON: the client keeps it as the raw server dict."""
+    topology = getattr(record, "topology", None)
+    return topology if isinstance(topology, dict) else {}
+
+
+def topology_nodes(record):
+    """(members, promotables, rehabs) tag lists from a database record."""
+    topology = _topology(record)
+    return (
+        list(topology.get("Members") or []),
+        list(topology.get("Promotables") or []),
+        list(topology.get("Rehabs") or []),
+    )
+
+
+def add_database_node(ctx, db_name, node_tag=None):
+    """Add the database to one more node (server-chosen when `node_tag` is None). It joins as promotable."""
+    from ravendb.serverwide.operations.common import AddDatabaseNodeOperation
+    return ctx.maintenance_server().send(AddDatabaseNodeOperation(db_name, node_tag))
+
+
+def remove_database_node(ctx, db_name, node_tag, hard_delete=False):
+    """Remove the database from a single node; the other members keep serving it."""
+    from ravendb.serverwide.operations.common import DeleteDatabaseOperation
+    ctx.maintenance_server().send(DeleteDatabaseOperation(db_name, hard_delete=hard_delete, from_node=node_tag))
+
+
+def check_member_promoted(ctx, db_name, node_tag):
+    """
+    (ok, detail) for retry_until: the new replica has caught up and the cluster
+    promoted it from promotable to member. The detail carries the promotion
+    status the cluster observer reports while it is still replicating.
+    """
+    record = get_record(ctx, db_name)
+    if record is None:
+        raise BreakRetry("database '{}' no longer exists".format(db_name))
+    members, promotables, rehabs = topology_nodes(record)
+    if node_tag in members:
+        return True, {"node": node_tag, "state": "member"}
+    if node_tag not in promotables and node_tag not in rehabs:
+        raise BreakRetry("node {} is no longer in the topology of '{}'".format(node_tag, db_name))
+    status = (_topology(record).get("PromotablesStatus") or {}).get(node_tag)
+    return False, {"node": node_tag, "state": "promotable" if node_tag in promotables else "rehab", "status": status}
+
+
+def check_member_removed(ctx, db_name, node_tag):
+    record = get_record(ctx, db_name)
+    if record is None:
+        return True, {"node": node_tag}
+    members, promotables, rehabs = topology_nodes(record)
+    return node_tag not in members + promotables + rehabs, {"node": node_tag}
+
+
+def wait_member_promoted(ctx, db_name, node_tag, max_wait, poll_interval):
+    return retry_until(check_member_promoted, max_wait, poll_interval, ctx, db_name, node_tag)
+
+
+def wait_member_removed(ctx, db_name, node_tag, max_wait, poll_interval):
+    return retry_until(check_member_removed, max_wait, poll_interval, ctx, db_name, node_tag)
@@ -8,6 +8,26 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 from ansible_collections.ravendb.ravendb.plugins.module_utils.core.configuration import validate_kv, diff_kv
+from ansible_collections.ravendb.ravendb.plugins.module_utils.services.retry_service import retry_until, BreakRetry
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core import version as versions
+
+
+# how changed settings are made effective
+RELOAD_ROLLING = "rolling"   # restart the database one node at a time
+RELOAD_ALL = "all"           # disable and re-enable the database on every node at once
+RELOAD_NONE = "none"         # only write the database record
+
+RELOAD_MODES = (RELOAD_ROLLING, RELOAD_ALL, RELOAD_NONE)
+
+# first server version with the per-node database restart endpoint used by rolling reloads
+ROLLING_RESTART_MIN_VERSION = "6.0.0"
+
+_TRUE = ("true", "yes", "on")
+_FALSE = ("false", "no", "off")
+
+
+class RollingReloadUnsupported(Exception):
+    """The server cannot restart a database on one node at a time."""
 
 
 def validate_database_settings(d):
@@ -24,14 +44,152 @@ def get_current(ctx, db_name):
     return (s.settings or {}) if s else {}
 
 
-def apply(ctx, db_name, to_apply):
+def _effective(value):
+    """Value as the server's configuration parser sees it (booleans and numbers are not textual)."""
+    v = ("" if value is None else str(value)).strip()
+    if v.lower() in _TRUE:
+        return True
+    if v.lower() in _FALSE:
+        return False
+    try:
+        return float(v)
+    except ValueError:
+        return v
+
+
+def classify(to_apply, current):
+    """
+    Split changed keys into (reload_keys, record_only_keys).
+    The database reads its settings when it loads, so any key whose effective
+    value changes needs a reload. A key whose new text parses to the value the
+    database already runs with (e.g. "True" -> "true", "64" -> "64.0") is only
+    rewritten in the record.
+    """
+    current = current or {}
+    reload_keys, record_only = [], []
+    for key, value in to_apply.items():
+        if key in current and _effective(current[key]) == _effective(value):
+            record_only.append(key)
+        else:
+            reload_keys.append(key)
+    return sorted(reload_keys), sorted(record_only)
+
+
+def put_settings(ctx, db_name, to_apply):
     from ravendb.serverwide.operations.configuration import PutDatabaseSettingsOperation
-    from ravendb.documents.operations.server_misc import ToggleDatabasesStateOperation
     ctx.store.maintenance.send(PutDatabaseSettingsOperation(db_name, to_apply))
+
+
+def reload_all(ctx, db_name):
+    from ravendb.documents.operations.server_misc import ToggleDatabasesStateOperation
     ctx.maintenance_server().send(ToggleDatabasesStateOperation(db_name, True))
     ctx.maintenance_server().send(ToggleDatabasesStateOperation(db_name, False))
 
 
+def database_group(ctx, db_name, timeout=30):
+    """/databases entry of one database: topology members (tag + url) and per-node status."""
+    r = ctx.http().get(ctx.base_url() + "/databases", params={"name": db_name}, timeout=timeout)
+    r.raise_for_status()
+    for info in (r.json() or {}).get("Databases") or []:
+        if info.get("Name") == db_name:
+            return info
+    return None
+
+
+def _members(info):
+    out = []
+    for m in ((info or {}).get("NodesTopology") or {}).get("Members") or []:
+        if isinstance(m, dict) and m.get("NodeTag"):
+            out.append((m["NodeTag"], (m.get("NodeUrl") or "").rstrip("/")))
+    return out
+
+
+def _online_tags(info):
+    status = ((info or {}).get("NodesTopology") or {}).get("Status") or {}
+    return sorted(tag for tag, st in status.items() if (st or {}).get("LastStatus") == "Ok")
+
+
+def _check_online(ctx, db_name, tag=None, excluded_tag=None, timeout=30):
+    """
+    (ok, detail) for retry_until: online on `tag`, or on some member other than
+    `excluded_tag`. A single-member group has nowhere else to serve from, so the
+    "elsewhere" condition holds trivially.
+    """
+    info = database_group(ctx, db_name, timeout=timeout)
+    if info is None:
+        raise BreakRetry("database '{}' not found".format(db_name))
+    online = _online_tags(info)
+    if tag is not None:
+        return tag in online, {"online": online}
+    others = [t for t, _ in _members(info) if t != excluded_tag]
+    if not others:
+        return True, {"online": online}
+    return any(t in online for t in others), {"online": online}
+
+
+def check_rolling_supported(ctx):
+    """Raise RollingReloadUnsupported unless the server supports per-node database restart."""
+    version = versions.server_version(ctx.http(), ctx.base_url(), timeout=30)
+    if not versions.at_least(version, ROLLING_RESTART_MIN_VERSION):
+        raise RollingReloadUnsupported(
+            "settings_reload=rolling requires RavenDB {} or newer (server is {}); use settings_reload=all.".format(
+                ROLLING_RESTART_MIN_VERSION, version or "unknown"))
+
+
+def restart_on_node(ctx, db_name, node_url, timeout=60):
+    """Unload and load the database on one node only."""
+    r = ctx.http().post(node_url + "/admin/databases/restart", params={"name": db_name}, timeout=timeout)
+    r.raise_for_status()
+
+
+def reload_rolling(ctx, db_name, max_wait=300, poll_interval=2):
+    """
+    Restart the database node by node. Before each node, wait until the database
+    is online on another member; after it, wait until it is online again on that
+    node. Support for per-node restart is checked by the caller (check_rolling_supported).
+    Returns the list of restarted node tags.
+    """
+    info = database_group(ctx, db_name)
+    restarted = []
+    for tag, url in _members(info):
+        ready = retry_until(_check_online, max_wait, poll_interval, ctx, db_name, excluded_tag=tag)
+        if not ready["ok"]:
+            raise RuntimeError("database '{}' is not online on any node but {}; not restarting it there.".format(db_name, tag))
+        restart_on_node(ctx, db_name, url or ctx.base_url())
+        back = retry_until(_check_online, max_wait, poll_interval, ctx, db_name, tag=tag)
+        if not back["ok"]:
+            raise RuntimeError("database '{}' did not come back online on node {}.".format(db_name, tag))
+        restarted.append(tag)
+    return restarted
+
+
+def apply(ctx, db_name, to_apply, current=None, reload=RELOAD_ALL):
+    """
+    Write all changed settings with one PUT and make them effective with at most
+    one reload. Returns {"reload": <how>, "reload_keys": [...], "nodes": [...]}, where
+    <how> is "rolling", "all", "none" (skipped by request) or "not_needed".
+    A rolling reload the server cannot do raises RollingReloadUnsupported before
+    anything is written.
+    """
+    reload_keys, _ = classify(to_apply, current)
+    if reload_keys and reload == RELOAD_ROLLING:
+        check_rolling_supported(ctx)
+    put_settings(ctx, db_name, to_apply)
+
+    out = {"reload": "not_needed", "reload_keys": reload_keys, "nodes": []}
+    if not reload_keys:
+        return out
+    if reload == RELOAD_NONE:
+        out["reload"] = RELOAD_NONE
+    elif reload == RELOAD_ALL:
+        reload_all(ctx, db_name)
+        out["reload"] = RELOAD_ALL
+    else:
+        out["nodes"] = reload_rolling(ctx, db_name)
+        out["reload"] = RELOAD_ROLLING
+    return out
+
+
 def diff(desired, current):
     """
     Compare desired and current settings.
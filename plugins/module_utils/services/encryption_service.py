@@ -7,26 +7,18 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core.transport import get_transport
 from ansible_collections.ravendb.ravendb.plugins.module_utils.services.cluster_service import fetch_topology, collect_tags
 
 
-def _requests():
-    try:
-        import requests
-        return requests
-    except ImportError:
-        raise RuntimeError("Python 'requests' is required for encryption operations. Install 'requests'.")
-
-
 def fetch_generated_key(ctx, tls):
     """
     Ask the server to generate an encryption key.
     """
     base = ctx.store.urls[0].rstrip("/")
     url = "{}/admin/secrets/generate".format(base)
-    cert, verify = tls.to_requests_tuple()
 
-    response = _requests().get(url, cert=cert, verify=verify)
+    response = get_transport(tls).get(url)
     response.raise_for_status()
     return response.text.strip()
 
@@ -50,9 +42,8 @@ def distribute_key(ctx, db_name, key, tls, only_tags=None):
 
     base = ctx.store.urls[0].rstrip("/")
     url = "{}/admin/secrets/distribute".format(base)
-    cert, verify = tls.to_requests_tuple()
 
-    response = _requests().post(url, params=params, data=key, headers={"Content-Type": "text/plain"}, cert=cert, verify=verify)
+    response = get_transport(tls).post(url, params=params, data=key, headers={"Content-Type": "text/plain"})
     if response.status_code not in (200, 201, 204):
         raise RuntimeError("Assigning encryption key failed: HTTP {} - {}".format(response.status_code, response.text))
 
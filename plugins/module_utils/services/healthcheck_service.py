@@ -8,8 +8,9 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 import time
 from ansible_collections.ravendb.ravendb.plugins.module_utils.services.retry_service import retry_until
-from ansible_collections.ravendb.ravendb.plugins.module_utils.core.tls import TLSConfig
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core.transport import HttpTransport
 from ansible_collections.ravendb.ravendb.plugins.module_utils.services.retry_service import BreakRetry
+from ansible_collections.ravendb.ravendb.plugins.module_utils.services import notification_service as notifications
 try:
     from urllib.parse import urlparse
 except Exception:
@@ -72,22 +73,22 @@ def pluck_tags(group):
 
 
 def build_session(tls, validate_certificate=None):
-    s = _requests().Session()
-    tls = tls or TLSConfig()
-    cert, verify = tls.to_requests_tuple()
-    if cert:
-        s.cert = cert
-    s.verify = False if validate_certificate is False else verify
-    return s
+    # retries are driven by retry_until, so the pooled session must not retry on its own
+    return HttpTransport(tls, validate_certificate=validate_certificate, retries=0).session
+
+
+def _elapsed_ms(started):
+    return round((time.time() - started) * 1000.0, 1)
 
 
 def get_setup_alive(session, base_url, timeout=20):
     endpoint = _base(base_url) + "/setup/alive"
     try:
+        started = time.time()
         r = session.get(endpoint, timeout=timeout)
 
         if 200 <= r.status_code < 300:
-            return True, {"status": r.status_code}
+            return True, {"status": r.status_code, "latency_ms": _elapsed_ms(started)}
 
         return False, "HTTP {}{}".format(
             r.status_code,
@@ -107,7 +108,9 @@ def get_node_ping(session, base_url, timeout=30, peer_url=None, node_tag=None):
         params["node"] = node_tag
 
     try:
+        started = time.time()
         r = session.get(endpoint, params=params, timeout=timeout)
+        latency_ms = _elapsed_ms(started)
         if not (200 <= r.status_code < 300):
             return False, "HTTP {}{}".format(r.status_code, " ({})".format(r.text.strip()[:200]) if r.text else "")
         try:
@@ -132,165 +135,235 @@ def get_node_ping(session, base_url, timeout=30, peer_url=None, node_tag=None):
                     "tcp_info_error": ti_err
                 }
 
-        return True, {"peers": len(result)}
+        return True, {"peers": len(result), "latency_ms": latency_ms}
     except _requests().RequestException as e:
         return False, str(e)
 
 
-def wait_for_node_alive(session, base_url, max_time_to_wait, retry_interval_seconds):
+def wait_for_node_alive(session, base_url, max_time_to_wait, retry_interval_seconds, strategy=None, sleep=None,
+                        on_attempt=None):
     return retry_until(
         get_setup_alive,
         max_time_to_wait,
         retry_interval_seconds,
         session,
         base_url,
-        20
+        timeout=20,
+        strategy=strategy,
+        timeout_kwarg="timeout",
+        sleep=sleep,
+        on_attempt=on_attempt,
     )
 
 
-def wait_for_cluster_connectivity(session, base_url, max_time_to_wait, retry_interval_seconds, peer_url=None, node_tag=None):
+def wait_for_cluster_connectivity(session, base_url, max_time_to_wait, retry_interval_seconds, peer_url=None, node_tag=None,
+                                  strategy=None, sleep=None, on_attempt=None):
     return retry_until(
         get_node_ping,
         max_time_to_wait,
         retry_interval_seconds,
         session,
         base_url,
-        30,
-        peer_url,
-        node_tag
+        timeout=30,
+        peer_url=peer_url,
+        node_tag=node_tag,
+        strategy=strategy,
+        timeout_kwarg="timeout",
+        sleep=sleep,
+        on_attempt=on_attempt,
     )
 
 
-def wait_for_node_databases_online(ctx, max_time_to_wait, interval_seconds, excluded_tag):
-    return retry_until(
-        _check_all_databases_online,
-        max_time_to_wait,
-        interval_seconds,
-        ctx,
-        excluded_tag,
-    )
+DEFAULT_MAX_WORKERS = 16
 
 
-def _list_db_names_via_http(ctx, timeout=30):
-    base = _base(ctx.store.urls[0])
-    session = build_session(TLSConfig())
+def probe_node(url, tls, validate_certificate, node_alive, cluster_connectivity,
+               max_time_to_wait, retry_interval_seconds, strategy=None, wait_mode=None, trace=None):
+    """
+    Run node_alive and/or cluster_connectivity against one node using its own
+    pooled session (and notification stream with wait_mode=events).
+    Returns per-check results plus latency and elapsed time.
+    """
+    started = time.time()
+    out = {"url": url, "ok": True, "checks": {}}
+    session = build_session(tls, validate_certificate=validate_certificate)
+    watcher = notifications.open_watcher(wait_mode, url, tls, validate_certificate)
+    sleep = watcher.sleep if watcher else None
     try:
-        r = session.get(base + "/databases", timeout=timeout)
-        r.raise_for_status()
-        data = r.json() or {}
-        dbs = data.get("Databases") or []
-        return [d.get("Name") for d in dbs if d.get("Name")]
+        if node_alive:
+            result = wait_for_node_alive(session, url, max_time_to_wait, retry_interval_seconds,
+                                         strategy=strategy, sleep=sleep,
+                                         on_attempt=trace.for_check("node_alive", node=url) if trace else None)
+            out["checks"]["node_alive"] = result
+            if trace:
+                trace.done("node_alive", result, node=url)
+            out["ok"] = bool(result.get("ok"))
+        if out["ok"] and cluster_connectivity:
+            result = wait_for_cluster_connectivity(session, url, max_time_to_wait, retry_interval_seconds,
+                                                   strategy=strategy, sleep=sleep,
+                                                   on_attempt=trace.for_check("cluster_connectivity", node=url) if trace else None)
+            out["checks"]["cluster_connectivity"] = result
+            if trace:
+                trace.done("cluster_connectivity", result, node=url)
+            out["ok"] = bool(result.get("ok"))
     finally:
+        if watcher:
+            out["events"] = watcher.summary()
+            watcher.close()
         try:
             session.close()
         except Exception:
             pass
 
+    latencies = [
+        r["detail"]["latency_ms"] for r in out["checks"].values()
+        if isinstance(r.get("detail"), dict) and r["detail"].get("latency_ms") is not None
+    ]
+    out["latency_ms"] = max(latencies) if latencies else None
+    out["elapsed"] = round(time.time() - started, 2)
+    return out
+
+
+def probe_nodes(urls, tls, validate_for, node_alive, cluster_connectivity,
+                max_time_to_wait, retry_interval_seconds, max_workers=DEFAULT_MAX_WORKERS, strategy=None,
+                wait_mode=None, trace=None):
+    """
+    Probe every node concurrently, one worker and one session per node, so a
+    cluster-wide gate takes as long as the slowest node. `validate_for(url)`
+    returns the certificate validation setting for that node.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    results = {}
+    if not urls:
+        return results
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls)))) as pool:
+        futures = [
+            (url, pool.submit(probe_node, url, tls, validate_for(url), node_alive, cluster_connectivity,
+                              max_time_to_wait, retry_interval_seconds, strategy, wait_mode, trace))
+            for url in urls
+        ]
+        for url, future in futures:
+            try:
+                results[url] = future.result()
+            except Exception as e:
+                results[url] = {"url": url, "ok": False, "error": str(e), "checks": {}}
+    return results
 
-def _check_all_databases_online(ctx, excluded_tag):
-    try:
-        names = _list_db_names_via_http(ctx)
-    except Exception as e:
-        return False, "failed to list databases: {}".format(e)
 
-    failing = {}
-    for name in names:
-        try:
-            ok, detail = _db_has_usable_member(ctx, name, excluded_tag)
-        except BreakRetry:
-            raise
+def _databases_checked(detail):
+    if isinstance(detail, dict) and detail.get("checked") is not None:
+        return {"databases": detail["checked"]}
+    return {}
 
-        except Exception as e:
-            failing[name] = "failed to evaluate database: {}".format(e)
-            continue
 
-        if not ok and not (isinstance(detail, dict) and detail.get("skipped") == "rf=1"):
-            failing[name] = detail
+def wait_for_node_databases_online(ctx, max_time_to_wait, interval_seconds, excluded_tag, strategy=None, sleep=None,
+                                   on_attempt=None):
+    result = retry_until(
+        _check_all_databases_online,
+        max_time_to_wait,
+        interval_seconds,
+        ctx,
+        excluded_tag,
+        timeout=30,
+        strategy=strategy,
+        timeout_kwarg="timeout",
+        sleep=sleep,
+        on_attempt=on_attempt,
+        observe=_databases_checked,
+    )
+    polled = [h["databases"] for h in result["history"] if h.get("databases") is not None]
+    result["telemetry"]["databases_per_poll"] = polled[-1] if polled else None
+    return result
 
-    if failing:
-        return False, {"failing": failing}
-    return True, {"checked": len(names)}
 
+# pause before re-reading /databases for groups that reported a hard load error
+HARD_ERROR_RECHECK_SECONDS = 2
 
-def _db_has_usable_member(ctx, db_name, excluded_tag):
-    def _eval_once():
-        base = _base(ctx.store.urls[0])
-        session = build_session(TLSConfig())
-        try:
-            r = session.get(base + "/databases", timeout=30)
-            r.raise_for_status()
-            data = r.json()
-        finally:
-            try:
-                session.close()
-            except Exception:
-                pass
 
-        dbs = data.get("Databases") or []
-        info = next((it for it in dbs if (it.get("Name") or "") == db_name), None)
-        if not info:
-            return ("notfound", None, None, None, None, None)
+def _fetch_databases(ctx, timeout=30):
+    """One GET /databases: {name: database info} for every database on the node."""
+    # retries are driven by retry_until, so this poll must not retry on its own
+    r = ctx.http(retries=0).get(ctx.base_url() + "/databases", timeout=timeout)
+    r.raise_for_status()
+    dbs = (r.json() or {}).get("Databases") or []
+    return dict((d.get("Name"), d) for d in dbs if d.get("Name"))
 
-        if info.get("Disabled") is True:
-            return ("disabled", None, None, None, None, None)
 
-        rf = info.get("ReplicationFactor")
-        try:
-            rf = int(rf) if rf is not None else None
-        except Exception:
-            rf = None
-        if rf == 1:
-            return ("rf1", None, None, None, None, None)
+def _evaluate_group(info, excluded_tag):
+    """Evaluate one database group from its /databases entry (no I/O)."""
+    if not info:
+        return {"state": "notfound"}
 
-        topo = info.get("NodesTopology") or {}
-        members = topo.get("Members") or []
-        promotables = topo.get("Promotables") or []
-        rehabs = topo.get("Rehabs") or []
-        status = topo.get("Status") or {}
-
-        tags = sorted(set(pluck_tags(members) + pluck_tags(promotables) + pluck_tags(rehabs)))
-        ok_tags, hard_errors, non_ignored_errors = _scan_status(status, tags, excluded_tag)
-        rehab_tags = set(pluck_tags(rehabs))
-        return ("ok", tags, ok_tags, (hard_errors, non_ignored_errors), rehab_tags, status)
+    if info.get("Disabled") is True:
+        return {"state": "disabled"}
 
+    rf = info.get("ReplicationFactor")
     try:
-        state, tags, ok_tags, errs, rehabs, status = _eval_once()
-    except Exception as e:
-        return False, "failed to read /databases: {}".format(e)
+        rf = int(rf) if rf is not None else None
+    except Exception:
+        rf = None
+    if rf == 1:
+        return {"state": "rf1"}
+
+    topo = info.get("NodesTopology") or {}
+    members = topo.get("Members") or []
+    promotables = topo.get("Promotables") or []
+    rehabs = topo.get("Rehabs") or []
+    status = topo.get("Status") or {}
+
+    tags = sorted(set(pluck_tags(members) + pluck_tags(promotables) + pluck_tags(rehabs)))
+    ok_tags, hard_errors, non_ignored_errors = _scan_status(status, tags, excluded_tag)
+    return {
+        "state": "ok",
+        "tags": tags,
+        "ok_tags": ok_tags,
+        "hard_errors": hard_errors,
+        "non_ignored_errors": non_ignored_errors,
+        "rehab_tags": set(pluck_tags(rehabs)),
+        "status": status,
+    }
 
-    if state == "notfound":
+
+def _skipped_or_missing(ev):
+    if ev["state"] == "notfound":
         return False, "database_not_found_in_/databases"
-    if state == "disabled":
+    if ev["state"] == "disabled":
         return True, {"skipped": "disabled"}
-    if state == "rf1":
+    if ev["state"] == "rf1":
         return True, {"skipped": "rf=1"}
+    return None
+
+
+def _judge_group(db_name, ev, recheck, excluded_tag):
+    """
+    Turn a group evaluation into (ok, detail). `recheck` is the evaluation from the
+    second snapshot, present only for groups whose first evaluation had hard errors.
+    """
+    verdict = _skipped_or_missing(ev)
+    if verdict is not None:
+        return verdict
 
     fail_fast = excluded_tag is not None
-    hard_errors, non_ignored_errors = errs
-
-    if hard_errors:
-        time.sleep(2)
-        state2, tags2, ok_tags2, errs2, rehabs2, status2 = _eval_once()
-        if state2 == "notfound":
-            return False, "database_not_found_in_/databases"
-        if state2 == "disabled":
-            return True, {"skipped": "disabled"}
-        if state2 == "rf1":
-            return True, {"skipped": "rf=1"}
-
-        hard_errors2, non_ignored_errors2 = errs2
-        ok_tags, tags = ok_tags2, tags2
-
-        if hard_errors2:
-            n = hard_errors2[0]
+    tags, ok_tags = ev["tags"], ev["ok_tags"]
+
+    if ev["hard_errors"]:
+        verdict = _skipped_or_missing(recheck)
+        if verdict is not None:
+            return verdict
+
+        tags, ok_tags = recheck["tags"], recheck["ok_tags"]
+
+        if recheck["hard_errors"]:
+            n = recheck["hard_errors"][0]
             if fail_fast:
                 raise BreakRetry("database_load_error", {"db": db_name, "node": n["tag"], "error": n["error"]})
             return False, {"db": db_name, "node": n["tag"], "error": n["error"], "reason": "load_error"}
 
         persistent_rehab = [
-            t for t in (rehabs2 or [])
+            t for t in (recheck["rehab_tags"] or [])
             if t != excluded_tag and "node in rehabilitation"
-            in str((status2 or {}).get(t, {}).get("LastError") or "").lower()
+            in str((recheck["status"] or {}).get(t, {}).get("LastError") or "").lower()
         ]
         if persistent_rehab:
             node = sorted(persistent_rehab)[0]
@@ -301,8 +374,8 @@ def _db_has_usable_member(ctx, db_name, excluded_tag):
     if ok_tags:
         return True, {"members": tags or [], "excluded": excluded_tag, "ok_on": ok_tags}
 
-    if non_ignored_errors:
-        n = non_ignored_errors[0]
+    if ev["non_ignored_errors"]:
+        n = ev["non_ignored_errors"][0]
         if fail_fast:
             raise BreakRetry("database_load_error", {"db": db_name, "node": n["tag"], "error": n["error"]})
         return False, {"db": db_name, "node": n["tag"], "error": n["error"], "reason": "load_error"}
@@ -314,6 +387,48 @@ def _db_has_usable_member(ctx, db_name, excluded_tag):
     }
 
 
+def _check_all_databases_online(ctx, excluded_tag, sleep=time.sleep, timeout=30):
+    """
+    One poll: take a single /databases snapshot, evaluate every group in memory,
+    and take one more snapshot only if some groups showed hard load errors.
+    """
+    try:
+        snapshot = _fetch_databases(ctx, timeout=timeout)
+    except Exception as e:
+        return False, "failed to list databases: {}".format(e)
+
+    evaluations = dict((name, _evaluate_group(info, excluded_tag)) for name, info in snapshot.items())
+
+    rechecks = {}
+    hard = [name for name, ev in evaluations.items() if ev.get("hard_errors")]
+    if hard:
+        sleep(HARD_ERROR_RECHECK_SECONDS)
+        try:
+            second = _fetch_databases(ctx, timeout=timeout)
+        except Exception as e:
+            return False, "failed to read /databases: {}".format(e)
+        for name in hard:
+            rechecks[name] = _evaluate_group(second.get(name), excluded_tag)
+
+    failing = {}
+    for name, ev in evaluations.items():
+        try:
+            ok, detail = _judge_group(name, ev, rechecks.get(name), excluded_tag)
+        except BreakRetry:
+            raise
+
+        except Exception as e:
+            failing[name] = "failed to evaluate database: {}".format(e)
+            continue
+
+        if not ok and not (isinstance(detail, dict) and detail.get("skipped") == "rf=1"):
+            failing[name] = detail
+
+    if failing:
+        return False, {"failing": failing, "checked": len(evaluations)}
+    return True, {"checked": len(evaluations)}
+
+
 def _is_hard_load_error(err):
     if not err:
         return False
@@ -363,3 +478,253 @@ def hostname_is_ip(url):
         return True
     except Exception:
         return False
+
+
+# ---------------------------------------------------------------------------
+# Threshold checks: one evaluation per attempt, driven by retry_until until the
+# node (or cluster) is within every threshold or the time window expires.
+# ---------------------------------------------------------------------------
+
+DEFAULT_THRESHOLDS = {
+    "max_stale_indexes": 0,
+    "max_replication_lag": 1000,
+    "min_free_disk_ratio": 0.2,
+    "max_memory_percent": 90,
+    "max_cpu_percent": 80,
+    "max_latency_ms": 500,
+}
+
+LATENCY_SAMPLES = 3
+
+
+def normalize_thresholds(thresholds):
+    """Merge user thresholds over the defaults. Returns (ok, merged, err)."""
+    unknown = sorted(set(thresholds or {}) - set(DEFAULT_THRESHOLDS))
+    if unknown:
+        return False, None, "Unknown thresholds: {}. Allowed: {}.".format(
+            ", ".join(unknown), ", ".join(sorted(DEFAULT_THRESHOLDS)))
+    merged = dict(DEFAULT_THRESHOLDS)
+    for key, value in (thresholds or {}).items():
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return False, None, "Threshold {} must be a number, got {!r}.".format(key, value)
+        if number < 0:
+            return False, None, "Threshold {} must not be negative.".format(key)
+        merged[key] = number
+    return True, merged, None
+
+
+def _get_json(session, url, timeout, params=None):
+    r = session.get(url, params=params, timeout=timeout)
+    if r.status_code == 404:
+        raise BreakRetry("endpoint not available on this server: {}".format(url))
+    if not (200 <= r.status_code < 300):
+        raise _requests().HTTPError("HTTP {} from {}".format(r.status_code, url))
+    return r.json() or {}
+
+
+def fetch_server_metrics(session, base_url, timeout=30):
+    """GET /admin/monitoring/v1/server: CPU, memory and disk metrics of the node."""
+    return _get_json(session, _base(base_url) + "/admin/monitoring/v1/server", timeout)
+
+
+def fetch_database_metrics(session, base_url, timeout=30):
+    """GET /admin/monitoring/v1/databases: {name: metrics} for every database on the node."""
+    data = _get_json(session, _base(base_url) + "/admin/monitoring/v1/databases", timeout)
+    return dict((d.get("DatabaseName"), d) for d in (data.get("Results") or []) if d.get("DatabaseName"))
+
+
+def _over(value, limit):
+    return value is not None and limit is not None and value > limit
+
+
+def check_index_staleness(session, base_url, thresholds, timeout=30):
+    try:
+        metrics = fetch_database_metrics(session, base_url, timeout=timeout)
+    except _requests().RequestException as e:
+        return False, str(e)
+
+    stale = dict(
+        (name, (m.get("Indexes") or {}).get("StaleCount") or 0) for name, m in metrics.items()
+    )
+    stale = dict((name, count) for name, count in stale.items() if count)
+    total = sum(stale.values())
+    detail = {"stale_indexes": total, "databases": stale, "limit": thresholds["max_stale_indexes"]}
+    return not _over(total, thresholds["max_stale_indexes"]), detail
+
+
+def parse_change_vector(change_vector):
+    """'A:12-dbid1, B:7-dbid2' -> {'dbid1': 12, 'dbid2': 7}"""
+    out = {}
+    for entry in (change_vector or "").split(","):
+        entry = entry.strip()
+        if ":" not in entry or "-" not in entry:
+            continue
+        etag, _, db_id = entry.split(":", 1)[1].partition("-")
+        try:
+            out[db_id] = max(out.get(db_id, 0), int(etag))
+        except ValueError:
+            continue
+    return out
+
+
+def replication_lag(vectors):
+    """
+    Given {member: parsed change vector}, return {member: lag}, where lag is the
+    number of changes the member is behind the most advanced member, summed
+    over every database id.
+    """
+    heads = {}
+    for vector in vectors.values():
+        for db_id, etag in vector.items():
+            heads[db_id] = max(heads.get(db_id, 0), etag)
+    return dict(
+        (member, sum(head - vector.get(db_id, 0) for db_id, head in heads.items()))
+        for member, vector in vectors.items()
+    )
+
+
+def _database_change_vector(session, node_url, db_name, timeout):
+    stats = _get_json(session, _base(node_url) + "/databases/{}/stats".format(db_name), timeout)
+    return stats.get("DatabaseChangeVector") or ""
+
+
+def check_replication_lag(session, base_url, thresholds, timeout=30, node_urls=None, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Compare the database change vector of every member of every replicated
+    database group. `node_urls` maps node tags to URLs (cluster topology).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    try:
+        groups = _get_json(session, _base(base_url) + "/databases", timeout).get("Databases") or []
+    except _requests().RequestException as e:
+        return False, str(e)
+
+    targets = []
+    errors = {}
+    for info in groups:
+        members = pluck_tags((info.get("NodesTopology") or {}).get("Members"))
+        if len(members) < 2 or info.get("Disabled"):
+            continue
+        for tag in members:
+            url = (node_urls or {}).get(tag)
+            if url:
+                targets.append((info.get("Name"), tag, url))
+            else:
+                # a member that cannot be asked is not known to have caught up
+                errors.setdefault(info.get("Name"), {})[tag] = "no URL for node {} in the cluster topology".format(tag)
+
+    vectors = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(targets) or 1))) as pool:
+        futures = [
+            (db, tag, pool.submit(_database_change_vector, session, url, db, timeout))
+            for db, tag, url in targets
+        ]
+        for db, tag, future in futures:
+            try:
+                vectors.setdefault(db, {})[tag] = parse_change_vector(future.result())
+            except Exception as e:
+                errors.setdefault(db, {})[tag] = str(e)
+
+    lagging = {}
+    for db, by_member in vectors.items():
+        lags = replication_lag(by_member)
+        if _over(max(lags.values()), thresholds["max_replication_lag"]):
+            lagging[db] = lags
+
+    detail = {
+        "databases": len(vectors),
+        "lagging": lagging,
+        "limit": thresholds["max_replication_lag"],
+    }
+    if errors:
+        detail["errors"] = errors
+    return not lagging and not errors, detail
+
+
+def check_disk_space(session, base_url, thresholds, timeout=30):
+    try:
+        server = fetch_server_metrics(session, base_url, timeout=timeout)
+        databases = fetch_database_metrics(session, base_url, timeout=timeout)
+    except _requests().RequestException as e:
+        return False, str(e)
+
+    free_mb = (server.get("Disk") or {}).get("TotalFreeSpaceInMb")
+    used_mb = sum(
+        (m.get("Storage") or {}).get("TotalAllocatedStorageFileInMb") or 0 for m in databases.values()
+    )
+    if free_mb is None:
+        return False, "server metrics do not report free disk space"
+    ratio = round(float(free_mb) / used_mb, 2) if used_mb else None
+    detail = {
+        "free_mb": free_mb,
+        "databases_mb": used_mb,
+        "free_ratio": ratio,
+        "limit": thresholds["min_free_disk_ratio"],
+    }
+    return ratio is None or ratio >= thresholds["min_free_disk_ratio"], detail
+
+
+def check_resource_usage(session, base_url, thresholds, timeout=30):
+    try:
+        server = fetch_server_metrics(session, base_url, timeout=timeout)
+    except _requests().RequestException as e:
+        return False, str(e)
+
+    cpu = (server.get("Cpu") or {}).get("ProcessUsage")
+    memory = server.get("Memory") or {}
+    physical = memory.get("PhysicalMemoryInMb")
+    allocated = memory.get("AllocatedMemoryInMb")
+    memory_percent = round(100.0 * allocated / physical, 1) if physical and allocated is not None else None
+
+    detail = {
+        "cpu_percent": cpu,
+        "memory_percent": memory_percent,
+        "low_memory_severity": memory.get("LowMemorySeverity"),
+        "limits": {"cpu": thresholds["max_cpu_percent"], "memory": thresholds["max_memory_percent"]},
+    }
+    ok = not _over(cpu, thresholds["max_cpu_percent"]) and not _over(memory_percent, thresholds["max_memory_percent"])
+    return ok, detail
+
+
+def check_request_latency(session, base_url, thresholds, timeout=30, samples=LATENCY_SAMPLES):
+    """Median latency of a few /setup/alive round trips over the pooled session."""
+    latencies = []
+    for _ in range(samples):
+        ok, detail = get_setup_alive(session, base_url, timeout=timeout)
+        if not ok:
+            return False, detail
+        latencies.append(detail["latency_ms"])
+    latencies.sort()
+    median = latencies[len(latencies) // 2]
+    detail = {"latency_ms": median, "samples": latencies, "limit": thresholds["max_latency_ms"]}
+    return not _over(median, thresholds["max_latency_ms"]), detail
+
+
+THRESHOLD_CHECKS = {
+    "indexes_non_stale": check_index_staleness,
+    "replication_caught_up": check_replication_lag,
+    "disk_space": check_disk_space,
+    "resource_usage": check_resource_usage,
+    "request_latency": check_request_latency,
+}
+
+
+def wait_for_threshold(check, session, base_url, thresholds, max_time_to_wait, retry_interval_seconds,
+                       strategy=None, sleep=None, on_attempt=None, **kwargs):
+    return retry_until(
+        THRESHOLD_CHECKS[check],
+        max_time_to_wait,
+        retry_interval_seconds,
+        session,
+        base_url,
+        thresholds,
+        timeout=30,
+        strategy=strategy,
+        timeout_kwarg="timeout",
+        sleep=sleep,
+        on_attempt=on_attempt,
+        **kwargs
+    )
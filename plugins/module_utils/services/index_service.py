@@ -7,8 +7,20 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+import fnmatch
+import hashlib
+import json
 import sys
 from ansible_collections.ravendb.ravendb.plugins.module_utils.core import messages as msg
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core.configuration import normalize_str_values
+from ansible_collections.ravendb.ravendb.plugins.module_utils.services.retry_service import retry_until, BreakRetry
+
+
+# name prefix of the side-by-side index the server builds while replacing a definition
+REPLACEMENT_PREFIX = "ReplacementOf/"
+
+# running statuses in which a stale index will never catch up on its own
+STALLED_STATUSES = ("Paused", "Disabled")
 
 
 def _normalize_deployment_mode_value(value):
@@ -36,100 +48,309 @@ def _to_deployment_mode_enum(value):
     raise ValueError("Unknown deployment_mode: {}".format(value))
 
 
-def create_dynamic_index(name, definition):
-    """Dynamically create a single-map index class based on the given definition."""
-    from ravendb import AbstractIndexCreationTask
+class IndexSnapshot(object):
+    """All index definitions of one database, fetched once and indexed by name."""
 
-    class DynamicIndex(AbstractIndexCreationTask):
-        def __init__(self):
-            super(DynamicIndex, self).__init__()
-            self.map = definition.get("map")[0]
-            reduce_def = definition.get("reduce")
-            if reduce_def:
-                self.reduce = reduce_def
+    def __init__(self, definitions):
+        self.definitions = list(definitions or [])
+        self.by_name = dict((getattr(d, "name", None), d) for d in self.definitions)
 
-            dm = definition.get("deployment_mode") or definition.get("DeploymentMode")
-            if dm:
-                self.deployment_mode = _to_deployment_mode_enum(dm)
+    def names(self):
+        return [getattr(d, "name", None) for d in self.definitions]
 
-    DynamicIndex.__name__ = name
-    return DynamicIndex
 
+def _snapshot_cache(ctx):
+    cache = getattr(ctx, "cache", None)
+    if cache is None:
+        cache = {}
+        ctx.cache = cache
+    return cache.setdefault("index_snapshots", {})
 
-def create_dynamic_multimap_index(name, definition):
-    """Dynamically create a multi-map index class based on the given definition."""
-    from ravendb.documents.indexes.abstract_index_creation_tasks import AbstractMultiMapIndexCreationTask
 
-    class DynamicIndex(AbstractMultiMapIndexCreationTask):
-        def __init__(self):
-            super(DynamicIndex, self).__init__()
-            maps_def = definition.get("map") or []
-            for map_def in maps_def:
-                self._add_map(map_def)
+def snapshot(ctx, db_name):
+    """
+    Return the cached IndexSnapshot for db_name, loading it with a single
+    GetIndexesOperation on first use. Writes through this service invalidate it.
+    """
+    cache = _snapshot_cache(ctx)
+    snap = cache.get(db_name)
+    if snap is None:
+        from ravendb.documents.operations.indexes import GetIndexesOperation
+        defs = ctx.maintenance_for_db(db_name).send(GetIndexesOperation(0, sys.maxsize)) or []
+        snap = IndexSnapshot(defs)
+        cache[db_name] = snap
+    return snap
 
-            reduce_def = definition.get("reduce")
-            if reduce_def:
-                self.reduce = reduce_def
 
-            dm = definition.get("deployment_mode") or definition.get("DeploymentMode")
-            if dm:
-                self.deployment_mode = _to_deployment_mode_enum(dm)
-
-    DynamicIndex.__name__ = name
-    return DynamicIndex
+def invalidate_snapshot(ctx, db_name):
+    _snapshot_cache(ctx).pop(db_name, None)
 
 
 def list_definitions(ctx, db_name):
-    from ravendb.documents.operations.indexes import GetIndexesOperation
-    return ctx.maintenance_for_db(db_name).send(GetIndexesOperation(0, sys.maxsize)) or []
+    return list(snapshot(ctx, db_name).definitions)
 
 
 def get_definition(ctx, db_name, index_name):
-    defs = list_definitions(ctx, db_name)
-    for d in defs:
-        if getattr(d, "name", None) == index_name:
-            return d
-    return None
+    return snapshot(ctx, db_name).by_name.get(index_name)
+
+
+def index_exists(ctx, db_name, index_name):
+    return index_name in snapshot(ctx, db_name).by_name
+
+
+# punctuation around which whitespace carries no meaning; '+', '-' and '/' are left
+# alone so that e.g. "a - -b" or a JS regex literal keep their original spacing
+_TIGHT_PUNCTUATION = frozenset("(){}[],;:.=<>!&|?*%^~")
+
+# IndexDefinition fields that come from the declared map/reduce definition
+DEFINITION_FIELDS = ("maps", "reduce", "deployment_mode")
+
+
+def _skip_string_literal(code, i):
+    """Return the index just past the string literal starting at code[i]."""
+    quote = code[i]
+    verbatim = quote == '"' and i > 0 and code[i - 1] == "@"
+    n = len(code)
+    j = i + 1
+    while j < n:
+        if code[j] == "\\" and not verbatim:
+            j += 2
+            continue
+        if code[j] == quote:
+            if verbatim and j + 1 < n and code[j + 1] == quote:
+                j += 2
+                continue
+            return j + 1
+        j += 1
+    return n
+
+
+def canonical_source(code):
+    """
+    Canonical form of LINQ/JavaScript index code.
+    Comments outside string literals are dropped, whitespace runs collapse to a
+    single space, and spaces next to punctuation are removed. String literals are kept verbatim.
+    """
+    if code is None:
+        return None
+
+    out = []
+    pending_space = False
+    i, n = 0, len(code)
+
+    def emit(chunk):
+        if pending_space and out and out[-1][-1] not in _TIGHT_PUNCTUATION and chunk[0] not in _TIGHT_PUNCTUATION:
+            out.append(" ")
+        out.append(chunk)
+
+    while i < n:
+        c = code[i]
+        if c in "\"'`":
+            j = _skip_string_literal(code, i)
+            emit(code[i:j])
+            pending_space, i = False, j
+        elif code.startswith("//", i):
+            j = code.find("\n", i)
+            pending_space, i = True, (n if j < 0 else j)
+        elif code.startswith("/*", i):
+            j = code.find("*/", i + 2)
+            pending_space, i = True, (n if j < 0 else j + 2)
+        elif c.isspace():
+            pending_space, i = True, i + 1
+        else:
+            emit(c)
+            pending_space, i = False, i + 1
+
+    return "".join(out)
+
+
+def _enum_text(value, default=None):
+    if value is None:
+        return default
+    value = getattr(value, "value", value)
+    text = str(value).strip().lower()
+    return text or default
+
+
+def _canonical_fields(fields):
+    # the client parses fetched "Fields" lazily; only a real dict can be compared
+    if not isinstance(fields, dict):
+        return {}
+    out = {}
+    for name, options in fields.items():
+        to_json = getattr(options, "to_json", None)
+        raw = to_json() if callable(to_json) else options
+        out[str(name)] = json.loads(json.dumps(raw, sort_keys=True, default=_enum_text))
+    return out
+
+
+def canonical_definition(definition):
+    """
+    Canonical, JSON-serializable view of an IndexDefinition.
+    Two definitions with the same canonical form index the same way.
+    """
+    maps = getattr(definition, "maps", None) or []
+    sources = getattr(definition, "additional_sources", None) or {}
+    return {
+        "maps": sorted(canonical_source(m) for m in maps),
+        "reduce": canonical_source(getattr(definition, "reduce", None)) or None,
+        "fields": _canonical_fields(getattr(definition, "fields", None)),
+        "configuration": normalize_str_values(getattr(definition, "configuration", None) or {}),
+        "additional_sources": dict((str(k), canonical_source(v)) for k, v in sources.items()),
+        "priority": _enum_text(getattr(definition, "priority", None), "normal"),
+        "lock_mode": _enum_text(getattr(definition, "lock_mode", None), "unlock"),
+        "deployment_mode": _normalize_deployment_mode_value(getattr(definition, "deployment_mode", None)),
+    }
+
+
+def desired_canonical(existing_index, definition=None, configuration=None):
+    """
+    Canonical form the index would have after applying the declared raw `definition`
+    (map/reduce/deployment_mode) and `configuration` on top of `existing_index`.
+    """
+    canon = canonical_definition(existing_index)
+    if definition:
+        canon["maps"] = sorted(canonical_source(m) for m in definition.get("map") or [])
+        canon["reduce"] = canonical_source(definition.get("reduce")) or None
+        dm = _normalize_deployment_mode_value(definition.get("deployment_mode") or definition.get("DeploymentMode"))
+        if dm is not None:
+            canon["deployment_mode"] = dm
+    if configuration:
+        cfg = dict(canon["configuration"])
+        cfg.update(normalize_str_values(configuration))
+        canon["configuration"] = cfg
+    return canon
+
+
+def fingerprint(canonical):
+    """SHA-256 of a canonical definition."""
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def index_changes(existing_index, definition=None, configuration=None):
+    """
+    Return the sorted list of canonical fields that differ between the existing
+    index and the declared state; empty when their fingerprints are equal.
+    """
+    current = canonical_definition(existing_index)
+    desired = desired_canonical(existing_index, definition, configuration)
+    if fingerprint(current) == fingerprint(desired):
+        return []
+    return sorted(k for k in desired if desired[k] != current.get(k))
 
 
 def index_matches(existing_index, definition):
-    """Check if an existing index matches the expected definition (map/reduce)."""
+    """Check if an existing index matches the expected definition (map/reduce/deployment mode)."""
     if definition is None:
         return True
-
-    existing_maps = set(map(str.strip, existing_index.maps)) if getattr(existing_index, "maps", None) else set()
-    existing_reduce = getattr(existing_index, "reduce", None)
-
-    expected_maps = set(map(str.strip, definition.get("map", [])))
-    normalized_existing_reduce = existing_reduce.strip() if isinstance(existing_reduce, str) and existing_reduce else None
-    normalized_expected_reduce = (definition.get("reduce") or "").strip()
-    if not normalized_expected_reduce:
-        normalized_expected_reduce = None
-
-    if not (existing_maps == expected_maps and normalized_existing_reduce == normalized_expected_reduce):
-        return False
-
-    desired_dm = _normalize_deployment_mode_value(definition.get("deployment_mode") or definition.get("DeploymentMode"))
-    if desired_dm is None:
-        return True
-
-    existing_dm = _normalize_deployment_mode_value(getattr(existing_index, "deployment_mode", None))
-    return desired_dm == existing_dm
-
-
-def create_index(ctx, db_name, name, definition):
-    """Create an index, handling both single-map and multi-map definitions."""
-    if len(definition.get("map")) > 1:
-        DynamicIndexClass = create_dynamic_multimap_index(name, definition)
+    return not index_changes(existing_index, definition)
+
+
+# existing IndexDefinition attributes carried over verbatim when a definition is rebuilt
+_PRESERVED_ATTRS = (
+    "priority", "lock_mode", "additional_sources", "additional_assemblies",
+    "output_reduce_to_collection", "reduce_output_index",
+    "pattern_for_output_reduce_to_collection_references", "pattern_references_collection_name",
+)
+
+
+def configuration_of(definition):
+    """Return the configuration of an IndexDefinition as a normalized dict."""
+    if not definition:
+        return {}
+    return normalize_str_values(getattr(definition, "configuration", None) or {})
+
+
+def build_index_definition(name, maps, reduce=None, configuration=None, deployment_mode=None):
+    """Build a minimal IndexDefinition (name, maps, reduce, configuration, deployment mode)."""
+    from ravendb.documents.indexes.definitions import IndexDefinition
+    idx = IndexDefinition()
+    idx.name = name
+    if maps:
+        if isinstance(maps, set):
+            idx.maps = maps
+        elif isinstance(maps, (list, tuple)):
+            idx.maps = set(maps)
+        else:
+            raise TypeError("maps must be a list/tuple/set of strings")
+    if reduce:
+        idx.reduce = reduce
+    cfg = normalize_str_values(configuration or {})
+    if cfg:
+        idx.configuration = cfg
+    if deployment_mode:
+        idx.deployment_mode = _to_deployment_mode_enum(deployment_mode)
+
+    return idx
+
+
+def build_merged_definition(index_name, existing, definition=None, configuration=None):
+    """
+    Build the full IndexDefinition to PUT for an index.
+    Maps/reduce/deployment mode come from `definition` (a raw dict) when given,
+    otherwise from the `existing` server definition; configuration is the existing
+    configuration overlaid with `configuration`. Everything else (priority, lock mode,
+    additional sources, field options, ...) is carried over from `existing`.
+    """
+    merged_cfg = configuration_of(existing)
+    merged_cfg.update(normalize_str_values(configuration or {}))
+
+    if definition:
+        maps = list(definition.get("map") or [])
+        reduce = definition.get("reduce")
+        dm = definition.get("deployment_mode") or definition.get("DeploymentMode")
     else:
-        DynamicIndexClass = create_dynamic_index(name, definition)
-    index = DynamicIndexClass()
-    index.execute(ctx.store, db_name)
+        maps = list(existing.maps) if getattr(existing, "maps", None) else []
+        reduce = getattr(existing, "reduce", None)
+        dm = None
+
+    if dm is None and existing is not None:
+        dm = _normalize_deployment_mode_value(getattr(existing, "deployment_mode", None))
+
+    new_def = build_index_definition(index_name, maps, reduce, merged_cfg, deployment_mode=dm)
+    if existing is not None:
+        for attr in _PRESERVED_ATTRS:
+            value = getattr(existing, attr, None)
+            if value is not None:
+                setattr(new_def, attr, value)
+        if isinstance(getattr(existing, "fields", None), dict):
+            new_def.fields = existing.fields
+    return new_def
+
+
+def put_index_definitions(ctx, db_name, index_definitions):
+    """PUT one or more complete definitions in a single PutIndexesOperation, handling older signatures."""
+    from ravendb.documents.operations.indexes import PutIndexesOperation
+    defs = list(index_definitions or [])
+    if not defs:
+        return None
+    m = ctx.maintenance_for_db(db_name)
+    try:
+        try:
+            op = PutIndexesOperation(*defs)
+        except TypeError:
+            op = PutIndexesOperation(defs)
+        return m.send(op)
+    finally:
+        invalidate_snapshot(ctx, db_name)
+
+
+def create_index(ctx, db_name, name, definition, configuration=None, existing=None):
+    """
+    Create or replace an index with a single PUT of one complete IndexDefinition
+    (maps, reduce, configuration and deployment mode, single- or multi-map alike).
+    When `existing` is given, its configuration and other attributes are merged in.
+    """
+    put_index_definitions(ctx, db_name, [build_merged_definition(name, existing, definition, configuration)])
 
 
 def delete_index(ctx, db_name, name):
     from ravendb.documents.operations.indexes import DeleteIndexOperation
-    ctx.maintenance_for_db(db_name).send(DeleteIndexOperation(name))
+    try:
+        ctx.maintenance_for_db(db_name).send(DeleteIndexOperation(name))
+    finally:
+        invalidate_snapshot(ctx, db_name)
 
 
 def get_index_state(ctx, db_name, name):
@@ -152,6 +373,7 @@ def enable_index(ctx, db_name, name, cluster_wide, check_mode):
         return True, msg.idx_would_enable(name, cluster_wide)
 
     ctx.maintenance_for_db(db_name).send(EnableIndexOperation(name, cluster_wide))
+    invalidate_snapshot(ctx, db_name)
     return True, msg.idx_enabled(name, cluster_wide=cluster_wide)
 
 
@@ -168,6 +390,7 @@ def disable_index(ctx, db_name, name, cluster_wide, check_mode):
         return True, msg.idx_would_disable(name, cluster_wide)
 
     ctx.maintenance_for_db(db_name).send(DisableIndexOperation(name, cluster_wide))
+    invalidate_snapshot(ctx, db_name)
     return True, msg.idx_disabled(name, cluster_wide=cluster_wide)
 
 
@@ -229,3 +452,193 @@ def apply_mode(ctx, db_name, name, mode, cluster_wide, check_mode):
     if mode == "reset":
         return reset_index(ctx, db_name, name, check_mode)
     return False, "Unsupported mode '{}' specified.".format(mode)
+
+
+# selector matching every index of the database in bulk mode operations
+ALL_INDEXES = "all"
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+def is_glob(pattern):
+    return any(c in _GLOB_CHARS for c in pattern)
+
+
+def select_index_names(names, patterns):
+    """
+    Resolve exact names, globs and "all" against existing index names, keeping
+    the database's order. Returns (selected, missing) where `missing` are exact
+    names that do not exist; a glob matching nothing is not an error.
+    """
+    if ALL_INDEXES in patterns:
+        return list(names), []
+    wanted = set()
+    missing = []
+    for pattern in patterns:
+        if is_glob(pattern):
+            wanted.update(fnmatch.filter(names, pattern))
+        elif pattern in names:
+            wanted.add(pattern)
+        else:
+            missing.append(pattern)
+    return [n for n in names if n in wanted], missing
+
+
+def get_indexing_status(ctx, db_name):
+    """Return {index name: IndexRunningStatus} from one GetIndexingStatusOperation."""
+    from ravendb.documents.operations.indexes import GetIndexingStatusOperation
+    status = ctx.maintenance_for_db(db_name).send(GetIndexingStatusOperation())
+    return dict((x.name, x.status) for x in (getattr(status, "indexes", None) or []))
+
+
+def needs_mode_change(running_status, mode):
+    """Whether an index in `running_status` must be acted on to reach `mode`."""
+    from ravendb.documents.indexes.definitions import IndexRunningStatus
+    if mode == "paused":
+        return running_status in (IndexRunningStatus.RUNNING, IndexRunningStatus.PENDING)
+    if mode == "resumed":
+        return running_status == IndexRunningStatus.PAUSED
+    if mode == "disabled":
+        return running_status != IndexRunningStatus.DISABLED
+    if mode == "enabled":
+        return running_status == IndexRunningStatus.DISABLED
+    return True
+
+
+def apply_bulk_mode(ctx, db_name, names, mode, cluster_wide, database_wide):
+    """
+    Apply `mode` to `names`. With database_wide=True, pause/resume are sent as a
+    single StopIndexingOperation/StartIndexingOperation for the whole database.
+    """
+    from ravendb.documents.operations.indexes import (
+        StopIndexingOperation, StartIndexingOperation, StopIndexOperation, StartIndexOperation,
+        EnableIndexOperation, DisableIndexOperation, ResetIndexOperation
+    )
+    m = ctx.maintenance_for_db(db_name)
+    if database_wide and mode == "paused":
+        m.send(StopIndexingOperation())
+        return
+    if database_wide and mode == "resumed":
+        m.send(StartIndexingOperation())
+        return
+
+    per_index = {
+        "paused": lambda n: StopIndexOperation(n),
+        "resumed": lambda n: StartIndexOperation(n),
+        "enabled": lambda n: EnableIndexOperation(n, cluster_wide),
+        "disabled": lambda n: DisableIndexOperation(n, cluster_wide),
+        "reset": lambda n: ResetIndexOperation(n),
+    }[mode]
+    try:
+        for name in names:
+            m.send(per_index(name))
+    finally:
+        invalidate_snapshot(ctx, db_name)
+
+
+def _size_bytes(size):
+    if isinstance(size, dict):
+        return size.get("SizeInBytes")
+    return size
+
+
+def summarize_stats(raw):
+    """Flatten one raw IndexStats entry into the fields relevant for capacity planning."""
+    memory = raw.get("Memory") or {}
+    return {
+        "name": raw.get("Name"),
+        "type": raw.get("Type"),
+        "state": raw.get("State"),
+        "status": raw.get("Status"),
+        "priority": raw.get("Priority"),
+        "lock_mode": raw.get("LockMode"),
+        "is_stale": bool(raw.get("IsStale")),
+        "entries_count": raw.get("EntriesCount"),
+        "errors_count": raw.get("ErrorsCount"),
+        "map_attempts": raw.get("MapAttempts"),
+        "map_successes": raw.get("MapSuccesses"),
+        "map_errors": raw.get("MapErrors"),
+        "reduce_attempts": raw.get("ReduceAttempts"),
+        "reduce_successes": raw.get("ReduceSuccesses"),
+        "reduce_errors": raw.get("ReduceErrors"),
+        "mapped_per_second": raw.get("MappedPerSecondRate"),
+        "reduced_per_second": raw.get("ReducedPerSecondRate"),
+        "last_indexing_time": raw.get("LastIndexingTime"),
+        "last_querying_time": raw.get("LastQueryingTime"),
+        "disk_size_bytes": _size_bytes(memory.get("DiskSize")),
+        "memory_allocated_bytes": _size_bytes(memory.get("ThreadAllocations")),
+        "memory_budget_bytes": _size_bytes(memory.get("MemoryBudget")),
+    }
+
+
+def list_index_stats(ctx, db_name):
+    """Statistics of every index in the database from one GetIndexesStatisticsOperation."""
+    from ravendb.documents.operations.indexes import GetIndexesStatisticsOperation
+    raw = ctx.maintenance_for_db(db_name).send(GetIndexesStatisticsOperation()) or []
+    return [summarize_stats(entry) for entry in raw]
+
+
+def fetch_index_progress(ctx, db_name, timeout=30):
+    """
+    Return the raw progress entries of the database's stale indexes
+    (GET /databases/{db}/indexes/progress; the server omits non-stale indexes).
+    """
+    url = "{}/databases/{}/indexes/progress".format(ctx.base_url(), db_name)
+    r = ctx.http().get(url, timeout=timeout)
+    r.raise_for_status()
+    return (r.json() or {}).get("Results") or []
+
+
+def summarize_progress(entry):
+    """Reduce a raw progress entry to processed/total entries, rate (items/s) and ETA."""
+    total = remaining = 0
+    for coll in (entry.get("Collections") or {}).values():
+        total += int(coll.get("TotalNumberOfItems") or 0)
+        remaining += int(coll.get("NumberOfItemsToProcess") or 0)
+    rate = float(entry.get("ProcessedPerSecond") or 0.0)
+    name = entry.get("Name") or ""
+    return {
+        "name": name,
+        "replacement": name.startswith(REPLACEMENT_PREFIX),
+        "stale": bool(entry.get("IsStale", True)),
+        "status": entry.get("IndexRunningStatus"),
+        "processed": max(0, total - remaining),
+        "total": total,
+        "remaining": remaining,
+        "rate": round(rate, 2),
+        "eta_seconds": round(remaining / rate, 1) if rate > 0 else None,
+    }
+
+
+def stale_progress(ctx, db_name, names):
+    """
+    Progress of those `names` that are still stale, each represented by its
+    side-by-side replacement when one is building. One progress request per call.
+    """
+    by_name = dict((e.get("Name"), e) for e in fetch_index_progress(ctx, db_name))
+    out = []
+    for name in names:
+        entry = by_name.get(REPLACEMENT_PREFIX + name) or by_name.get(name)
+        if entry is not None:
+            out.append(summarize_progress(entry))
+    return out
+
+
+def check_non_stale(ctx, db_name, name):
+    """
+    retry_until check: succeed once neither the index nor its side-by-side
+    replacement is stale; otherwise report the progress of the one still building.
+    """
+    stale = stale_progress(ctx, db_name, [name])
+    if not stale:
+        return True, {"name": name, "replacement": False, "stale": False}
+
+    progress = stale[0]
+    if progress["status"] in STALLED_STATUSES:
+        raise BreakRetry(msg.idx_wait_stalled(progress["name"], progress["status"]), detail=progress)
+    return False, progress
+
+
+def wait_for_non_stale(ctx, db_name, name, max_wait, poll_interval):
+    """Poll index progress until the index is non-stale or max_wait elapses."""
+    return retry_until(check_non_stale, max_wait, poll_interval, ctx, db_name, name)
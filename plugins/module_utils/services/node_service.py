@@ -7,13 +7,7 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
-
-def _requests():
-    try:
-        import requests
-        return requests
-    except ImportError:
-        raise RuntimeError("Python 'requests' is required for node operations. Install 'requests'.")
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core.transport import get_transport
 
 
 def node_in_topology(topology, search_tag, search_url):
@@ -46,8 +40,7 @@ def add_node(ctx, tag, url, is_watcher, tls):
     if is_watcher:
         params["watcher"] = "true"
 
-    cert, verify = tls.to_requests_tuple()
-    r = _requests().put(endpoint, params=params, headers={"Content-Type": "application/json"}, cert=cert, verify=verify)
+    r = get_transport(tls).put(endpoint, params=params, headers={"Content-Type": "application/json"})
     if r.status_code not in (200, 201, 204):
         try:
             detail = r.json().get("Message", r.text)
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c), RavenDB
+# GNU General Public License v3.0 or later (see COPYING or
+# https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import json
+import threading
+import time
+
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core.tls import TLSConfig
+
+
+WATCH_ENDPOINT = "/server/notification-center/watch"
+
+# server notifications that can flip a readiness check (database state or topology)
+READINESS_TYPES = frozenset([
+    "DatabaseChanged",
+    "ClusterTopologyChanged",
+])
+
+DEFAULT_CONNECT_TIMEOUT = 5
+
+# minimum seconds between the start of a wait and an early wakeup; notifications
+# arriving inside this window are coalesced into a single re-check
+DEFAULT_MIN_WAKE_INTERVAL = 1.0
+
+# a stream the server keeps dropping is not worth following; fall back to polling
+MAX_DROPS = 3
+
+WAIT_MODE_POLL = "poll"
+WAIT_MODE_EVENTS = "events"
+
+
+def _websocket():
+    try:
+        import websocket
+        return websocket
+    except ImportError:
+        return None
+
+
+def websocket_available():
+    return _websocket() is not None
+
+
+def watch_url(base_url):
+    base = (base_url or "").rstrip("/")
+    if base.startswith("https://"):
+        base = "wss://" + base[len("https://"):]
+    elif base.startswith("http://"):
+        base = "ws://" + base[len("http://"):]
+    return base + WATCH_ENDPOINT
+
+
+def _sslopt(tls, validate_certificate):
+    import ssl
+
+    cert, verify = (tls or TLSConfig()).to_requests_tuple()
+    opts = {}
+    if cert:
+        opts["certfile"] = cert
+    if validate_certificate is False or verify is False:
+        opts["cert_reqs"] = ssl.CERT_NONE
+        opts["check_hostname"] = False
+    elif isinstance(verify, str):
+        opts["ca_certs"] = verify
+    return opts
+
+
+class NotificationWatcher(object):
+    """
+    Follows the server notification stream and acts as the `sleep` of a retry
+    loop: `sleep(seconds)` returns soon after a database or topology change is
+    pushed, instead of after the full interval.
+
+    Wakeups are spaced at least `min_interval` seconds apart: a busy cluster emits
+    a DatabaseChanged for every database, and each wakeup costs the caller a full
+    re-poll of the node it is waiting on. Notifications inside the window are
+    coalesced into one wakeup. Only typed notifications of `types` count.
+
+    When websocket-client is missing or the stream cannot be kept open, `sleep`
+    degrades to time.sleep, i.e. the regular polling path. While disconnected,
+    every sleep tries to reopen the stream and then waits like any other sleep.
+    """
+
+    def __init__(self, base_url, tls=None, validate_certificate=None, types=READINESS_TYPES,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, min_interval=DEFAULT_MIN_WAKE_INTERVAL):
+        self.url = watch_url(base_url)
+        self.tls = tls
+        self.validate_certificate = validate_certificate
+        self.types = frozenset(types or ())
+        self.connect_timeout = connect_timeout
+        self.min_interval = max(0.0, float(min_interval))
+        self.events = 0
+        self.wakeups = 0
+        self.drops = 0
+        self.error = None
+        self._ws = None
+        self._thread = None
+        self._closed = False
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def connected(self):
+        return self._ws is not None
+
+    @property
+    def mode(self):
+        return WAIT_MODE_EVENTS if self.connected else WAIT_MODE_POLL
+
+    def start(self):
+        """Open the stream. Returns False (and keeps polling) when it is unavailable."""
+        return self._connect(self.connect_timeout)
+
+    def _connect(self, timeout):
+        websocket = _websocket()
+        if websocket is None:
+            self.error = "websocket-client is not installed"
+            return False
+        if self._closed or self.drops >= MAX_DROPS:
+            return False
+        try:
+            ws = websocket.create_connection(
+                self.url,
+                timeout=max(0.1, timeout),
+                sslopt=_sslopt(self.tls, self.validate_certificate),
+            )
+            ws.settimeout(None)
+        except Exception as e:
+            self.error = str(e)
+            return False
+
+        with self._lock:
+            self._ws = ws
+        self.error = None
+        self._thread = threading.Thread(target=self._read, args=(ws,))
+        self._thread.daemon = True
+        self._thread.start()
+        return True
+
+    def _read(self, ws):
+        while not self._closed:
+            try:
+                raw = ws.recv()
+            except Exception as e:
+                if not self._closed:
+                    self.error = str(e)
+                    self.drops += 1
+                break
+            if self._relevant(raw):
+                self.events += 1
+                self._wake.set()
+
+        with self._lock:
+            if self._ws is ws:
+                self._ws = None
+        # wake the waiter so it can re-check now and fall back to polling
+        self._wake.set()
+
+    def _relevant(self, raw):
+        if not raw:
+            return False
+        try:
+            message = json.loads(raw)
+        except (TypeError, ValueError):
+            return False
+        if not isinstance(message, dict):
+            return False
+        kind = message.get("Type")
+        if not kind:
+            return False
+        return not self.types or kind in self.types
+
+    def sleep(self, seconds):
+        started = time.time()
+        deadline = started + max(0.0, seconds)
+        floor = min(deadline, started + self.min_interval)
+
+        if not self.connected and not self._closed:
+            self._connect(min(max(0.0, seconds), self.connect_timeout))
+
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return
+        if not self.connected:
+            time.sleep(remaining)
+            return
+
+        woke = self._wake.wait(remaining)
+        if woke:
+            # debounce: hold until the floor so a burst of notifications yields one re-check
+            hold = floor - time.time()
+            if hold > 0:
+                time.sleep(hold)
+            if time.time() < deadline:
+                self.wakeups += 1
+        self._wake.clear()
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            ws, self._ws = self._ws, None
+        if ws is not None:
+            try:
+                ws.abort() if hasattr(ws, "abort") else ws.close()
+            except Exception:
+                pass
+        self._wake.set()
+
+    def summary(self):
+        return {"mode": self.mode, "events": self.events, "wakeups": self.wakeups,
+                "drops": self.drops, "error": self.error}
+
+
+def open_watcher(wait_mode, base_url, tls=None, validate_certificate=None, min_interval=DEFAULT_MIN_WAKE_INTERVAL):
+    """Watcher for `wait_mode=events`, or None for plain polling."""
+    if wait_mode != WAIT_MODE_EVENTS:
+        return None
+    watcher = NotificationWatcher(base_url, tls, validate_certificate, min_interval=min_interval)
+    watcher.start()
+    return watcher
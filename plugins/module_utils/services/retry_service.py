@@ -7,39 +7,222 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+import json
+import math
+import random
+import threading
 import time
 
 
+# attempts kept in the returned history; older entries are dropped
+HISTORY_LIMIT = 50
+
+# floor for a per-attempt timeout clipped to the remaining deadline
+MIN_ATTEMPT_TIMEOUT = 1.0
+
+
 class BreakRetry(Exception):
     def __init__(self, message="break", detail=None):
         super().__init__(message)
         self.detail = detail
 
 
-def retry_until(func, max_time_to_wait, interval_seconds, *args, **kwargs):
-    deadline = time.time() + float(max_time_to_wait)
-    attempts = 0
-    last_detail = None
-    last_error = None
+class RetryStrategy(object):
+    """
+    Delay schedule between attempts.
+    The first `fast_attempts` retries wait `fast_interval`; afterwards the delay is
+    either a fixed `interval` or grows exponentially from `fast_interval` (or `interval`
+    when there is no fast phase) up to `interval`. `jitter` spreads each delay by
+    +/- that fraction so that many pollers do not hit a recovering node in lockstep.
+    """
+
+    def __init__(self, interval, exponential=False, fast_attempts=0, fast_interval=0.5,
+                 multiplier=2.0, jitter=0.0, rng=random.random):
+        self.interval = float(interval)
+        self.exponential = bool(exponential)
+        self.fast_attempts = int(fast_attempts)
+        self.fast_interval = min(float(fast_interval), self.interval)
+        self.multiplier = float(multiplier)
+        self.jitter = float(jitter)
+        self.rng = rng
+
+    @classmethod
+    def fixed(cls, interval):
+        return cls(interval)
+
+    @classmethod
+    def adaptive(cls, interval):
+        """Quick first retries, then exponential backoff with jitter capped at `interval`."""
+        return cls(interval, exponential=True, fast_attempts=3, fast_interval=0.5, jitter=0.2)
+
+    @classmethod
+    def named(cls, name, interval):
+        """Strategy for a module's C(fixed)/C(adaptive) option value."""
+        return cls.adaptive(interval) if name == "adaptive" else cls.fixed(interval)
+
+    def delay(self, attempt):
+        """Delay after the `attempt`-th (1-based) failed attempt."""
+        if attempt <= self.fast_attempts:
+            base = self.fast_interval
+        elif self.exponential:
+            start = self.fast_interval if self.fast_attempts else self.interval
+            base = min(self.interval, start * (self.multiplier ** (attempt - self.fast_attempts)))
+        else:
+            base = self.interval
+        if self.jitter:
+            base *= 1.0 - self.jitter + 2.0 * self.jitter * self.rng()
+        return max(0.0, base)
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    # nearest-rank percentile
+    rank = max(1, int(math.ceil(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_stats(latencies):
+    """min/avg/p95/max of round-trip latencies in milliseconds (None when empty)."""
+    values = sorted(latencies)
+    if not values:
+        return {"min": None, "avg": None, "p95": None, "max": None}
+    return {
+        "min": values[0],
+        "avg": round(sum(values) / len(values), 1),
+        "p95": _percentile(values, 95),
+        "max": values[-1],
+    }
+
 
+class AttemptTrace(object):
+    """
+    Appends one JSON line per attempt (and per finished wait) to `path`, so
+    recovery behaviour can be graphed across runs. Safe to share between threads.
+    The trace is best effort: the first failed write is kept in `error` and
+    disables further writes instead of aborting the checks.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.error = None
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, sort_keys=True, default=str)
+        with self._lock:
+            if self.error is not None:
+                return
+            try:
+                with open(self.path, "a") as f:
+                    f.write(line + "\n")
+            except (IOError, OSError) as e:
+                self.error = e.strerror or str(e)
+
+    def for_check(self, check, **labels):
+        """on_attempt callback for retry_until tagging every line with the check name and labels."""
+        def on_attempt(entry):
+            record = dict(labels, check=check, ts=round(time.time(), 3))
+            record.update(entry)
+            self.write(record)
+        return on_attempt
+
+    def done(self, check, result, **labels):
+        """Closing line of a finished wait: outcome, attempts and telemetry."""
+        record = dict(labels, check=check, ts=round(time.time(), 3), done=True,
+                      ok=bool(result.get("ok")), attempts=result.get("attempts"))
+        record.update(result.get("telemetry") or {})
+        self.write(record)
+
+
+def retry_until(func, max_time_to_wait, interval_seconds, *args,
+                strategy=None, timeout_kwarg=None, clock=None, sleep=None,
+                on_attempt=None, observe=None, **kwargs):
+    """
+    Call func(*args, **kwargs) -> (ok, detail) until it succeeds, raises BreakRetry
+    or `max_time_to_wait` elapses.
+
+    strategy      RetryStrategy for the delays (default: fixed `interval_seconds`).
+    timeout_kwarg name of func's timeout keyword; its value is clipped to the time
+                  left before the deadline so a slow call cannot overshoot it.
+    observe       detail -> dict of extra fields recorded with each attempt.
+    on_attempt    called with every attempt record (e.g. AttemptTrace.for_check).
+
+    Returns ok/attempts/error/detail plus `elapsed`, per-attempt `history` and
+    `telemetry` (time_to_ready, slept, latency_ms min/avg/p95/max).
+    """
+    strategy = strategy or RetryStrategy.fixed(interval_seconds)
+    clock = clock or time.time
+    sleep = sleep or time.sleep
+    started_all = clock()
+    deadline = started_all + float(max_time_to_wait)
+    attempt_timeout = kwargs.get(timeout_kwarg) if timeout_kwarg else None
+    state = {"attempts": 0, "slept": 0.0}
+    latencies = []
+    history = []
+
+    def _record(started, ok, error=None, detail=None):
+        entry = {
+            "attempt": state["attempts"],
+            "ok": ok,
+            "latency_ms": round((time.time() - started) * 1000.0, 1),
+            "error": error,
+        }
+        if observe and detail is not None:
+            try:
+                entry.update(observe(detail) or {})
+            except Exception:
+                pass
+        latencies.append(entry["latency_ms"])
+        history.append(entry)
+        if len(history) > HISTORY_LIMIT:
+            del history[0]
+        if on_attempt:
+            on_attempt(dict(entry, elapsed=round(clock() - started_all, 3)))
+
+    def _result(ok, error, detail):
+        elapsed = round(clock() - started_all, 2)
+        return {
+            "ok": ok,
+            "attempts": state["attempts"],
+            "error": error,
+            "detail": detail,
+            "elapsed": elapsed,
+            "history": history,
+            "telemetry": {
+                "time_to_ready": elapsed if ok else None,
+                "slept": round(state["slept"], 2),
+                "latency_ms": latency_stats(latencies),
+            },
+        }
+
+    last_detail = None
     while True:
-        attempts += 1
+        state["attempts"] += 1
+        if timeout_kwarg and attempt_timeout is not None:
+            remaining = deadline - clock()
+            kwargs[timeout_kwarg] = max(MIN_ATTEMPT_TIMEOUT, min(float(attempt_timeout), remaining))
+
+        started = time.time()
         try:
             ok, detail = func(*args, **kwargs)
         except BreakRetry as br:
-            return {
-                "ok": False,
-                "attempts": attempts,
-                "error": str(br) or "break",
-                "detail": (br.detail if br.detail is not None else last_detail),
-            }
+            _record(started, False, str(br) or "break", br.detail)
+            return _result(False, str(br) or "break", (br.detail if br.detail is not None else last_detail))
+
         if ok:
-            return {"ok": True, "attempts": attempts, "error": None, "detail": detail}
+            _record(started, True, detail=detail)
+            return _result(True, None, detail)
 
         last_detail = detail
         last_error = detail if isinstance(detail, str) else None
+        _record(started, False, last_error, detail)
 
-        if time.time() >= deadline:
-            return {"ok": False, "attempts": attempts, "error": (last_error or "timeout"), "detail": last_detail}
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return _result(False, (last_error or "timeout"), last_detail)
 
-        time.sleep(float(interval_seconds))
+        pause = min(strategy.delay(state["attempts"]), remaining)
+        before = clock()
+        sleep(pause)
+        state["slept"] += clock() - before
@@ -17,6 +17,8 @@ description:
   - Supports secured connections using client certificates and optional CA verification.
   - Check mode is supported to simulate creation/deletion without applying changes.
   - Validates server support and enforces minimum server versions where required.
+  - With C(connection_strings), reconciles many connection strings of one database in a single task
+    from one read of all connection strings, optionally pruning undeclared ones.
 version_added: "1.1.0"
 author: "Omer Ratsaby <omer.ratsaby@ravendb.net> (@thegoldenplatypus)"
 
@@ -27,7 +29,8 @@ options:
   name:
     description:
       - Connection string name.
-    required: true
+      - Required unless C(connection_strings) is given.
+    required: false
     type: str
   cs_type:
     description:
@@ -40,18 +43,105 @@ options:
     description:
       - Type-specific properties dictionary (see examples).
       - Secrets may be inline or loaded from using Ansible lookups.
+      - Secret fields also accept references resolved on the managed node - a path to a file (or C(file:<path>)),
+        C(env:<NAME>) for an environment variable, or C(cmd:<command line>) for the output of a command run without a shell
+        (only with C(allow_secret_commands)). Each reference is resolved once per run; files are re-read only when they change.
     required: false
     type: dict
     default: null
   state:
     description:
       - Desired state of the connection string.
-      - If C(present), the item is created when absent (no in-place updates; existing items are left unchanged).
+      - If C(present), the item is created when absent and updated in place when its stored definition differs
+        from C(properties). Only the fields set in C(properties) are compared; an unchanged item is never re-sent,
+        so ETL tasks using it are not restarted.
+      - Secret fields (connection strings, passwords, keys, tokens, and every value of free-form maps such as Kafka's
+        C(connection_options)) are compared through salted fingerprints and never reported in clear.
+      - Secrets the server does not return cannot be compared and do not trigger an update.
       - If C(absent), the item is removed when present.
+      - Ignored with C(connection_strings), whose entries carry their own C(state).
     required: false
     type: str
     choices: [present, absent]
     default: present
+  connection_strings:
+    description:
+      - Bulk mode. Connection strings of C(database_name) to reconcile in one task; mutually exclusive with C(name).
+      - All existing connection strings are read once; only missing or changed ones are written and only
+        C(state=absent) (or pruned) ones deleted.
+    required: false
+    type: list
+    elements: dict
+    suboptions:
+      name:
+        description:
+          - Connection string name.
+        required: true
+        type: str
+      cs_type:
+        description:
+          - Connection string type.
+        required: false
+        type: str
+        choices: [RAVEN, SQL, OLAP, ELASTIC_SEARCH, QUEUE, SNOWFLAKE, AI]
+        default: RAVEN
+      properties:
+        description:
+          - Type-specific properties dictionary, as for the single connection string.
+        required: false
+        type: dict
+        default: {}
+      state:
+        description:
+          - Desired state of this connection string.
+        required: false
+        type: str
+        choices: [present, absent]
+        default: present
+  prune:
+    description:
+      - With C(connection_strings), delete existing connection strings that are not declared.
+      - Only the types that appear in C(connection_strings) are pruned.
+    required: false
+    type: bool
+    default: false
+  test_connection:
+    description:
+      - After reconciling, ask the server to connect to the target of every C(present) connection string
+        (SQL, Snowflake, Elasticsearch nodes, queue brokers, RavenDB URLs) and report per-target latency and errors.
+      - All targets are tested concurrently; the task fails when a target is unreachable.
+      - OLAP and AI connection strings have no test endpoint and are reported as skipped.
+    required: false
+    type: bool
+    default: false
+  test_workers:
+    description:
+      - Maximum number of connection tests in flight at once.
+    required: false
+    type: int
+    default: 8
+  test_timeout:
+    description:
+      - Seconds to wait for each connection test.
+    required: false
+    type: int
+    default: 15
+  capability_cache_ttl:
+    description:
+      - Seconds the probed server capabilities (version, supported connection string types, feature flags) are reused.
+      - They are cached in a file in the system temporary directory of the machine running the module, keyed by cluster URL,
+        so all tasks of a run (and all hosts when delegated to the controller) probe a cluster once.
+      - C(0) disables the cache and probes on every task.
+    required: false
+    type: int
+    default: 300
+  allow_secret_commands:
+    description:
+      - Resolve C(cmd:<command line>) secret references by running the command on the managed node.
+      - When disabled, a C(cmd:) reference fails the task instead of being run or sent as a literal value.
+    required: false
+    type: bool
+    default: false
 
 seealso:
   - name: RavenDB documentation
@@ -175,6 +265,29 @@ EXAMPLES = '''
         base_url: "https://api.openai.com/v1"
     state: present
 
+- name: Create connection strings on many databases with a shared capability probe
+  ravendb.ravendb.connection_string:
+    url: "http://{{ groups['ravendb'][0] }}:8080"
+    database_name: "{{ item }}"
+    name: "raven-out"
+    properties:
+      database: "OtherDB"
+      urls: ["http://node-a:8080"]
+    capability_cache_ttl: 900
+  loop: "{{ tenant_databases }}"
+  delegate_to: localhost
+
+- name: Create a SQL connection string and verify the server can reach the database
+  ravendb.ravendb.connection_string:
+    url: "http://{{ ansible_host }}:8080"
+    database_name: "etl_db"
+    name: "sql-target"
+    cs_type: SQL
+    properties:
+      connection_string: "env:ETL_SQL_DSN"
+      factory_name: "Npgsql.NpgsqlFactory"
+    test_connection: true
+
 - name: Delete connection string
   ravendb.ravendb.connection_string:
     url: "http://{{ ansible_host }}:8080"
@@ -183,6 +296,42 @@ EXAMPLES = '''
     cs_type: RAVEN
     state: absent
 
+- name: Reconcile all ETL connection strings of a database, removing undeclared SQL and RAVEN ones
+  ravendb.ravendb.connection_string:
+    url: "http://{{ ansible_host }}:8080"
+    database_name: "etl_db"
+    prune: true
+    connection_strings:
+      - name: "raven-out"
+        properties:
+          database: "OtherDB"
+          urls: ["http://node-a:8080"]
+      - name: "sql-target"
+        cs_type: SQL
+        properties:
+          connection_string: "{{ lookup('ansible.builtin.file', '/etc/ansible/secrets/sql_dsn.txt') | trim }}"
+          factory_name: "Npgsql.NpgsqlFactory"
+
+- name: SQL connection string with its DSN taken from the environment and an Elastic password from a vault CLI
+  ravendb.ravendb.connection_string:
+    url: "http://{{ ansible_host }}:8080"
+    database_name: "etl_db"
+    allow_secret_commands: true
+    connection_strings:
+      - name: "sql-target"
+        cs_type: SQL
+        properties:
+          connection_string: "env:ETL_SQL_DSN"
+          factory_name: "Npgsql.NpgsqlFactory"
+      - name: "es-out"
+        cs_type: ELASTIC_SEARCH
+        properties:
+          nodes: ["https://es1:9200"]
+          authentication:
+            basic:
+              username: "elastic"
+              password: "cmd:vault kv get -field=password secret/es"
+
 # Check mode (no changes)
 - name: Would create Raven connection string (check mode)
   ravendb.ravendb.connection_string:
@@ -210,6 +359,102 @@ msg:
   returned: always
   sample: "Created connection string 'openai-default' (type AI)."
   version_added: "1.1.0"
+
+changes:
+  description:
+    - Fields that differ between the stored and the declared definition, for an updated connection string.
+    - Secret fields are shown as salted fingerprints (C(secret=true)) that only tell whether the value changed.
+  type: list
+  elements: dict
+  returned: when an existing connection string was (or would be) updated
+  sample:
+    - path: "Database"
+      secret: false
+      before: "OldDB"
+      after: "OtherDB"
+    - path: "ConnectionString"
+      secret: true
+      before: "sha256:4f1c0a9e2b7d3c51"
+      after: "sha256:a03e77b1c95d2f60"
+
+created:
+  description: Connection strings (C(TYPE/name)) that were (or would be) created in bulk mode.
+  type: list
+  elements: str
+  returned: bulk mode
+  sample: ["SQL/sql-target"]
+
+updated:
+  description: Connection strings (C(TYPE/name)) whose definition was (or would be) updated in bulk mode.
+  type: list
+  elements: str
+  returned: bulk mode
+  sample: ["SQL/sql-target"]
+
+deleted:
+  description: Connection strings (C(TYPE/name)) that were (or would be) deleted or pruned in bulk mode.
+  type: list
+  elements: str
+  returned: bulk mode
+  sample: ["RAVEN/old-out"]
+
+unchanged:
+  description: Connection strings (C(TYPE/name)) that already matched in bulk mode.
+  type: list
+  elements: str
+  returned: bulk mode
+  sample: ["RAVEN/raven-out"]
+
+failed_connection_strings:
+  description: Connection strings (C(TYPE/name)) that could not be reconciled in bulk mode.
+  type: list
+  elements: str
+  returned: bulk mode
+  sample: []
+
+connection_strings:
+  description: Outcome of every declared and pruned connection string in bulk mode.
+  type: list
+  elements: dict
+  returned: bulk mode
+  sample:
+    - name: "sql-target"
+      cs_type: "SQL"
+      status: "created"
+      changed: true
+      msg: "Created connection string 'sql-target' (type SQL)."
+      changes: []
+      duration: 0.041
+
+timings:
+  description: Per connection string type, the number of items, how many changed and the seconds spent on them in bulk mode.
+  type: dict
+  returned: bulk mode
+  sample:
+    SQL:
+      count: 12
+      changed: 1
+      seconds: 0.052
+
+connectivity:
+  description: Result of every tested target when C(test_connection=true).
+  type: list
+  elements: dict
+  returned: when test_connection is true
+  sample:
+    - name: "sql-target"
+      cs_type: "SQL"
+      target: "Npgsql.NpgsqlFactory"
+      ok: true
+      latency_ms: 84.2
+      error: null
+      skipped: false
+
+read_seconds:
+  description: Seconds spent probing capabilities and reading all existing connection strings in bulk mode.
+  type: float
+  returned: bulk mode
+  sample: 0.018
 '''
 
 import traceback
@@ -232,6 +477,7 @@ try:
     from ansible_collections.ravendb.ravendb.plugins.module_utils.dto.connection_string import (
         ConnectionStringSpec as CSSpec,
     )
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.core import secret_resolver
     from ansible_collections.ravendb.ravendb.plugins.module_utils.reconcilers.connection_string_reconciler import (
         ConnectionStringReconciler as CSReconciler,
     )
@@ -244,13 +490,34 @@ except ImportError:
 def main():
     module_args = ravendb_common_argument_spec()
     module_args.update(
-        name=dict(type='str', required=True),
+        name=dict(type='str', required=False),
         cs_type=dict(type='str', required=False, default="RAVEN",
                      choices=['RAVEN', 'SQL', 'OLAP', 'ELASTIC_SEARCH', 'QUEUE', 'SNOWFLAKE', 'AI']),
         properties=dict(type='dict', required=False, default=None),
         state=dict(type='str', choices=['present', 'absent'], default='present'),
+        connection_strings=dict(
+            type='list', elements='dict', required=False,
+            options=dict(
+                name=dict(type='str', required=True),
+                cs_type=dict(type='str', default="RAVEN",
+                             choices=['RAVEN', 'SQL', 'OLAP', 'ELASTIC_SEARCH', 'QUEUE', 'SNOWFLAKE', 'AI']),
+                properties=dict(type='dict', default={}),
+                state=dict(type='str', choices=['present', 'absent'], default='present'),
+            ),
+        ),
+        prune=dict(type='bool', default=False),
+        test_connection=dict(type='bool', default=False),
+        test_workers=dict(type='int', default=8),
+        test_timeout=dict(type='int', default=15),
+        capability_cache_ttl=dict(type='int', default=300),
+        allow_secret_commands=dict(type='bool', default=False),
+    )
+    module = AnsibleModule(
+        argument_spec=module_args,
+        mutually_exclusive=[('name', 'connection_strings')],
+        required_one_of=[('name', 'connection_strings')],
+        supports_check_mode=True,
     )
-    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
 
     if not HAS_LIB:
         module.fail_json(msg=missing_required_lib("ravendb"), exception=LIB_ERR)
@@ -260,9 +527,10 @@ def main():
     cert_path = module.params.get('certificate_path')
     ca_path = module.params.get('ca_cert_path')
     state = module.params['state']
-    name = module.params['name'].strip()
+    name = (module.params['name'] or "").strip()
     cs_type = module.params['cs_type']
     props = module.params['properties']
+    bulk = module.params['connection_strings']
 
     checks = [
         validate_url(url),
@@ -270,25 +538,52 @@ def main():
         validate_paths_exist(cert_path, ca_path),
     ]
 
-    if state == "present":
+    if bulk is None and state == "present":
         checks.append(validate_dict("properties", props))
+    if module.params['test_workers'] < 1 or module.params['test_timeout'] < 1:
+        checks.append((False, "test_workers and test_timeout must be at least 1."))
+    for entry in bulk or []:
+        if entry['state'] == "present":
+            checks.append(validate_dict("properties", entry['properties']))
 
     ok, err = collect_errors(*checks)
     if not ok:
         module.fail_json(msg=err)
 
+    items = None
+    if bulk is not None:
+        items = [(CSSpec(cs_type=e['cs_type'], name=e['name'].strip(), properties=e['properties'] or {}), e['state'])
+                 for e in bulk]
+        keys = [(spec.cs_type, spec.name) for spec, _ in items]
+        duplicates = sorted(set("{}/{}".format(*k) for k in keys if keys.count(k) > 1))
+        if duplicates:
+            module.fail_json(msg="Duplicate connection strings: {}".format(", ".join(duplicates)))
+
     tls = TLSConfig(certificate_path=cert_path, ca_cert_path=ca_path)
     ctx = None
+    if module.params['allow_secret_commands']:
+        secret_resolver.default_resolver().allow("cmd")
+
     try:
         ctx = DocumentStoreFactory.create(url, db, cert_path, ca_path)
-        reconciler = CSReconciler(ctx)
+        reconciler = CSReconciler(ctx, capability_ttl=module.params['capability_cache_ttl'])
 
-        if state == "present":
+        if bulk is not None:
+            res = reconciler.ensure_set(items, tls, module.check_mode, prune=module.params['prune'])
+        elif state == "present":
             spec = CSSpec(cs_type=cs_type, name=name, properties=props or {})
             res = reconciler.ensure_present(spec, tls, module.check_mode)
         elif state == "absent":
             res = reconciler.ensure_absent(cs_type, name, tls, module.check_mode)
 
+        if module.params['test_connection']:
+            if bulk is not None:
+                tested = [spec for spec, entry_state in items if entry_state == "present"]
+            else:
+                tested = [spec] if state == "present" else []
+            res = reconciler.test_connections(res, tested, tls, max_workers=module.params['test_workers'],
+                                              timeout=module.params['test_timeout'])
+
         if res.failed:
             module.fail_json(**res.to_ansible())
         else:
@@ -29,8 +29,9 @@ options:
     description:
       - Number of server nodes to replicate the database to.
       - Must be a positive integer.
-      - Only used when creating a database.
-      - Required on creation; ignored for existing databases.
+      - Required on creation.
+      - On an existing database, a higher value adds replicas on nodes chosen by the server, one at a time (see C(topology_members)).
+        Lowering it requires C(topology_members) to choose the nodes to keep.
     required: false
     default: null
     type: int
@@ -38,7 +39,11 @@ options:
     description:
       - Optional list of cluster node tags to host this database (fixed placement).
       - When provided, its length must equal C(replication_factor).
-      - Honored only on creation. If the database already exists, providing C(topology_members) will fail.
+      - On an existing database, missing nodes are added and extra nodes removed.
+        New replicas are added one at a time; each joins as promotable and the next one is added only
+        after the cluster promoted it (it caught up through replication), so scaling out does not flood the network.
+        Nodes are removed only after all additions completed.
+      - For an encrypted database, C(encryption_key) is distributed to each new node before it is added.
     required: false
     type: list
     elements: str
@@ -91,6 +96,27 @@ options:
     required: false
     type: dict
     default: {}
+  promotion_timeout:
+    description:
+      - Maximum time in seconds a new replica may take to catch up and be promoted to member when adding nodes to an existing database.
+    required: false
+    type: int
+    default: 900
+  settings_reload:
+    description:
+      - How changed C(database_settings) are made effective.
+      - Settings are always written with one update; at most one reload follows, however many keys changed.
+      - C(rolling) restarts the database one node at a time, each node only once the database is online on another member,
+        and waits for it to be online again before moving on.
+        Requires RavenDB 6.0 or newer; older servers fail the task before any setting is written.
+      - C(all) (the default) disables and re-enables the database on every node at once (drops in-flight requests), as earlier releases did.
+      - C(none) only writes the settings; they take effect the next time the database loads.
+      - Changes whose new value is equivalent to the current one (e.g. C(True) vs C(true)) never trigger a reload.
+      - Settings given when a database is created are part of its initial record and need no reload.
+    required: false
+    type: str
+    choices: [rolling, all, none]
+    default: all
 
 seealso:
   - name: RavenDB documentation
@@ -115,6 +141,15 @@ EXAMPLES = '''
     topology_members: ["A", "C"]
     state: present
 
+- name: Scale an existing database out from nodes A, B to A, B, C (one replica at a time)
+  ravendb.ravendb.database:
+    url: "http://{{ ansible_host }}:8080"
+    database_name: "placed_db"
+    replication_factor: 3
+    topology_members: ["A", "B", "C"]
+    promotion_timeout: 3600
+    state: present
+
 - name: Create an encrypted database with a generated key and save it locally (requires client cert)
   become: true
   ravendb.ravendb.database:
@@ -174,6 +209,25 @@ msg:
   returned: always
   sample: Database 'my_database' created successfully.
   version_added: "1.0.0"
+
+topology:
+  description:
+    - Topology changes on an existing database.
+    - C(waits) holds, per added or removed node, the attempts, elapsed seconds and last promotion status of its wait.
+  type: dict
+  returned: when the topology of an existing database changed
+  sample:
+    added: ["C"]
+    removed: []
+    waits:
+      C:
+        ok: true
+        attempts: 31
+        elapsed: 152.3
+        error: null
+        detail:
+          node: "C"
+          state: "member"
 '''
 
 import traceback
@@ -210,6 +264,8 @@ def main():
         encryption_key_output_path=dict(type='str', required=False, no_log=True),
         database_settings=dict(type='dict', default={}),
         topology_members=dict(type='list', elements='str', required=False, default=[]),
+        settings_reload=dict(type='str', choices=['rolling', 'all', 'none'], default='all'),
+        promotion_timeout=dict(type='int', default=900),
     )
 
     module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
@@ -263,6 +319,8 @@ def main():
             replication_factor=repl,
             members=topology_members,
             settings=normalized_settings or {},
+            settings_reload=module.params['settings_reload'],
+            promotion_timeout=module.params['promotion_timeout'],
             encryption=EncryptionSpec(
                 enabled=encrypted,
                 certificate_path=cert_path,
@@ -278,8 +336,7 @@ def main():
         elif state == "absent":
             res = reconciler.ensure_absent(name, module.check_mode)
         else:
-            existing = set(dbs.list_databases(ctx))
-            if name not in existing:
+            if not dbs.database_exists(ctx, name):
                 module.fail_json(msg="Database '{}' does not exist. Provide state=present to create it.".format(name))
 
             res = reconciler.ensure_present(spec, tls, module.check_mode)
@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c), RavenDB
+# GNU General Public License v3.0 or later (see COPYING or
+# https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+module: databases
+short_description: Manage many RavenDB databases in one task
+description:
+  - Bulk variant of M(ravendb.ravendb.database) for provisioning many databases (e.g. one per tenant) in a single task.
+  - Existing databases are listed once (paged), and the cluster topology is fetched at most once.
+  - Missing databases are created, settings diffs applied and C(state=absent) databases deleted through a bounded worker pool.
+  - Reports the outcome and duration of every database.
+  - Check mode is supported to report what would be created, updated, or deleted.
+version_added: "1.1.0"
+author: "Omer Ratsaby <omer.ratsaby@ravendb.net> (@thegoldenplatypus)"
+
+attributes:
+  check_mode:
+    support: full
+    description: Can run in check_mode and return changed status prediction without modifying target. If not supported, the action will be skipped.
+
+options:
+  url:
+    description:
+      - URL of the RavenDB server.
+      - Must include the scheme (http or https), hostname, and port.
+    required: true
+    type: str
+  certificate_path:
+    description:
+      - Path to a client certificate (PEM format) for secured communication.
+    required: false
+    type: str
+  ca_cert_path:
+    description:
+      - Path to a trusted CA certificate file to verify the RavenDB server's certificate.
+    required: false
+    type: str
+  databases:
+    description:
+      - Databases to reconcile. Each entry takes the options of M(ravendb.ravendb.database) for one database.
+    required: true
+    type: list
+    elements: dict
+    suboptions:
+      name:
+        description:
+          - Name of the database.
+        required: true
+        type: str
+      state:
+        description:
+          - C(present) creates the database if missing and reconciles its settings; C(absent) deletes it if it exists.
+        required: false
+        type: str
+        choices: [present, absent]
+        default: present
+      replication_factor:
+        description:
+          - Number of server nodes to replicate the database to. Required on creation.
+          - On an existing database, a higher value adds replicas one at a time, as in M(ravendb.ravendb.database).
+        required: false
+        type: int
+      topology_members:
+        description:
+          - Cluster node tags to host the database (fixed placement).
+          - On an existing database, missing nodes are added one at a time and extra nodes removed, as in M(ravendb.ravendb.database).
+        required: false
+        type: list
+        elements: str
+        default: []
+      database_settings:
+        description:
+          - Database-level settings to apply; the database is reloaded when they change.
+        required: false
+        type: dict
+        default: {}
+      encrypted:
+        description:
+          - Create the database as encrypted. Requires C(certificate_path).
+        required: false
+        type: bool
+        default: false
+      encryption_key:
+        description:
+          - Path to a file that contains the raw encryption key.
+        required: false
+        type: str
+      generate_encryption_key:
+        description:
+          - Ask the server to generate a new encryption key.
+        required: false
+        type: bool
+        default: false
+      encryption_key_output_path:
+        description:
+          - Where to write the generated key when C(generate_encryption_key=true).
+        required: false
+        type: str
+  settings_reload:
+    description:
+      - How changed C(database_settings) are made effective.
+      - Settings are always written with one update; at most one reload follows, however many keys changed.
+      - C(rolling) restarts the database one node at a time, each node only once the database is online on another member,
+        and waits for it to be online again before moving on.
+        Requires RavenDB 6.0 or newer; older servers fail the task before any setting is written.
+      - C(all) (the default) disables and re-enables the database on every node at once (drops in-flight requests), as earlier releases did.
+      - C(none) only writes the settings; they take effect the next time the database loads.
+      - Changes whose new value is equivalent to the current one (e.g. C(True) vs C(true)) never trigger a reload.
+      - Settings given when a database is created are part of its initial record and need no reload.
+    required: false
+    type: str
+    choices: [rolling, all, none]
+    default: all
+  promotion_timeout:
+    description:
+      - Maximum time in seconds a new replica may take to catch up and be promoted to member.
+    required: false
+    type: int
+    default: 900
+  max_workers:
+    description:
+      - Maximum number of databases reconciled concurrently.
+    required: false
+    type: int
+    default: 8
+  page_size:
+    description:
+      - Number of database names fetched per request when listing existing databases.
+    required: false
+    type: int
+    default: 128
+
+notes:
+  - The role C(ravendb.ravendb.ravendb_python_client_prerequisites) must be applied before using this module.
+
+requirements:
+  - python >= 3.9
+  - ravendb python client
+  - requests
+
+seealso:
+  - module: ravendb.ravendb.database
+  - name: RavenDB documentation
+    description: Official RavenDB documentation
+    link: https://ravendb.net/docs
+
+'''
+
+EXAMPLES = '''
+- name: Provision all tenant databases
+  ravendb.ravendb.databases:
+    url: "http://{{ ansible_host }}:8080"
+    max_workers: 16
+    databases: "{{ tenant_databases }}"
+
+- name: Create two databases, tune one and remove a retired tenant
+  ravendb.ravendb.databases:
+    url: "http://{{ ansible_host }}:8080"
+    databases:
+      - name: "tenant-001"
+        replication_factor: 3
+      - name: "tenant-002"
+        replication_factor: 2
+        topology_members: ["A", "C"]
+        database_settings:
+          Indexing.MapBatchSize: "64"
+      - name: "tenant-old"
+        state: absent
+'''
+
+RETURN = '''
+changed:
+  description: Indicates if any change was made (or would have been made in check mode).
+  type: bool
+  returned: always
+  sample: true
+
+msg:
+  description: Human-readable message describing the result or error.
+  type: str
+  returned: always
+  sample: "Databases reconciled. Created: 2. Updated: 0. Deleted: 1. Unchanged: 497."
+
+created:
+  description: Names of databases that were (or would be) created.
+  type: list
+  elements: str
+  returned: success
+  sample: ["tenant-001", "tenant-002"]
+
+updated:
+  description: Names of existing databases whose settings were (or would be) changed.
+  type: list
+  elements: str
+  returned: success
+  sample: []
+
+deleted:
+  description: Names of databases that were (or would be) deleted.
+  type: list
+  elements: str
+  returned: success
+  sample: ["tenant-old"]
+
+unchanged:
+  description: Names of databases that already matched.
+  type: list
+  elements: str
+  returned: success
+  sample: []
+
+failed_databases:
+  description: Names of databases that could not be reconciled.
+  type: list
+  elements: str
+  returned: always
+  sample: []
+
+databases:
+  description: Outcome of every database in declaration order.
+  type: list
+  elements: dict
+  returned: always
+  sample:
+    - name: "tenant-001"
+      status: "created"
+      changed: true
+      msg: "Database 'tenant-001' created successfully."
+      duration: 0.412
+
+elapsed:
+  description: Total duration in seconds.
+  type: float
+  returned: always
+  sample: 14.2
+'''
+
+import traceback
+from ansible.module_utils.basic import AnsibleModule, missing_required_lib
+
+LIB_ERR = None
+try:
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.core.validation import (
+        validate_url, validate_database_name, validate_replication_factor_optional, validate_paths_exist,
+        validate_topology_members, collect_errors
+    )
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.core.configuration import validate_kv
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.core.client import DocumentStoreFactory
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.core.tls import TLSConfig
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.reconcilers.database_reconciler import DatabaseSetReconciler
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.dto.database import DatabaseSpec, EncryptionSpec
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.services.encryption_service import validate_encryption_params
+    HAS_LIB = True
+except ImportError:
+    HAS_LIB = False
+    LIB_ERR = traceback.format_exc()
+
+
+def main():
+    module_args = dict(
+        url=dict(type='str', required=True),
+        certificate_path=dict(type='str', required=False),
+        ca_cert_path=dict(type='str', required=False),
+        databases=dict(
+            type='list', elements='dict', required=True,
+            options=dict(
+                name=dict(type='str', required=True),
+                state=dict(type='str', choices=['present', 'absent'], default='present'),
+                replication_factor=dict(type='int', required=False),
+                topology_members=dict(type='list', elements='str', default=[]),
+                database_settings=dict(type='dict', default={}),
+                encrypted=dict(type='bool', default=False),
+                encryption_key=dict(type='str', required=False, no_log=True),
+                generate_encryption_key=dict(type='bool', default=False),
+                encryption_key_output_path=dict(type='str', required=False, no_log=True),
+            ),
+        ),
+        settings_reload=dict(type='str', choices=['rolling', 'all', 'none'], default='all'),
+        promotion_timeout=dict(type='int', default=900),
+        max_workers=dict(type='int', default=8),
+        page_size=dict(type='int', default=128),
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    if not HAS_LIB:
+        module.fail_json(msg=missing_required_lib("ravendb"), exception=LIB_ERR)
+
+    url = module.params['url']
+    cert_path = module.params.get('certificate_path')
+    ca_path = module.params.get('ca_cert_path')
+    entries = module.params['databases'] or []
+    max_workers = int(module.params['max_workers'])
+    page_size = int(module.params['page_size'])
+
+    checks = [validate_url(url), validate_paths_exist(cert_path, ca_path)]
+    for entry in entries:
+        checks.append(validate_database_name(entry['name']))
+        checks.append(validate_replication_factor_optional(entry.get('replication_factor')))
+        checks.append(validate_topology_members(entry.get('topology_members') or [], entry.get('replication_factor')))
+    ok, err = collect_errors(*checks)
+    if not ok:
+        module.fail_json(msg=err)
+
+    names = [entry['name'] for entry in entries]
+    duplicates = sorted(set(n for n in names if names.count(n) > 1))
+    if duplicates:
+        module.fail_json(msg="Duplicate database names in databases: {}".format(", ".join(duplicates)))
+    if max_workers < 1 or page_size < 1:
+        module.fail_json(msg="max_workers and page_size must be at least 1.")
+
+    tls = TLSConfig(certificate_path=cert_path, ca_cert_path=ca_path)
+    items = []
+    for entry in entries:
+        ok, err = validate_encryption_params(
+            entry['state'], tls, entry['encrypted'], entry['generate_encryption_key'],
+            entry.get('encryption_key'), entry.get('encryption_key_output_path'))
+        if not ok:
+            module.fail_json(msg="Database '{}': {}".format(entry['name'], err))
+        ok, normalized_settings, err = validate_kv(entry.get('database_settings') or {}, "database_settings", allow_none=True)
+        if not ok:
+            module.fail_json(msg="Database '{}': {}".format(entry['name'], err))
+
+        items.append((DatabaseSpec(
+            url=url,
+            name=entry['name'],
+            replication_factor=entry.get('replication_factor'),
+            members=entry.get('topology_members') or [],
+            settings=normalized_settings or {},
+            settings_reload=module.params['settings_reload'],
+            promotion_timeout=module.params['promotion_timeout'],
+            encryption=EncryptionSpec(
+                enabled=entry['encrypted'],
+                certificate_path=cert_path,
+                ca_cert_path=ca_path,
+                generate_key=entry['generate_encryption_key'],
+                key_path=entry.get('encryption_key'),
+                output_path=entry.get('encryption_key_output_path'),
+            ),
+        ), entry['state']))
+
+    ctx = None
+    try:
+        ctx = DocumentStoreFactory.create(url, None, cert_path, ca_path)
+        res = DatabaseSetReconciler(ctx, max_workers=max_workers, page_size=page_size).run(items, tls, module.check_mode)
+
+        if res.failed:
+            module.fail_json(**res.to_ansible())
+        else:
+            module.exit_json(**res.to_ansible())
+
+    except Exception as e:
+        module.fail_json(msg="Unexpected error: {}".format(str(e)))
+    finally:
+        if ctx:
+            ctx.close()
+
+
+if __name__ == '__main__':
+    main()
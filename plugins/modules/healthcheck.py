@@ -17,6 +17,15 @@ description:
   - C(cluster_connectivity) verifies the node can ping cluster peers.
   - C(db_groups_available) verifies each database group has at least one usable member in the cluster (no exclusion).
   - C(db_groups_available_excluding_target) verifies each database group has at least one usable member while excluding the node identified by C(url).
+  - Threshold checks wait until the node or cluster has caught up, not merely until it is reachable; their limits are set with C(thresholds).
+  - C(indexes_non_stale) verifies the number of stale indexes across all databases of the node is within C(max_stale_indexes).
+  - C(replication_caught_up) compares the database change vectors of all members of every replicated database group
+    and verifies no member is more than C(max_replication_lag) changes behind.
+  - C(disk_space) verifies free disk space is at least C(min_free_disk_ratio) times the storage allocated by the node's databases.
+  - C(resource_usage) verifies the server process CPU usage and allocated memory (percent of physical memory)
+    are within C(max_cpu_percent) and C(max_memory_percent).
+  - C(request_latency) verifies the median latency of a few C(/setup/alive) round trips is within C(max_latency_ms).
+  - C(indexes_non_stale), C(disk_space) and C(resource_usage) read the server monitoring endpoints (C(/admin/monitoring/v1/*)), available since RavenDB 6.0.
   - Supports secured connections using client certificates and optional CA verification.
 version_added: "1.0.0"
 author: "Omer Ratsaby <omer.ratsaby@ravendb.net> (@thegoldenplatypus)"
@@ -25,8 +34,26 @@ options:
   url:
     description:
       - Base URL of the RavenDB node to check, e.g. C(http://node-a:8080) or C(https://node-a:443).
-    required: true
+      - Required unless C(urls) is given; with C(cluster=true) it is the node used to discover the cluster.
+      - Database group checks always run against this node (or the first of C(urls)).
+    required: false
     type: str
+  urls:
+    description:
+      - Base URLs of several nodes to check at once.
+      - C(node_alive) and C(cluster_connectivity) run on every node concurrently, each node with its own pooled session,
+        so the task takes as long as the slowest node.
+      - Per-node status, latency and elapsed time are returned in C(results.nodes).
+    required: false
+    type: list
+    elements: str
+    default: []
+  cluster:
+    description:
+      - Discover every member, promotable and watcher from C(url)'s cluster topology and check all of them concurrently, like C(urls).
+    required: false
+    type: bool
+    default: false
   validate_certificate:
     description:
       - Verify the server TLS certificate when using HTTPS.
@@ -50,10 +77,29 @@ options:
     required: false
     type: list
     elements: str
-    choices: [node_alive, cluster_connectivity, db_groups_available, db_groups_available_excluding_target]
+    choices:
+      - node_alive
+      - cluster_connectivity
+      - db_groups_available
+      - db_groups_available_excluding_target
+      - indexes_non_stale
+      - replication_caught_up
+      - disk_space
+      - resource_usage
+      - request_latency
     default:
       - node_alive
       - cluster_connectivity
+  thresholds:
+    description:
+      - Limits for the threshold checks. Unset keys keep their defaults.
+      - C(max_stale_indexes) (default C(0)), C(max_replication_lag) in changes (default C(1000)),
+        C(min_free_disk_ratio) (default C(0.2)), C(max_memory_percent) (default C(90)),
+        C(max_cpu_percent) (default C(80)) and C(max_latency_ms) (default C(500)).
+      - Threshold checks are retried every C(retry_interval_seconds) until they pass or C(max_time_to_wait) elapses.
+    required: false
+    type: dict
+    default: {}
   max_time_to_wait:
     description:
       - Max time window in seconds for each selected check before timing out.
@@ -72,6 +118,40 @@ options:
     required: false
     type: int
     default: 10
+  retry_backoff:
+    description:
+      - Delay schedule between attempts of every check.
+      - C(fixed) (the default) waits the configured interval between attempts, as earlier releases did.
+      - C(adaptive) retries quickly a few times, then backs off exponentially with jitter up to the configured interval,
+        so short blips resolve fast without hammering a recovering node.
+      - Either way, each attempt's request timeout is clipped to the time left before C(max_time_to_wait).
+    required: false
+    type: str
+    choices: [fixed, adaptive]
+    default: fixed
+  trace_path:
+    description:
+      - Append a JSON-lines trace of the checks to this file.
+      - One line per attempt (check, node, attempt number, outcome, C(latency_ms), elapsed time, and databases evaluated for database group checks),
+        and one closing line per check with C(done=true) and its telemetry.
+      - The file is appended to, so traces of several runs or nodes can be collected in one place and graphed across releases.
+      - A trace that cannot be written is reported in C(warnings); the checks still run.
+    required: false
+    type: path
+  wait_mode:
+    description:
+      - How a check waits between attempts.
+      - C(poll) sleeps until the next attempt.
+      - C(events) follows the server notification stream (C(/server/notification-center/watch)) and re-checks soon after
+        a database or cluster topology change is pushed, so a wait ends when the condition becomes true rather than at the next interval.
+      - Re-checks triggered by notifications are at least one second apart; a burst of notifications (e.g. one per database) results in a single re-check.
+      - With C(events), the regular polling schedule still applies as an upper bound between attempts.
+      - The module falls back to C(poll) when the stream cannot be opened (e.g. while the node is down).
+      - Requires the C(websocket-client) Python package; without it the module warns and polls.
+    required: false
+    type: str
+    choices: [poll, events]
+    default: poll
   on_db_timeout:
     description:
       - Behavior when C(db_groups_available) times out.
@@ -81,6 +161,12 @@ options:
     choices: [fail, continue]
     default: fail
 
+requirements:
+  - python >= 3.9
+  - ravendb python client
+  - requests
+  - websocket-client (only for I(wait_mode=events))
+
 seealso:
   - name: RavenDB documentation
     description: Official RavenDB documentation
@@ -120,6 +206,55 @@ EXAMPLES = '''
     max_time_to_wait: 1200
     db_retry_interval_seconds: 10
     on_db_timeout: fail
+
+- name: Wait for a restarted node, retrying quickly at first and backing off after
+  ravendb.ravendb.healthcheck:
+    url: "http://{{ inventory_hostname }}:8080"
+    retry_backoff: adaptive
+
+- name: Check several nodes concurrently
+  ravendb.ravendb.healthcheck:
+    urls:
+      - "http://node-a:8080"
+      - "http://node-b:8080"
+      - "http://node-c:8080"
+
+- name: Gate a rolling restart on every node of the cluster at once
+  ravendb.ravendb.healthcheck:
+    url: "https://node-a.example.com:443"
+    cluster: true
+    certificate_path: "/etc/ravendb/admin.client.pem"
+    ca_cert_path: "/etc/ssl/private/ca.pem"
+    max_time_to_wait: 600
+
+- name: Finish the database-group gate as soon as the server reports the change
+  ravendb.ravendb.healthcheck:
+    url: "https://node-b.example.com:443"
+    certificate_path: "/etc/ravendb/admin.client.pem"
+    ca_cert_path: "/etc/ssl/private/ca.pem"
+    checks: ["db_groups_available_excluding_target"]
+    wait_mode: events
+    db_retry_interval_seconds: 30
+
+- name: Move on only once the upgraded node has caught up
+  ravendb.ravendb.healthcheck:
+    url: "https://node-b.example.com:443"
+    certificate_path: "/etc/ravendb/admin.client.pem"
+    ca_cert_path: "/etc/ssl/private/ca.pem"
+    checks: ["node_alive", "indexes_non_stale", "replication_caught_up", "disk_space", "resource_usage", "request_latency"]
+    thresholds:
+      max_stale_indexes: 0
+      max_replication_lag: 100
+      max_cpu_percent: 70
+      max_latency_ms: 200
+    max_time_to_wait: 1800
+
+- name: Record recovery timings of every node to graph them across releases
+  ravendb.ravendb.healthcheck:
+    url: "http://node-a:8080"
+    cluster: true
+    checks: ["node_alive", "cluster_connectivity"]
+    trace_path: "/var/log/ravendb/healthcheck-{{ ravendb_version }}.jsonl"
 '''
 
 RETURN = '''
@@ -138,15 +273,40 @@ msg:
 results:
   description:
     - Per-check structured results including attempts, error (if any), and detail.
+    - Every check also reports C(elapsed) seconds and a C(history) of its most recent attempts with outcome and C(latency_ms).
+    - C(telemetry) holds C(time_to_ready) (seconds until the check passed, null if it did not), C(slept) (seconds spent waiting between attempts)
+      and C(latency_ms) (C(min), C(avg), C(p95), C(max) round trip of all attempts).
+      Database group checks add C(databases_per_poll), the number of databases evaluated by the last poll.
+    - With I(wait_mode=events), C(events) reports the final C(mode), the number of relevant notifications (C(events)),
+      the number of early re-checks they caused (C(wakeups)), stream C(drops) and the last stream C(error).
+    - With C(urls) or C(cluster=true), C(nodes) holds the node checks of every node keyed by URL, with C(latency_ms) and C(elapsed).
   type: dict
   returned: success
   sample:
     node_alive:
       ok: true
-      attempts: 1
+      attempts: 2
       error: null
       detail:
         status: 200
+      elapsed: 0.53
+      history:
+        - attempt: 1
+          ok: false
+          latency_ms: 1.2
+          error: "connection refused"
+        - attempt: 2
+          ok: true
+          latency_ms: 3.1
+          error: null
+      telemetry:
+        time_to_ready: 0.53
+        slept: 0.5
+        latency_ms:
+          min: 1.2
+          avg: 2.2
+          p95: 3.1
+          max: 3.1
     cluster_connectivity:
       ok: true
       attempts: 1
@@ -160,6 +320,28 @@ results:
       detail:
         failing:
           db1: "no usable member with LastStatus==Ok (or only excluded tag)"
+    nodes:
+      "http://node-a:8080":
+        url: "http://node-a:8080"
+        ok: true
+        latency_ms: 3.4
+        elapsed: 0.02
+        checks:
+          node_alive:
+            ok: true
+            attempts: 1
+            error: null
+            detail:
+              status: 200
+              latency_ms: 3.4
+    replication_caught_up:
+      ok: true
+      attempts: 4
+      error: null
+      detail:
+        databases: 12
+        lagging: {}
+        limit: 100
 warnings:
   description: Optional warnings (e.g., cert validation auto-disabled for IP hosts).
   type: list
@@ -179,18 +361,25 @@ try:
     )
     from ansible_collections.ravendb.ravendb.plugins.module_utils.dto.healthcheck import HealthcheckSpec
     from ansible_collections.ravendb.ravendb.plugins.module_utils.reconcilers.healthcheck_reconciler import HealthcheckReconciler
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.services.healthcheck_service import normalize_thresholds
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.services.notification_service import WAIT_MODE_EVENTS, websocket_available
     HAS_LIB = True
 except ImportError:
     HAS_LIB = False
     LIB_ERR = traceback.format_exc()
 
 
-CHECK_CHOICES = ('node_alive', 'cluster_connectivity', 'db_groups_available', 'db_groups_available_excluding_target')
+CHECK_CHOICES = (
+    'node_alive', 'cluster_connectivity', 'db_groups_available', 'db_groups_available_excluding_target',
+    'indexes_non_stale', 'replication_caught_up', 'disk_space', 'resource_usage', 'request_latency',
+)
 
 
 def main():
     argument_spec = dict(
-        url=dict(type='str', required=True),
+        url=dict(type='str', required=False),
+        urls=dict(type='list', elements='str', required=False, default=[]),
+        cluster=dict(type='bool', default=False),
         validate_certificate=dict(type='bool', default=True),
         certificate_path=dict(type='str', required=False, default=None),
         ca_cert_path=dict(type='str', required=False, default=None),
@@ -199,6 +388,10 @@ def main():
         retry_interval_seconds=dict(type='int', default=5),
         db_retry_interval_seconds=dict(type='int', default=10),
         on_db_timeout=dict(type='str', choices=['fail', 'continue'], default='fail'),
+        retry_backoff=dict(type='str', choices=['fixed', 'adaptive'], default='fixed'),
+        wait_mode=dict(type='str', choices=['poll', 'events'], default='poll'),
+        thresholds=dict(type='dict', default={}),
+        trace_path=dict(type='path', required=False, default=None),
     )
 
     module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
@@ -206,7 +399,9 @@ def main():
     if not HAS_LIB:
         module.fail_json(msg=missing_required_lib("ravendb"), exception=LIB_ERR)
 
-    url = module.params['url']
+    urls = module.params['urls'] or []
+    cluster = module.params['cluster']
+    url = module.params.get('url') or (urls[0] if urls else None)
     validate_cert = bool(module.params['validate_certificate'])
     cert_path = module.params.get('certificate_path')
     ca_path = module.params.get('ca_cert_path')
@@ -216,17 +411,29 @@ def main():
     db_retry_interval_seconds = int(module.params['db_retry_interval_seconds'])
     on_db_timeout = module.params['on_db_timeout']
 
+    if not url:
+        module.fail_json(msg="One of url or urls is required.")
+    if cluster and not module.params.get('url'):
+        module.fail_json(msg="cluster=true requires url to discover the cluster topology.")
+
     ok, err = collect_errors(
         validate_url(url),
         validate_paths_exist(cert_path, ca_path),
+        *[validate_url(u) for u in urls]
     )
     if not ok:
         module.fail_json(msg=err)
 
+    ok, thresholds, err = normalize_thresholds(module.params['thresholds'])
+    if not ok:
+        module.fail_json(msg=err)
+
     warnings = []
     warning = ip_host_warning(url, validate_cert)
     if warning:
         warnings.append(warning)
+    if module.params['wait_mode'] == WAIT_MODE_EVENTS and not websocket_available():
+        warnings.append(missing_required_lib("websocket-client") + " wait_mode=events falls back to polling.")
 
     try:
         spec = HealthcheckSpec(
@@ -239,6 +446,12 @@ def main():
             retry_interval_seconds=retry_interval_seconds,
             db_retry_interval_seconds=db_retry_interval_seconds,
             on_db_timeout=on_db_timeout,
+            urls=urls,
+            cluster=cluster,
+            retry_backoff=module.params['retry_backoff'],
+            wait_mode=module.params['wait_mode'],
+            thresholds=thresholds,
+            trace_path=module.params.get('trace_path'),
         )
 
         reconciler = HealthcheckReconciler()
@@ -246,7 +459,7 @@ def main():
 
         out = res.to_ansible()
         if warnings:
-            out["warnings"] = warnings
+            out["warnings"] = warnings + out.get("warnings", [])
 
         if res.failed:
             module.fail_json(**out)
@@ -27,8 +27,19 @@ options:
     description:
       - Name of the index to create, delete, or modify.
       - Must consist only of letters, numbers, dashes, and underscores.
-    required: true
+      - Exactly one of C(index_name) and C(index_names) is required.
+    required: false
     type: str
+  index_names:
+    description:
+      - Apply C(mode) to many existing indexes at once.
+      - Each entry is an exact index name, a glob (e.g. C(Orders/*)) or C(all) for every index of the database.
+      - The indexing status is read once and only indexes not already in the requested mode are acted on.
+      - When C(paused) or C(resumed) covers every index, a single database-wide stop/start indexing operation is used.
+      - Requires C(mode); cannot be combined with C(state), C(index_definition) or C(index_configuration).
+    required: false
+    type: list
+    elements: str
   index_definition:
     description:
       - Dictionary defining the index (C(map) list and optional C(reduce) string).
@@ -68,6 +79,34 @@ options:
     required: false
     type: dict
     default: {}  # ADDED
+  wait_for_non_stale:
+    description:
+      - After the index is reconciled, wait until it (and any side-by-side C(ReplacementOf/) index) is no longer stale.
+      - Progress (processed/total entries, rate, ETA) of the last poll is returned in C(wait).
+      - Ignored in check mode and with C(state=absent).
+    required: false
+    type: bool
+    default: false
+  max_wait:
+    description:
+      - Maximum time in seconds to wait for the index to become non-stale.
+    required: false
+    type: int
+    default: 600
+  poll_interval:
+    description:
+      - Interval in seconds between index progress polls.
+    required: false
+    type: int
+    default: 5
+  on_wait_timeout:
+    description:
+      - Behavior when the index is still stale after C(max_wait).
+      - C(fail) fails the task; C(continue) returns success with the timeout noted in C(wait).
+    required: false
+    type: str
+    choices: [fail, continue]
+    default: fail
 seealso:
   - name: RavenDB documentation
     description: Official RavenDB documentation
@@ -125,6 +164,35 @@ EXAMPLES = '''
     index_configuration:
       Indexing.MapBatchSize: "128"
 
+- name: Deploy an index and wait until it has caught up
+  ravendb.ravendb.index:
+    url: "http://{{ ansible_host }}:8080"
+    database_name: "my_database"
+    index_name: "UsersByName"
+    index_definition:
+      map:
+        - "from c in docs.Users select new { c.name }"
+    state: present
+    wait_for_non_stale: true
+    max_wait: 1800
+    poll_interval: 10
+    on_wait_timeout: continue
+
+- name: Pause all indexing before a bulk import
+  ravendb.ravendb.index:
+    url: "http://{{ ansible_host }}:8080"
+    database_name: "my_database"
+    index_names: [all]
+    mode: paused
+
+- name: Disable every Orders index (cluster-wide)
+  ravendb.ravendb.index:
+    url: "http://{{ ansible_host }}:8080"
+    database_name: "my_database"
+    index_names: ["Orders/*"]
+    mode: disabled
+    cluster_wide: true
+
 - name: Disable a RavenDB index (cluster-wide)
   ravendb.ravendb.index:
     url: "http://{{ ansible_host }}:8080"
@@ -193,6 +261,58 @@ msg:
   returned: always
   sample: Index 'Products_ByName' created successfully.
   version_added: "1.0.0"
+
+changed_fields:
+  description:
+    - Canonical index definition fields that differ from the declared state (also reported in check mode).
+    - Maps, reduce and additional sources are compared after normalizing whitespace, comments and formatting,
+      so cosmetic edits do not trigger a re-index.
+  type: list
+  elements: str
+  returned: when the index is reconciled (C(state=present) or C(state) omitted)
+  sample: ["maps", "configuration"]
+
+changed_indexes:
+  description: Indexes that were (or would be) switched to C(mode).
+  type: list
+  elements: str
+  returned: when I(index_names) is used
+  sample: ["Orders/ByCompany", "Orders/Totals"]
+
+unchanged_indexes:
+  description: Selected indexes that were already in C(mode).
+  type: list
+  elements: str
+  returned: when I(index_names) is used
+  sample: []
+
+database_wide:
+  description: Whether a single database-wide stop/start indexing operation was used.
+  type: bool
+  returned: when I(index_names) is used
+  sample: true
+
+wait:
+  description:
+    - Outcome of waiting for the index to become non-stale.
+    - C(progress) describes the index still building at the last poll (the C(ReplacementOf/) index during a side-by-side deployment).
+  type: dict
+  returned: when I(wait_for_non_stale=true)
+  sample:
+    non_stale: false
+    timed_out: true
+    attempts: 120
+    elapsed: 600.4
+    progress:
+      name: "ReplacementOf/UsersByName"
+      replacement: true
+      stale: true
+      status: "Running"
+      processed: 1250000
+      total: 4000000
+      remaining: 2750000
+      rate: 5100.5
+      eta_seconds: 539.2
 '''
 
 import traceback
@@ -219,22 +339,33 @@ except ImportError:
 def main():
     module_args = ravendb_common_argument_spec()
     module_args.update(
-        index_name=dict(type='str', required=True),
+        index_name=dict(type='str', required=False),
+        index_names=dict(type='list', elements='str', required=False),
         index_definition=dict(type='dict', required=False),
         state=dict(type='str', choices=['present', 'absent'], required=False, default=None),
         mode=dict(type='str', choices=['resumed', 'paused', 'enabled', 'disabled', 'reset'], required=False),
         cluster_wide=dict(type='bool', default=False),
-        index_configuration=dict(type='dict', required=False, default={})
+        index_configuration=dict(type='dict', required=False, default={}),
+        wait_for_non_stale=dict(type='bool', default=False),
+        max_wait=dict(type='int', default=600),
+        poll_interval=dict(type='int', default=5),
+        on_wait_timeout=dict(type='str', choices=['fail', 'continue'], default='fail'),
     )
 
-    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+        mutually_exclusive=[['index_name', 'index_names']],
+        required_one_of=[['index_name', 'index_names']],
+    )
 
     if not HAS_LIB:
         module.fail_json(msg=missing_required_lib("ravendb"), exception=LIB_ERR)
 
     url = module.params['url']
     db_name = module.params['database_name']
-    idx_name = module.params['index_name']
+    idx_name = module.params.get('index_name')
+    idx_names = module.params.get('index_names')
     raw_def = module.params.get('index_definition')
     cert_path = module.params.get('certificate_path')
     ca_path = module.params.get('ca_cert_path')
@@ -242,11 +373,23 @@ def main():
     mode = module.params.get('mode')
     cluster_wide = module.params['cluster_wide']
     idx_cfg = module.params.get('index_configuration') or {}
+    wait_for_non_stale = module.params['wait_for_non_stale']
+    max_wait = int(module.params['max_wait'])
+    poll_interval = int(module.params['poll_interval'])
+    on_wait_timeout = module.params['on_wait_timeout']
+
+    if idx_names is not None:
+        if not mode:
+            module.fail_json(msg="index_names requires mode.")
+        if state or raw_def or idx_cfg or wait_for_non_stale:
+            module.fail_json(msg="index_names only supports mode; use index_name or the indexes module to manage definitions.")
+        if not idx_names:
+            module.fail_json(msg="index_names must not be empty.")
 
     ok, err = collect_errors(
         validate_url(url),
         validate_database_name(db_name),
-        validate_index_name(idx_name),
+        validate_index_name(idx_name) if idx_names is None else (True, None),
         validate_dict("index definition", raw_def),
         validate_paths_exist(cert_path, ca_path),
         validate_state_optional(state),
@@ -275,20 +418,23 @@ def main():
         ctx = DocumentStoreFactory.create(url, db_name, cert_path, ca_path)
         reconciler = IndexReconciler(ctx, db_name)
 
-        exists = idxsvc.get_definition(ctx, db_name, idx_name) is not None
-
-        if state == "absent":
+        if idx_names is not None:
+            res = reconciler.ensure_mode_bulk(idx_names, mode, cluster_wide, module.check_mode)
+        elif state == "absent":
             res = reconciler.ensure_absent(idx_name, module.check_mode)
         elif state == "present":
             res = reconciler.ensure_present(spec, module.check_mode)
         else:
-            if not exists:
+            if not idxsvc.index_exists(ctx, db_name, idx_name):
                 if mode:
                     module.fail_json(msg="Index '{}' does not exist. Provide state=present to create it before applying mode.".format(idx_name))
                 module.fail_json(msg="Index '{}' does not exist. Provide state=present and index_definition to create it.".format(idx_name))
 
             res = reconciler.ensure_present(spec, module.check_mode)
 
+        if wait_for_non_stale and state != "absent" and not res.failed and not module.check_mode:
+            res = reconciler.wait_non_stale(res, idx_name, max_wait, poll_interval, on_wait_timeout)
+
         if res.failed:
             module.fail_json(**res.to_ansible())
         else:
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c), RavenDB
+# GNU General Public License v3.0 or later (see COPYING or
+# https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+module: index_info
+short_description: Gather statistics of RavenDB indexes
+description:
+  - Returns per-index statistics of a database for capacity planning and gating tasks.
+  - Includes entries count, map/reduce attempts and errors, indexing rates, last indexing time, memory and storage sizes, and staleness.
+  - All statistics are fetched with a single bulk call for the whole database.
+  - This module never changes anything.
+version_added: "1.1.0"
+author: "Omer Ratsaby <omer.ratsaby@ravendb.net> (@thegoldenplatypus)"
+
+extends_documentation_fragment:
+  - ravendb.ravendb.ravendb
+
+options:
+  index_names:
+    description:
+      - Restrict the result to these indexes.
+      - Each entry is an exact index name, a glob (e.g. C(Orders/*)) or C(all).
+      - Exact names that do not exist fail the task.
+    required: false
+    type: list
+    elements: str
+    default: [all]
+
+seealso:
+  - module: ravendb.ravendb.index
+  - name: RavenDB documentation
+    description: Official RavenDB documentation
+    link: https://ravendb.net/docs
+
+'''
+
+EXAMPLES = '''
+- name: Gather statistics of all indexes
+  ravendb.ravendb.index_info:
+    url: "http://{{ ansible_host }}:8080"
+    database_name: "my_database"
+  register: idx
+
+- name: Fail when an index uses more than 10 GiB on disk
+  ansible.builtin.assert:
+    that: item.disk_size_bytes < 10737418240
+    fail_msg: "Index {{ item.name }} is too large"
+  loop: "{{ idx.indexes }}"
+
+- name: Gather statistics of the Orders indexes only
+  ravendb.ravendb.index_info:
+    url: "http://{{ ansible_host }}:8080"
+    database_name: "my_database"
+    index_names: ["Orders/*"]
+'''
+
+RETURN = '''
+changed:
+  description: Always false.
+  type: bool
+  returned: always
+  sample: false
+
+msg:
+  description: Human-readable message describing the result or error.
+  type: str
+  returned: always
+  sample: "Collected statistics for 2 indexes."
+
+indexes:
+  description: Statistics of every selected index.
+  type: list
+  elements: dict
+  returned: success
+  sample:
+    - name: "Orders/ByCompany"
+      type: "Map"
+      state: "Normal"
+      status: "Running"
+      priority: "Normal"
+      lock_mode: "Unlock"
+      is_stale: false
+      entries_count: 830
+      errors_count: 0
+      map_attempts: 830
+      map_successes: 830
+      map_errors: 0
+      reduce_attempts: null
+      reduce_successes: null
+      reduce_errors: null
+      mapped_per_second: 0.0
+      reduced_per_second: 0.0
+      last_indexing_time: "2024-05-01T10:12:41.1234567Z"
+      last_querying_time: "2024-05-01T10:15:02.7654321Z"
+      disk_size_bytes: 3145728
+      memory_allocated_bytes: 1048576
+      memory_budget_bytes: 33554432
+
+totals:
+  description: Sums over the selected indexes.
+  type: dict
+  returned: success
+  sample:
+    count: 1
+    stale: 0
+    entries_count: 830
+    errors_count: 0
+    disk_size_bytes: 3145728
+'''
+
+import traceback
+from ansible.module_utils.basic import AnsibleModule, missing_required_lib
+
+LIB_ERR = None
+try:
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.common_args import ravendb_common_argument_spec
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.core.client import DocumentStoreFactory
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.core.validation import (
+        validate_url, validate_database_name, validate_paths_exist, collect_errors
+    )
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.core import messages as msg
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.services import index_service as idxsvc
+    HAS_LIB = True
+except ImportError:
+    HAS_LIB = False
+    LIB_ERR = traceback.format_exc()
+
+
+def _totals(stats):
+    return {
+        "count": len(stats),
+        "stale": sum(1 for s in stats if s["is_stale"]),
+        "entries_count": sum(s["entries_count"] or 0 for s in stats),
+        "errors_count": sum(s["errors_count"] or 0 for s in stats),
+        "disk_size_bytes": sum(s["disk_size_bytes"] or 0 for s in stats),
+    }
+
+
+def main():
+    module_args = ravendb_common_argument_spec()
+    module_args.update(
+        index_names=dict(type='list', elements='str', default=['all']),
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    if not HAS_LIB:
+        module.fail_json(msg=missing_required_lib("ravendb"), exception=LIB_ERR)
+
+    url = module.params['url']
+    db_name = module.params['database_name']
+    cert_path = module.params.get('certificate_path')
+    ca_path = module.params.get('ca_cert_path')
+    patterns = module.params['index_names'] or [idxsvc.ALL_INDEXES]
+
+    ok, err = collect_errors(
+        validate_url(url),
+        validate_database_name(db_name),
+        validate_paths_exist(cert_path, ca_path),
+    )
+    if not ok:
+        module.fail_json(msg=err)
+
+    ctx = None
+    try:
+        ctx = DocumentStoreFactory.create(url, db_name, cert_path, ca_path)
+        stats = idxsvc.list_index_stats(ctx, db_name)
+
+        selected, missing = idxsvc.select_index_names([s["name"] for s in stats], patterns)
+        if missing:
+            module.fail_json(msg=msg.idx_bulk_missing(missing))
+        selected = set(selected)
+        stats = [s for s in stats if s["name"] in selected]
+
+        module.exit_json(
+            changed=False,
+            msg=msg.idx_info_collected(len(stats)),
+            indexes=stats,
+            totals=_totals(stats),
+        )
+
+    except Exception as e:
+        module.fail_json(msg="Unexpected error: {}".format(str(e)))
+    finally:
+        if ctx:
+            ctx.close()
+
+
+if __name__ == '__main__':
+    main()
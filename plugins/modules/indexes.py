@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c), RavenDB
+# GNU General Public License v3.0 or later (see COPYING or
+# https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+module: indexes
+short_description: Reconcile a set of RavenDB indexes in one pass
+description:
+  - Reconciles a whole list of index definitions (and per-index configuration) against a database.
+  - Existing definitions are fetched once and compared locally by fingerprinting a canonical form of each definition.
+  - All new or changed definitions are deployed with a single batched PUT.
+  - Optionally deletes indexes that exist in the database but are not declared (C(prune)).
+  - Supports check mode to report what would be created, updated, or deleted.
+version_added: "1.1.0"
+author: "Omer Ratsaby <omer.ratsaby@ravendb.net> (@thegoldenplatypus)"
+
+extends_documentation_fragment:
+  - ravendb.ravendb.ravendb
+
+options:
+  indexes:
+    description:
+      - List of indexes to ensure present.
+    required: true
+    type: list
+    elements: dict
+    suboptions:
+      name:
+        description:
+          - Name of the index.
+          - Must consist only of letters, numbers, dashes, and underscores.
+        required: true
+        type: str
+      definition:
+        description:
+          - Index definition (C(map) list, optional C(reduce) string and optional C(deployment_mode)).
+          - Required when the index does not exist yet.
+        required: false
+        type: dict
+      configuration:
+        description:
+          - Per-index configuration key/value pairs to reconcile.
+        required: false
+        type: dict
+        default: {}
+  prune:
+    description:
+      - Delete indexes that exist in the database but are not listed in C(indexes).
+      - Auto indexes (C(Auto/*)) and side-by-side replacements (C(ReplacementOf/*)) are never deleted.
+    required: false
+    type: bool
+    default: false
+  rollout_databases:
+    description:
+      - Further databases to roll the same index set out to, after C(database_name).
+      - When set, the module deploys database by database, keeping at most C(rollout_concurrency) databases re-indexing at a time.
+      - The next database is started once an in-flight one has no stale declared index (including side-by-side replacements).
+      - A failed deployment, a paused/disabled index or a database exceeding C(max_wait) halts the rollout; remaining databases are skipped.
+    required: false
+    type: list
+    elements: str
+    default: []
+  rollout_concurrency:
+    description:
+      - Maximum number of databases re-indexing at the same time during a rollout.
+    required: false
+    type: int
+    default: 1
+  max_wait:
+    description:
+      - Maximum time in seconds a database may take to become non-stale during a rollout.
+    required: false
+    type: int
+    default: 600
+  poll_interval:
+    description:
+      - Interval in seconds between index progress polls during a rollout.
+    required: false
+    type: int
+    default: 5
+
+seealso:
+  - module: ravendb.ravendb.index
+  - name: RavenDB documentation
+    description: Official RavenDB documentation
+    link: https://ravendb.net/docs
+
+'''
+
+EXAMPLES = '''
+- name: Deploy the full index set of a database
+  ravendb.ravendb.indexes:
+    url: "http://{{ ansible_host }}:8080"
+    database_name: "my_database"
+    indexes:
+      - name: "UsersByName"
+        definition:
+          map:
+            - "from c in docs.Users select new { c.name }"
+      - name: "OrdersByCompany"
+        definition:
+          map:
+            - "from o in docs.Orders select new { o.Company }"
+          deployment_mode: rolling
+        configuration:
+          Indexing.MapBatchSize: "128"
+
+- name: Deploy the index set and remove everything else (check mode)
+  ravendb.ravendb.indexes:
+    url: "http://{{ ansible_host }}:8080"
+    database_name: "my_database"
+    prune: true
+    indexes: "{{ my_index_set }}"
+  check_mode: yes
+
+- name: Roll the index set out to all tenant databases, two at a time
+  ravendb.ravendb.indexes:
+    url: "http://{{ ansible_host }}:8080"
+    database_name: "tenant-001"
+    rollout_databases: "{{ tenant_databases }}"
+    rollout_concurrency: 2
+    max_wait: 3600
+    indexes: "{{ my_index_set }}"
+'''
+
+RETURN = '''
+changed:
+  description: Indicates if any change was made (or would have been made in check mode).
+  type: bool
+  returned: always
+  sample: true
+
+msg:
+  description: Human-readable message describing the result or error.
+  type: str
+  returned: always
+  sample: "Indexes reconciled. Created: UsersByName. Updated: -. Deleted: -."
+
+created:
+  description: Names of indexes that were (or would be) created.
+  type: list
+  elements: str
+  returned: success
+  sample: ["UsersByName"]
+
+updated:
+  description: Names of indexes whose definition or configuration was (or would be) updated.
+  type: list
+  elements: str
+  returned: success
+  sample: []
+
+deleted:
+  description: Names of undeclared indexes that were (or would be) deleted by C(prune).
+  type: list
+  elements: str
+  returned: success
+  sample: []
+
+unchanged:
+  description: Names of declared indexes that already matched.
+  type: list
+  elements: str
+  returned: success
+  sample: ["OrdersByCompany"]
+
+changes:
+  description:
+    - For every updated index, the canonical definition fields that differ (e.g. C(maps), C(reduce), C(configuration)).
+    - Code is compared after normalizing whitespace, comments and formatting, so cosmetic edits are not changes.
+  type: dict
+  returned: success
+  sample: {"OrdersByCompany": ["configuration"]}
+
+rollout:
+  description:
+    - Per-database outcome of a rollout, in start order.
+    - C(status) is one of C(unchanged), C(changed), C(done) (changed and non-stale), C(timed_out), C(failed) or C(skipped).
+    - C(deploy_seconds) is the time spent reconciling, C(wait_seconds) the time until the database was non-stale.
+  type: list
+  elements: dict
+  returned: when I(rollout_databases) is set
+  sample:
+    - database: "tenant-001"
+      status: "done"
+      created: []
+      updated: ["OrdersByCompany"]
+      deleted: []
+      deploy_seconds: 0.21
+      wait_seconds: 84.5
+    - database: "tenant-002"
+      status: "unchanged"
+      created: []
+      updated: []
+      deleted: []
+      deploy_seconds: 0.05
+      wait_seconds: 0.0
+
+elapsed:
+  description: Total rollout duration in seconds.
+  type: float
+  returned: when I(rollout_databases) is set
+  sample: 312.7
+'''
+
+import traceback
+from ansible.module_utils.basic import AnsibleModule, missing_required_lib
+
+LIB_ERR = None
+try:
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.common_args import ravendb_common_argument_spec
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.core.client import DocumentStoreFactory
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.core.validation import (
+        validate_url, validate_database_name, validate_index_name, validate_dict,
+        validate_paths_exist, collect_errors
+    )
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.services.index_config_service import validate_index_configuration
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.reconcilers.index_reconciler import IndexReconciler, IndexRollout
+    from ansible_collections.ravendb.ravendb.plugins.module_utils.dto.index import IndexSpec, IndexDefinitionSpec
+    HAS_LIB = True
+except ImportError:
+    HAS_LIB = False
+    LIB_ERR = traceback.format_exc()
+
+
+def main():
+    module_args = ravendb_common_argument_spec()
+    module_args.update(
+        indexes=dict(
+            type='list', elements='dict', required=True,
+            options=dict(
+                name=dict(type='str', required=True),
+                definition=dict(type='dict', required=False),
+                configuration=dict(type='dict', required=False, default={}),
+            ),
+        ),
+        prune=dict(type='bool', default=False),
+        rollout_databases=dict(type='list', elements='str', default=[]),
+        rollout_concurrency=dict(type='int', default=1),
+        max_wait=dict(type='int', default=600),
+        poll_interval=dict(type='int', default=5),
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    if not HAS_LIB:
+        module.fail_json(msg=missing_required_lib("ravendb"), exception=LIB_ERR)
+
+    url = module.params['url']
+    db_name = module.params['database_name']
+    cert_path = module.params.get('certificate_path')
+    ca_path = module.params.get('ca_cert_path')
+    items = module.params['indexes'] or []
+    prune = module.params['prune']
+    rollout_dbs = [d for d in (module.params['rollout_databases'] or []) if d != db_name]
+    rollout_concurrency = int(module.params['rollout_concurrency'])
+    max_wait = int(module.params['max_wait'])
+    poll_interval = int(module.params['poll_interval'])
+
+    checks = [
+        validate_url(url),
+        validate_database_name(db_name),
+        validate_paths_exist(cert_path, ca_path),
+    ]
+    for rollout_db in rollout_dbs:
+        checks.append(validate_database_name(rollout_db))
+    for item in items:
+        checks.append(validate_index_name(item['name']))
+        checks.append(validate_dict("definition of index '{}'".format(item['name']), item.get('definition')))
+    ok, err = collect_errors(*checks)
+    if not ok:
+        module.fail_json(msg=err)
+
+    names = [item['name'] for item in items]
+    duplicates = sorted(set(n for n in names if names.count(n) > 1))
+    if duplicates:
+        module.fail_json(msg="Duplicate index names in indexes: {}".format(", ".join(duplicates)))
+    if rollout_concurrency < 1:
+        module.fail_json(msg="rollout_concurrency must be at least 1.")
+
+    specs = []
+    for item in items:
+        ok, normalized_cfg, err = validate_index_configuration(item.get('configuration') or {})
+        if not ok:
+            module.fail_json(msg="Index '{}': {}".format(item['name'], err))
+        raw_def = item.get('definition')
+        specs.append(IndexSpec(
+            db_name=db_name,
+            name=item['name'],
+            definition=IndexDefinitionSpec.from_dict(raw_def) if raw_def else None,
+            configuration=normalized_cfg or {},
+        ))
+
+    ctx = None
+    try:
+        ctx = DocumentStoreFactory.create(url, db_name, cert_path, ca_path)
+        if rollout_dbs:
+            # dict.fromkeys keeps the declared order while dropping repeats
+            rollout = IndexRollout(ctx, list(dict.fromkeys([db_name] + rollout_dbs)), rollout_concurrency,
+                                   max_wait=max_wait, poll_interval=poll_interval)
+            res = rollout.run(specs, prune, module.check_mode)
+        else:
+            res = IndexReconciler(ctx, db_name).ensure_set(specs, prune, module.check_mode)
+
+        if res.failed:
+            module.fail_json(**res.to_ansible())
+        else:
+            module.exit_json(**res.to_ansible())
+
+    except Exception as e:
+        module.fail_json(msg="Unexpected error: {}".format(str(e)))
+    finally:
+        if ctx:
+            ctx.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# tests/unit/test_client.py
+# Copyright (c), RavenDB
+# GNU General Public License v3.0 or later (see COPYING or
+# https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import threading
+from unittest import TestCase
+from unittest.mock import Mock
+
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core.client import StorePool, StoreContext
+
+
+class TestStorePool(TestCase):
+
+    def test_same_key_reuses_store(self):
+        pool = StorePool(ttl=60)
+        factory = Mock(side_effect=lambda: Mock())
+        key = StorePool.key("http://localhost:8080/", "db1")
+
+        s1 = pool.acquire(key, factory)
+        s2 = pool.acquire(key, factory)
+
+        self.assertIs(s1, s2)
+        self.assertEqual(factory.call_count, 1)
+
+    def test_different_keys_get_different_stores(self):
+        pool = StorePool(ttl=60)
+        factory = Mock(side_effect=lambda: Mock())
+
+        s1 = pool.acquire(StorePool.key("http://localhost:8080", "db1"), factory)
+        s2 = pool.acquire(StorePool.key("http://localhost:8080", "db1", "cert.pem"), factory)
+
+        self.assertIsNot(s1, s2)
+        self.assertEqual(len(pool), 2)
+
+    def test_context_close_releases_instead_of_closing(self):
+        pool = StorePool(ttl=60)
+        store = pool.acquire(StorePool.key("http://localhost:8080"), Mock)
+
+        StoreContext(store=store, pool=pool).close()
+
+        store.close.assert_not_called()
+        self.assertEqual(len(pool), 1)
+
+    def test_idle_stores_are_evicted_after_ttl(self):
+        pool = StorePool(ttl=10)
+        key = StorePool.key("http://localhost:8080")
+        store = pool.acquire(key, Mock)
+        pool.release(store)
+
+        pool.evict_idle(now=pool._entries[key]["last_used"] + 5)
+        self.assertEqual(len(pool), 1)
+
+        pool.evict_idle(now=pool._entries[key]["last_used"] + 11)
+        self.assertEqual(len(pool), 0)
+        store.close.assert_called_once()
+
+    def test_stores_in_use_are_not_evicted(self):
+        pool = StorePool(ttl=0)
+        store = pool.acquire(StorePool.key("http://localhost:8080"), Mock)
+
+        pool.evict_idle()
+
+        self.assertEqual(len(pool), 1)
+        store.close.assert_not_called()
+
+    def test_slow_build_does_not_block_other_keys(self):
+        pool = StorePool(ttl=60)
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return Mock()
+
+        worker = threading.Thread(target=pool.acquire, args=(StorePool.key("http://slow:8080"), slow))
+        worker.start()
+        started.wait(5)
+
+        fast = pool.acquire(StorePool.key("http://fast:8080"), Mock)
+        self.assertFalse(release.is_set())
+        self.assertIsNotNone(fast)
+
+        release.set()
+        worker.join(5)
+        self.assertEqual(len(pool), 2)
@@ -14,6 +14,7 @@ from ansible_collections.ravendb.ravendb.plugins.module_utils.core.validation im
 from ansible_collections.ravendb.ravendb.plugins.module_utils.reconcilers.node_reconciler import NodeReconciler
 from ansible_collections.ravendb.ravendb.plugins.module_utils.dto.node import NodeSpec
 from ansible_collections.ravendb.ravendb.plugins.module_utils.core.tls import TLSConfig
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core.transport import HttpTransport, get_transport
 
 
 class TestAddNodeWithRavenDB(TestCase):
@@ -28,7 +29,7 @@ class TestAddNodeWithRavenDB(TestCase):
         return {"Topology": {"Members": {}, "Watchers": {}, "Promotables": {}}}
 
     def test_add_node_success(self):
-        with patch("requests.get") as mock_get, patch("requests.put") as mock_put:
+        with patch.object(HttpTransport, "get") as mock_get, patch.object(HttpTransport, "put") as mock_put:
             mock_get.return_value = Mock(status_code=200)
             mock_get.return_value.json.return_value = self._empty_topology()
 
@@ -42,7 +43,7 @@ class TestAddNodeWithRavenDB(TestCase):
             self.assertEqual(res.msg, "Node 'B' added as Member.")
 
     def test_add_node_check_mode(self):
-        with patch("requests.get") as mock_get:
+        with patch.object(HttpTransport, "get") as mock_get:
             mock_get.return_value = Mock(status_code=200)
             mock_get.return_value.json.return_value = self._empty_topology()
 
@@ -54,7 +55,7 @@ class TestAddNodeWithRavenDB(TestCase):
             self.assertEqual(res.msg, "Node 'B' would be added as Member.")
 
     def test_add_watcher_node(self):
-        with patch("requests.get") as mock_get, patch("requests.put") as mock_put:
+        with patch.object(HttpTransport, "get") as mock_get, patch.object(HttpTransport, "put") as mock_put:
             mock_get.return_value = Mock(status_code=200)
             mock_get.return_value.json.return_value = self._empty_topology()
 
@@ -68,7 +69,7 @@ class TestAddNodeWithRavenDB(TestCase):
             self.assertEqual(res.msg, "Node 'D' added as Watcher.")
 
     def test_add_already_added_node(self):
-        with patch("requests.get") as mock_get, patch("requests.put") as mock_put:
+        with patch.object(HttpTransport, "get") as mock_get, patch.object(HttpTransport, "put") as mock_put:
             mock_get.return_value = Mock(status_code=200)
             mock_get.return_value.json.return_value = self._empty_topology()
 
@@ -85,7 +86,7 @@ class TestAddNodeWithRavenDB(TestCase):
             self.assertIn("Failed to add node 'A'", res.msg)
 
     def test_add_node_with_existing_tag_different_url(self):
-        with patch("requests.get") as mock_get, patch("requests.put") as mock_put:
+        with patch.object(HttpTransport, "get") as mock_get, patch.object(HttpTransport, "put") as mock_put:
             mock_get.return_value = Mock(status_code=200)
             mock_get.return_value.json.return_value = self._empty_topology()
 
@@ -102,7 +103,7 @@ class TestAddNodeWithRavenDB(TestCase):
             self.assertIn("Failed to add node 'A'", res.msg)
 
     def test_node_already_present(self):
-        with patch("requests.get") as mock_get:
+        with patch.object(HttpTransport, "get") as mock_get:
             mock_get.return_value = Mock(status_code=200)
             mock_get.return_value.json.return_value = {
                 "Topology": {
@@ -120,6 +121,43 @@ class TestAddNodeWithRavenDB(TestCase):
             self.assertEqual(res.msg, "Node 'B' already present as Member at http://localhost:8081.")
 
 
+class TestHttpTransport(TestCase):
+
+    def test_transport_is_shared_per_tls_config(self):
+        a = get_transport(TLSConfig())
+        b = get_transport(TLSConfig())
+        c = get_transport(TLSConfig(certificate_path="client.pem", ca_cert_path="ca.pem"))
+
+        self.assertIs(a, b)
+        self.assertIsNot(a, c)
+        self.assertEqual(c.session.cert, "client.pem")
+        self.assertEqual(c.session.verify, "ca.pem")
+
+    def test_no_retry_transport_has_its_own_pool(self):
+        shared = get_transport(TLSConfig())
+        no_retry = get_transport(TLSConfig(), retries=0)
+
+        self.assertIsNot(shared, no_retry)
+        self.assertIs(no_retry, get_transport(TLSConfig(), retries=0))
+        self.assertEqual(no_retry.session.get_adapter("http://localhost").max_retries.total, 0)
+
+    def test_default_timeout_is_applied(self):
+        t = HttpTransport(TLSConfig(), timeout=7)
+        with patch.object(t.session, "request") as mock_request:
+            t.get("http://localhost:8080/build/version")
+            t.put("http://localhost:8080/admin/databases", timeout=30)
+
+        self.assertEqual(mock_request.call_args_list[0][1]["timeout"], 7)
+        self.assertEqual(mock_request.call_args_list[1][1]["timeout"], 30)
+
+    def test_only_idempotent_verbs_are_retried(self):
+        retry = HttpTransport(TLSConfig()).session.get_adapter("http://localhost").max_retries
+
+        self.assertTrue(retry.is_retry("GET", 503))
+        self.assertFalse(retry.is_retry("PUT", 503))
+        self.assertFalse(retry.is_retry("POST", 503))
+
+
 class TestValidationFunctions(TestCase):
     def test_valid_url(self):
         self.assertTrue(is_valid_url("https://example.com"))
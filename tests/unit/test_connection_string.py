@@ -0,0 +1,437 @@
+# tests/unit/test_connection_string.py
+# Copyright (c), RavenDB
+# GNU General Public License v3.0 or later (see COPYING or
+# https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase
+from unittest.mock import ANY, Mock, patch
+
+from ansible_collections.ravendb.ravendb.plugins.module_utils.services import capability_service as capsvc
+from ansible_collections.ravendb.ravendb.plugins.module_utils.services import connection_string_service as cssvc
+from ansible_collections.ravendb.ravendb.plugins.module_utils.reconcilers.connection_string_reconciler import (
+    ConnectionStringReconciler,
+)
+from ansible_collections.ravendb.ravendb.plugins.module_utils.dto.connection_string import ConnectionStringSpec
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core.tls import TLSConfig
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core import files
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core import secret_resolver
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core import version as versions
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core.result import ModuleResult
+
+
+BUCKETS = {"RavenConnectionStrings": {}, "SqlConnectionStrings": {}, "AiConnectionStrings": {}}
+
+
+def _ctx(url="http://a:8080"):
+    return Mock(store=Mock(urls=[url], database="db1"))
+
+
+class TestVersion(TestCase):
+
+    def test_parse_and_compare(self):
+        self.assertEqual(versions.parse_version("6.0.105-nightly"), (6, 0, 105))
+        self.assertEqual(versions.parse_version("7.1"), (7, 1, 0))
+        self.assertEqual(versions.parse_version(None), (0, 0, 0))
+        self.assertTrue(versions.at_least("7.1.2", "7.1.0"))
+        self.assertFalse(versions.at_least("5.4.120", "6.0.0"))
+
+    def test_server_version_reads_product_version(self):
+        http = Mock()
+        http.get.return_value = Mock(json=Mock(return_value={"ProductVersion": " 7.1.2 "}))
+
+        self.assertEqual(versions.server_version(http, "http://a:8080/"), "7.1.2")
+        http.get.assert_called_once_with("http://a:8080/build/version", timeout=10)
+
+
+class TestCapabilityCache(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.now = [1000.0]
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _get(self, ctx, ttl=300):
+        return capsvc.get_capabilities(ctx, TLSConfig(), ttl=ttl, directory=self.dir, clock=lambda: self.now[0])
+
+    def test_probes_once_per_cluster_within_ttl(self):
+        with patch.object(versions, "server_version", return_value="7.1.2") as version, \
+                patch.object(cssvc, "get_all_connection_strings_json", return_value=BUCKETS) as listing:
+            caps, cached = self._get(_ctx())
+            again, cached_again = self._get(_ctx("http://a:8080/"))
+            self._get(_ctx("http://b:8080"))
+
+        self.assertFalse(cached)
+        self.assertTrue(cached_again)
+        self.assertEqual(again["version"], "7.1.2")
+        self.assertEqual(again["buckets"], sorted(BUCKETS))
+        self.assertTrue(again["features"]["ai_connection_strings"])
+        # one probe for A, one for B
+        self.assertEqual(version.call_count, 2)
+        self.assertEqual(listing.call_count, 2)
+
+    def test_expired_or_disabled_cache_probes_again(self):
+        with patch.object(versions, "server_version", return_value="6.0.0") as version, \
+                patch.object(cssvc, "get_all_connection_strings_json", return_value=BUCKETS):
+            self._get(_ctx())
+            self.now[0] += 301
+            _, cached = self._get(_ctx())
+            _, uncached = self._get(_ctx(), ttl=0)
+
+        self.assertFalse(cached)
+        self.assertFalse(uncached)
+        self.assertEqual(version.call_count, 3)
+
+    def test_failed_listing_is_not_cached(self):
+        with patch.object(versions, "server_version", return_value="7.0.0"), \
+                patch.object(cssvc, "get_all_connection_strings_json", side_effect=[RuntimeError("503"), BUCKETS]):
+            caps, _ = self._get(_ctx())
+            again, cached = self._get(_ctx())
+
+        self.assertIsNone(caps["buckets"])
+        self.assertFalse(cached)
+        self.assertEqual(again["buckets"], sorted(BUCKETS))
+
+    def test_warm_cache_leaves_only_the_existence_read(self):
+        capsvc.store("http://a:8080", {
+            "url": "http://a:8080", "version": "7.1.0", "buckets": sorted(BUCKETS),
+            "features": capsvc.features_for("7.1.0"), "probed_at": time.time(),
+        }, directory=self.dir)
+        spec = ConnectionStringSpec("SNOWFLAKE", "sf", {"connection_string": "dsn"})
+        reconciler = ConnectionStringReconciler(_ctx(), capability_ttl=300)
+
+        with patch.object(capsvc, "default_cache_dir", return_value=self.dir), \
+                patch.object(versions, "server_version") as version, \
+                patch.object(cssvc, "get_all_connection_strings_json", return_value=BUCKETS) as listing:
+            with self.assertRaises(RuntimeError) as unsupported:
+                reconciler.ensure_present(spec, TLSConfig(), check_mode=True)
+            res = reconciler.ensure_present(ConnectionStringSpec("RAVEN", "out", {"database": "x"}), TLSConfig(), check_mode=True)
+
+        self.assertIn("not supported", str(unsupported.exception))
+        self.assertTrue(res.changed)
+        version.assert_not_called()
+        listing.assert_called_once()
+
+
+class TestConnectionStringSet(TestCase):
+
+    CURRENT = {
+        "RavenConnectionStrings": {
+            "raven-out": {"Name": "raven-out", "Database": "x", "TopologyDiscoveryUrls": [], "Type": "Raven"},
+            "old-out": {"Name": "old-out", "Database": "old", "Type": "Raven"},
+        },
+        "SqlConnectionStrings": {"sql-a": {"Name": "sql-a", "ConnectionString": "dsn", "FactoryName": None, "Type": "Sql"}},
+        "AiConnectionStrings": {"ai-keep": {"Name": "ai-keep", "Type": "Ai"}},
+    }
+
+    def _run(self, items, check_mode=False, prune=False):
+        caps = {"version": "7.1.0", "buckets": sorted(self.CURRENT)}
+        with patch.object(capsvc, "get_capabilities", return_value=(caps, True)), \
+                patch.object(cssvc, "get_all_connection_strings_json", return_value=self.CURRENT) as listing, \
+                patch.object(cssvc, "put") as put, \
+                patch.object(cssvc, "remove") as remove:
+            res = ConnectionStringReconciler(_ctx()).ensure_set(items, TLSConfig(), check_mode, prune=prune)
+        return res, listing, put, remove
+
+    def test_reads_once_and_puts_only_missing(self):
+        items = [
+            (ConnectionStringSpec("RAVEN", "raven-out", {"database": "x"}), "present"),
+            (ConnectionStringSpec("RAVEN", "raven-new", {"database": "y"}), "present"),
+            (ConnectionStringSpec("SQL", "sql-a", {"connection_string": "dsn"}), "present"),
+            (ConnectionStringSpec("SQL", "sql-gone"), "absent"),
+        ]
+        res, listing, put, remove = self._run(items)
+
+        listing.assert_called_once()
+        put.assert_called_once()
+        remove.assert_not_called()
+        self.assertEqual(res.extras["created"], ["RAVEN/raven-new"])
+        self.assertEqual(res.extras["unchanged"], ["RAVEN/raven-out", "SQL/sql-a", "SQL/sql-gone"])
+        self.assertEqual(res.extras["timings"]["RAVEN"]["count"], 2)
+        self.assertEqual(res.extras["timings"]["RAVEN"]["changed"], 1)
+        self.assertEqual(res.extras["timings"]["SQL"]["changed"], 0)
+
+    def test_prune_limits_to_declared_types(self):
+        items = [(ConnectionStringSpec("RAVEN", "raven-out", {"database": "x"}), "present")]
+        res, _, put, remove = self._run(items, prune=True)
+
+        put.assert_not_called()
+        remove.assert_called_once_with(ANY, "RAVEN", "old-out")
+        self.assertEqual(res.extras["deleted"], ["RAVEN/old-out"])
+        self.assertTrue(res.changed)
+
+    def test_check_mode_and_per_item_failures(self):
+        items = [
+            (ConnectionStringSpec("RAVEN", "raven-new", {"database": "y"}), "present"),
+            (ConnectionStringSpec("SNOWFLAKE", "sf", {"connection_string": "dsn"}), "present"),
+        ]
+        res, _, put, remove = self._run(items, check_mode=True)
+
+        put.assert_not_called()
+        self.assertTrue(res.failed)
+        self.assertEqual(res.extras["created"], ["RAVEN/raven-new"])
+        self.assertEqual(res.extras["failed_connection_strings"], ["SNOWFLAKE/sf"])
+        self.assertNotIn("failed", res.extras)
+        self.assertIn("not supported", res.extras["connection_strings"][1]["msg"])
+
+    def test_changed_definition_is_updated_in_place(self):
+        items = [
+            (ConnectionStringSpec("RAVEN", "raven-out", {"database": "moved"}), "present"),
+            (ConnectionStringSpec("SQL", "sql-a", {"connection_string": "dsn"}), "present"),
+        ]
+        res, _, put, remove = self._run(items)
+
+        put.assert_called_once()
+        remove.assert_not_called()
+        self.assertEqual(res.extras["updated"], ["RAVEN/raven-out"])
+        self.assertEqual(res.extras["unchanged"], ["SQL/sql-a"])
+        self.assertEqual(res.extras["connection_strings"][0]["changes"],
+                         [{"path": "Database", "secret": False, "before": "x", "after": "moved"}])
+
+
+class TestConnectionStringDiff(TestCase):
+
+    def _reconcile(self, spec, current, check_mode=False):
+        caps = {"version": "7.1.0", "buckets": ["RavenConnectionStrings", "SqlConnectionStrings", "ElasticSearchConnectionStrings"]}
+        with patch.object(capsvc, "get_capabilities", return_value=(caps, True)), \
+                patch.object(cssvc, "current_json", return_value=current), \
+                patch.object(cssvc, "put") as put:
+            res = ConnectionStringReconciler(_ctx()).ensure_present(spec, TLSConfig(), check_mode)
+        return res, put
+
+    def test_unchanged_definition_is_not_sent(self):
+        current = {"Name": "sql", "ConnectionString": "Server=db;Password=s3cret", "FactoryName": "Npgsql", "Type": "Sql"}
+        spec = ConnectionStringSpec("SQL", "sql", {"connection_string": "Server=db;Password=s3cret", "factory_name": "Npgsql"})
+        res, put = self._reconcile(spec, current)
+
+        self.assertFalse(res.changed)
+        put.assert_not_called()
+
+    def test_changed_secret_is_reported_as_fingerprint(self):
+        current = {"Name": "sql", "ConnectionString": "Server=db;Password=old", "FactoryName": "Npgsql", "Type": "Sql"}
+        spec = ConnectionStringSpec("SQL", "sql", {"connection_string": "Server=db;Password=new", "factory_name": "Npgsql"})
+        res, put = self._reconcile(spec, current)
+
+        put.assert_called_once()
+        self.assertTrue(res.changed)
+        self.assertNotIn("diff", res.extras)
+        change = res.extras["changes"][0]
+        self.assertEqual(change["path"], "ConnectionString")
+        self.assertTrue(change["secret"])
+        self.assertTrue(change["before"].startswith("sha256:"))
+        self.assertNotIn("Password=", str(res.to_ansible()))
+
+    def test_nested_fields_and_unreturned_secrets(self):
+        current = {
+            "Name": "es", "Nodes": ["https://es1:9200"], "Type": "ElasticSearch",
+            "Authentication": {"Basic": {"Username": "elastic", "Password": None}},
+        }
+        spec = ConnectionStringSpec("ELASTIC_SEARCH", "es", {
+            "nodes": ["https://es1:9200"],
+            "authentication": {"basic": {"username": "ops", "password": "pw"}},
+        })
+        res, put = self._reconcile(spec, current, check_mode=True)
+
+        put.assert_not_called()
+        self.assertEqual([c["path"] for c in res.extras["changes"]], ["Authentication.Basic.Username"])
+
+    def test_free_form_options_and_credential_names_are_fingerprinted(self):
+        current = {
+            "Name": "kafka", "BrokerType": "Kafka", "Type": "Queue",
+            "KafkaConnectionSettings": {
+                "BootstrapServers": "k1:9092",
+                "ConnectionOptions": {"sasl.password": "old-pw", "sasl.username": "etl"},
+            },
+        }
+        cs = cssvc.builder_for("QUEUE")("kafka", {
+            "broker_type": "kafka",
+            "kafka_settings": {
+                "bootstrap_servers": "k2:9092",
+                "connection_options": {"sasl.password": "new-pw", "sasl.username": "etl2"},
+            },
+        })
+
+        diff = dict((c["path"], c) for c in cssvc.diff_connection_string(cs, current))
+
+        self.assertFalse(diff["KafkaConnectionSettings.BootstrapServers"]["secret"])
+        self.assertTrue(diff["KafkaConnectionSettings.ConnectionOptions.sasl.password"]["secret"])
+        self.assertTrue(diff["KafkaConnectionSettings.ConnectionOptions.sasl.username"]["secret"])
+        self.assertNotIn("pw", str(diff))
+        self.assertNotIn("etl", str(diff))
+
+        nested = {"Settings": {"RefreshToken": "t0k3n", "Host": "h"}}
+        out = []
+        cssvc._diff(nested, {"Settings": {"RefreshToken": "old", "Host": "h"}}, [], cssvc.new_salt(), out)
+        self.assertEqual([(c["path"], c["secret"]) for c in out], [("Settings.RefreshToken", True)])
+        self.assertNotIn("t0k3n", str(out))
+
+    def test_fingerprints_are_salted(self):
+        a, b = cssvc.new_salt(), cssvc.new_salt()
+        self.assertEqual(cssvc.fingerprint("secret", a), cssvc.fingerprint("secret", a))
+        self.assertNotEqual(cssvc.fingerprint("secret", a), cssvc.fingerprint("secret", b))
+
+
+class TestSecretResolver(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.resolver = secret_resolver.SecretResolver()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _file(self, name, content):
+        path = os.path.join(self.dir, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_file_is_read_once_until_it_changes(self):
+        path = self._file("key", "s3cret\n")
+        with patch.object(secret_resolver, "_read_file", wraps=secret_resolver._read_file) as read:
+            values = [self.resolver.resolve(path) for _ in range(12)] + [self.resolver.resolve("file:" + path)]
+            self.assertEqual(set(values), {"s3cret"})
+            self.assertEqual(read.call_count, 1)
+
+            self._file("key", "rotated-and-longer")
+            self.assertEqual(self.resolver.resolve(path), "rotated-and-longer")
+            self.assertEqual(read.call_count, 2)
+
+    def test_env_command_and_literal(self):
+        with patch.dict(os.environ, {"ETL_DSN": " Server=db \n"}):
+            self.assertEqual(self.resolver.resolve("env:ETL_DSN"), "Server=db")
+        self.resolver.allow("cmd")
+        self.assertEqual(self.resolver.resolve("cmd:echo from-command"), "from-command")
+        self.assertEqual(self.resolver.resolve(" plain "), "plain")
+        with self.assertRaises(ValueError):
+            self.resolver.resolve("env:RAVENDB_TEST_UNSET_VARIABLE")
+        with self.assertRaises(RuntimeError):
+            self.resolver.resolve("cmd:false")
+
+    def test_commands_are_disabled_by_default(self):
+        with patch.object(secret_resolver.subprocess, "run") as run:
+            with self.assertRaises(ValueError):
+                self.resolver.resolve("cmd:echo from-command")
+        run.assert_not_called()
+        self.assertNotIn("cmd", secret_resolver.default_resolver().allowed)
+
+    def test_prefetch_resolves_each_reference_once(self):
+        path = self._file("aws", "AKIA")
+        specs = [
+            {"s3_settings": {"aws_access_key": path, "aws_secret_key": "env:AWS_SK", "bucket_name": path}},
+            {"glacier_settings": {"aws_access_key": path, "aws_secret_key": "env:AWS_SK"}},
+        ]
+        provider = Mock(return_value="sk")
+        self.resolver.register("env", provider)
+
+        self.assertEqual(self.resolver.prefetch(*specs), 2)
+        self.assertEqual(self.resolver.resolve("env:AWS_SK"), "sk")
+        provider.assert_called_once_with("AWS_SK")
+        self.assertEqual(self.resolver.misses, 2)
+
+    def test_read_secret_delegates_to_resolver(self):
+        path = self._file("pw", "pw\n")
+        self.assertEqual(files.read_secret(path), "pw")
+        self.assertIsNone(files.read_secret(None))
+        self.assertEqual(files.read_secret(42), "42")
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Fake test-connection endpoints: answers after `delay` seconds, failing for hosts named 'down'."""
+
+    delay = 0.3
+    calls = []
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8")
+        cls = type(self)
+        with cls.lock:
+            cls.calls.append((self.path, body))
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        time.sleep(self.delay)
+        with cls.lock:
+            cls.in_flight -= 1
+        if "/sql/" in self.path and "down" in body:
+            payload = {"Success": False, "Error": "could not connect to 'down'"}
+        elif "url=https%3A%2F%2Fdown" in self.path:
+            self.send_response(500)
+            self.end_headers()
+            self.wfile.write(b"connection refused")
+            return
+        else:
+            payload = {"Success": True}
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestConnectivity(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+        cls.url = "http://127.0.0.1:{}".format(cls.server.server_address[1])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _StubHandler.calls = []
+        _StubHandler.peak = 0
+
+    def test_targets_are_tested_concurrently(self):
+        specs = [
+            ConnectionStringSpec("SQL", "sql-ok", {"connection_string": "Server=db", "factory_name": "Npgsql"}),
+            ConnectionStringSpec("SQL", "sql-down", {"connection_string": "Server=down", "factory_name": "Npgsql"}),
+            ConnectionStringSpec("ELASTIC_SEARCH", "es", {"nodes": ["https://es1:9200", "https://down:9200"]}),
+            ConnectionStringSpec("OLAP", "olap", {"local_settings": {"folder_path": "/tmp"}}),
+        ]
+        results = cssvc.test_connections(_ctx(self.url), specs, TLSConfig(), max_workers=8, timeout=5)
+
+        self.assertEqual(len(_StubHandler.calls), 4)
+        # the calls overlapped at the server instead of running one after another
+        self.assertGreater(_StubHandler.peak, 1)
+        self.assertEqual([(r["name"], r["ok"]) for r in results],
+                         [("sql-ok", True), ("sql-down", False), ("es", True), ("es", False), ("olap", None)])
+        self.assertIn("could not connect", results[1]["error"])
+        self.assertIn("HTTP 500", results[3]["error"])
+        self.assertTrue(results[4]["skipped"])
+        self.assertTrue(all(r["latency_ms"] >= _StubHandler.delay * 1000 for r in results[:4]))
+        self.assertTrue(any(path.startswith("/databases/db1/admin/etl/sql/test-connection")
+                            for path, _ in _StubHandler.calls))
+
+    def test_unreachable_target_fails_the_result(self):
+        reconciler = ConnectionStringReconciler(_ctx(self.url))
+        res = ModuleResult.ok(msg="Created connection string 'sql-down' (type SQL).", changed=True)
+        spec = ConnectionStringSpec("SQL", "sql-down", {"connection_string": "Server=down", "factory_name": "Npgsql"})
+
+        out = reconciler.test_connections(res, [spec], TLSConfig(), timeout=5)
+
+        self.assertTrue(out.failed)
+        self.assertTrue(out.changed)
+        self.assertIn("Connection test failed for: SQL/sql-down", out.msg)
+        self.assertEqual(len(out.extras["connectivity"]), 1)
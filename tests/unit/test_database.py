@@ -5,8 +5,9 @@
 
 import os
 from ravendb_test_driver import RavenTestDriver
+from ravendb.serverwide.database_record import DatabaseRecordWithEtag
 from unittest import TestCase
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 from ansible_collections.ravendb.ravendb.plugins.module_utils.core.validation import (
     is_valid_url,
@@ -17,6 +18,7 @@ from ansible_collections.ravendb.ravendb.plugins.module_utils.core.validation im
 )
 from ansible_collections.ravendb.ravendb.plugins.module_utils.reconcilers.database_reconciler import (
     DatabaseReconciler,
+    DatabaseSetReconciler,
 )
 from ansible_collections.ravendb.ravendb.plugins.module_utils.dto.database import (
     DatabaseSpec,
@@ -25,6 +27,8 @@ from ansible_collections.ravendb.ravendb.plugins.module_utils.dto.database impor
 from ansible_collections.ravendb.ravendb.plugins.module_utils.core.client import StoreContext
 from ansible_collections.ravendb.ravendb.plugins.module_utils.core.tls import TLSConfig
 from ansible_collections.ravendb.ravendb.plugins.module_utils.services import db_settings_service as setsvc
+from ansible_collections.ravendb.ravendb.plugins.module_utils.services import database_service as dbs
+from ansible_collections.ravendb.ravendb.plugins.module_utils.reconcilers import database_reconciler as dbrec
 
 
 class TestDBStateValidator(TestCase):
@@ -138,6 +142,300 @@ class TestDBStateValidator(TestCase):
         self.assertIn("Would apply settings (Indexing.MapBatchSize) and reload", res.msg)
 
 
+class TestDatabaseListing(TestCase):
+
+    def test_iter_database_names_pages_through_all(self):
+        names = ["db{:04d}".format(i) for i in range(3000)]
+        pages = []
+
+        def page(ctx, start=0, max=128):
+            pages.append((start, max))
+            return names[start:start + max]
+
+        with patch.object(dbs, "list_databases", side_effect=page):
+            streamed = list(dbs.iter_database_names(Mock(), page_size=1000))
+
+        self.assertEqual(streamed, names)
+        self.assertEqual(pages, [(0, 1000), (1000, 1000), (2000, 1000), (3000, 1000)])
+
+    def test_existence_uses_single_record_lookup(self):
+        with patch.object(dbs, "get_record", side_effect=[object(), None]) as get_record, \
+                patch.object(dbs, "list_databases") as list_databases:
+            self.assertTrue(dbs.database_exists(Mock(), "db2999"))
+            self.assertFalse(dbs.database_exists(Mock(), "missing"))
+
+        self.assertEqual(get_record.call_count, 2)
+        list_databases.assert_not_called()
+
+    def test_ensure_absent_probes_the_one_database(self):
+        with patch.object(dbs, "get_record", return_value=None), \
+                patch.object(dbs, "list_databases") as list_databases:
+            res = DatabaseReconciler(Mock()).ensure_absent("db2999", check_mode=False)
+
+        self.assertFalse(res.changed)
+        list_databases.assert_not_called()
+
+
+class TestDatabaseSet(TestCase):
+
+    def _spec(self, name, **kw):
+        return DatabaseSpec(url="http://localhost:8080", name=name, replication_factor=kw.pop("rf", 1), **kw)
+
+    def test_lists_once_and_reports_every_database(self):
+        existing = ["db{:03d}".format(i) for i in range(300)]
+        items = [(self._spec("db{:03d}".format(i)), "present") for i in range(295, 310)]
+        items.append((self._spec("db000"), "absent"))
+
+        with patch.object(dbs, "list_databases", side_effect=lambda ctx, start=0, max=128: existing[start:start + max]) as listing, \
+                patch.object(dbs, "get_record", return_value=object()) as get_record, \
+                patch.object(dbs, "create_database") as create, \
+                patch.object(dbs, "delete_database") as delete:
+            res = DatabaseSetReconciler(Mock(), max_workers=4).run(items, TLSConfig(), check_mode=False)
+
+        self.assertFalse(res.failed)
+        self.assertTrue(res.changed)
+        self.assertEqual(listing.call_count, 3)
+        # records are only fetched for databases that already exist
+        self.assertEqual(get_record.call_count, 5)
+        self.assertEqual(create.call_count, 10)
+        delete.assert_called_once()
+        self.assertEqual(res.extras["created"], ["db{:03d}".format(i) for i in range(300, 310)])
+        self.assertEqual(res.extras["deleted"], ["db000"])
+        self.assertEqual(len(res.extras["unchanged"]), 5)
+        self.assertEqual([o["name"] for o in res.extras["databases"]], [spec.name for spec, _ in items])
+        self.assertTrue(all(o["duration"] >= 0 for o in res.extras["databases"]))
+
+    def test_failures_are_reported_per_database(self):
+        items = [(self._spec("ok_db"), "present"), (self._spec("bad_db", rf=None), "present")]
+
+        with patch.object(dbs, "list_databases", return_value=[]), \
+                patch.object(dbs, "create_database"):
+            res = DatabaseSetReconciler(Mock()).run(items, TLSConfig(), check_mode=False)
+
+        self.assertTrue(res.failed)
+        self.assertEqual(res.extras["failed_databases"], ["bad_db"])
+        self.assertNotIn("failed", res.extras)
+        self.assertEqual(res.extras["created"], ["ok_db"])
+        self.assertIn("bad_db", res.msg)
+
+    def test_check_mode_creates_nothing(self):
+        with patch.object(dbs, "list_databases", return_value=[]), \
+                patch.object(dbs, "create_database") as create:
+            res = DatabaseSetReconciler(Mock()).run([(self._spec("new_db"), "present")], TLSConfig(), check_mode=True)
+
+        self.assertTrue(res.changed)
+        self.assertEqual(res.extras["created"], ["new_db"])
+        create.assert_not_called()
+
+
+class FakeTopology(object):
+    """Database group whose new replicas are promoted after `polls` record reads."""
+
+    def __init__(self, members, polls=2, stuck=()):
+        self.members = list(members)
+        self.promotables = {}
+        self.polls = polls
+        self.stuck = stuck
+        self.events = []
+
+    def record(self, ctx, name):
+        for tag in list(self.promotables):
+            self.promotables[tag] -= 1
+            if self.promotables[tag] <= 0:
+                del self.promotables[tag]
+                self.members.append(tag)
+                self.events.append(("promoted", tag))
+        return DatabaseRecordWithEtag.from_json({
+            "DatabaseName": name,
+            "Topology": {
+                "Members": list(self.members),
+                "Promotables": list(self.promotables),
+                "Rehabs": [],
+                "PromotablesStatus": dict((t, "ChangeVectorNotMerged") for t in self.promotables),
+            },
+            "Encrypted": False,
+            "Etag": 1,
+        })
+
+    def add(self, ctx, name, tag=None):
+        tag = tag or next(t for t in "ABCDE" if t not in self.members and t not in self.promotables)
+        self.events.append(("added", tag))
+        self.promotables[tag] = self.polls
+
+    def remove(self, ctx, name, tag, hard_delete=False):
+        self.events.append(("removed", tag))
+        if tag not in self.stuck:
+            self.members.remove(tag)
+
+
+class TestTopologyReconcile(TestCase):
+
+    def _run(self, fake, check_mode=False, **kw):
+        spec = DatabaseSpec(url="http://localhost:8080", name="db1", **kw)
+        with patch.object(dbs, "get_record", side_effect=fake.record), \
+                patch.object(dbs, "add_database_node", side_effect=fake.add), \
+                patch.object(dbs, "remove_database_node", side_effect=fake.remove), \
+                patch.object(dbrec, "fetch_topology"), \
+                patch.object(dbrec, "collect_tags", return_value=["A", "B", "C", "D"]), \
+                patch("time.sleep"):
+            return DatabaseReconciler(Mock()).ensure_present(spec, TLSConfig(), check_mode=check_mode)
+
+    def test_adds_one_member_at_a_time_after_promotion(self):
+        fake = FakeTopology(["A"])
+        res = self._run(fake, replication_factor=3, members=["A", "B", "C"])
+
+        self.assertTrue(res.changed, res.msg)
+        self.assertEqual(fake.events, [("added", "B"), ("promoted", "B"), ("added", "C"), ("promoted", "C")])
+        self.assertEqual(res.extras["topology"]["added"], ["B", "C"])
+        self.assertTrue(res.extras["topology"]["waits"]["C"]["ok"])
+
+    def test_removes_only_after_additions(self):
+        fake = FakeTopology(["A", "B"])
+        res = self._run(fake, replication_factor=2, members=["A", "C"])
+
+        self.assertTrue(res.changed, res.msg)
+        self.assertEqual(fake.events, [("added", "C"), ("promoted", "C"), ("removed", "B")])
+        self.assertEqual(fake.members, ["A", "C"])
+
+    def test_replication_factor_growth_lets_the_server_place(self):
+        fake = FakeTopology(["A"], polls=1)
+        res = self._run(fake, replication_factor=2)
+
+        self.assertTrue(res.changed, res.msg)
+        self.assertEqual(res.extras["topology"]["added"], ["B"])
+
+    def test_stalled_replica_fails_with_partial_topology(self):
+        fake = FakeTopology(["A"], polls=10 ** 6)
+        res = self._run(fake, replication_factor=2, members=["A", "B"], promotion_timeout=0)
+
+        self.assertTrue(res.failed)
+        self.assertIn("did not catch up", res.msg)
+        self.assertEqual(res.extras["topology"]["waits"]["B"]["detail"]["state"], "promotable")
+        self.assertEqual(res.extras["topology"]["waits"]["B"]["detail"]["status"], "ChangeVectorNotMerged")
+
+    def test_stuck_removal_fails(self):
+        fake = FakeTopology(["A", "B", "C"], stuck=("C",))
+        res = self._run(fake, replication_factor=1, members=["A"], promotion_timeout=0)
+
+        self.assertTrue(res.failed)
+        self.assertIn("was not removed", res.msg)
+        self.assertEqual(res.extras["topology"]["removed"], ["B"])
+        self.assertFalse(res.extras["topology"]["waits"]["C"]["ok"])
+
+    def test_reducing_replication_factor_needs_members(self):
+        res = self._run(FakeTopology(["A", "B"]), replication_factor=1)
+
+        self.assertTrue(res.failed)
+        self.assertIn("requires topology_members", res.msg)
+
+    def test_check_mode_plans_without_changes(self):
+        fake = FakeTopology(["A"])
+        res = self._run(fake, check_mode=True, replication_factor=2, members=["A", "B"])
+
+        self.assertTrue(res.changed)
+        self.assertEqual(fake.events, [])
+        self.assertEqual(res.extras["topology"]["added"], ["B"])
+
+
+def _group(status):
+    return {"Databases": [{
+        "Name": "db1",
+        "NodesTopology": {
+            "Members": [{"NodeTag": t, "NodeUrl": "http://{}:8080".format(t.lower())} for t in ("A", "B")],
+            "Status": dict((t, {"LastStatus": s}) for t, s in status.items()),
+        },
+    }]}
+
+
+class TestSettingsReload(TestCase):
+
+    def _ctx(self, snapshots, version="6.2.0"):
+        http = Mock()
+        http.get.side_effect = [Mock(json=Mock(return_value=snap), raise_for_status=Mock())
+                                for snap in [{"ProductVersion": version}] + list(snapshots)]
+        http.post.return_value = Mock(status_code=200, raise_for_status=Mock())
+        return Mock(http=Mock(return_value=http), base_url=Mock(return_value="http://a:8080")), http
+
+    def test_classify_separates_equivalent_values(self):
+        reload_keys, record_only = setsvc.classify(
+            {"Indexing.MapBatchSize": "128", "Storage.ForceUsing32BitsPager": "true", "Queries.MaxClauseCount": "1024.0"},
+            {"Indexing.MapBatchSize": "64", "Storage.ForceUsing32BitsPager": "True", "Queries.MaxClauseCount": "1024"},
+        )
+        self.assertEqual(reload_keys, ["Indexing.MapBatchSize"])
+        self.assertEqual(record_only, ["Queries.MaxClauseCount", "Storage.ForceUsing32BitsPager"])
+
+    def test_equivalent_change_skips_reload(self):
+        with patch.object(setsvc, "put_settings") as put, patch.object(setsvc, "reload_all") as reload_all:
+            out = setsvc.apply(Mock(), "db1", {"Storage.ForceUsing32BitsPager": "true"},
+                               current={"Storage.ForceUsing32BitsPager": "True"})
+
+        put.assert_called_once()
+        reload_all.assert_not_called()
+        self.assertEqual(out["reload"], "not_needed")
+
+    def test_full_reload_is_the_default(self):
+        with patch.object(setsvc, "put_settings"), patch.object(setsvc, "reload_all") as reload_all, \
+                patch.object(setsvc, "check_rolling_supported") as check:
+            out = setsvc.apply(Mock(), "db1", {"Indexing.MapBatchSize": "128"}, current={})
+
+        reload_all.assert_called_once()
+        check.assert_not_called()
+        self.assertEqual(out["reload"], "all")
+        self.assertEqual(DatabaseSpec(url="http://localhost:8080", name="db1").settings_reload, "all")
+
+    def test_rolling_reload_restarts_one_node_at_a_time(self):
+        ok = {"A": "Ok", "B": "Ok"}
+        ctx, http = self._ctx([_group(ok), _group(ok), _group(ok), _group(ok), _group(ok)])
+
+        with patch.object(setsvc, "put_settings") as put, patch.object(setsvc, "reload_all") as reload_all:
+            out = setsvc.apply(ctx, "db1", {"Indexing.MapBatchSize": "128", "Queries.MaxClauseCount": "2048"},
+                               current={"Indexing.MapBatchSize": "64"}, reload="rolling")
+
+        put.assert_called_once()
+        reload_all.assert_not_called()
+        self.assertEqual(out["reload"], "rolling")
+        self.assertEqual(out["nodes"], ["A", "B"])
+        self.assertEqual([c[0][0] for c in http.post.call_args_list],
+                         ["http://a:8080/admin/databases/restart", "http://b:8080/admin/databases/restart"])
+
+    def test_rolling_reload_waits_for_another_online_member(self):
+        ctx, http = self._ctx([
+            _group({"A": "Ok", "B": "Ok"}),
+            _group({"A": "Ok", "B": "Loading"}),
+            _group({"A": "Ok", "B": "Ok"}),
+            _group({"A": "Ok", "B": "Ok"}),
+            _group({"A": "Ok", "B": "Ok"}),
+            _group({"A": "Ok", "B": "Ok"}),
+        ])
+
+        with patch.object(setsvc, "put_settings"), patch("time.sleep") as sleep:
+            out = setsvc.apply(ctx, "db1", {"Indexing.MapBatchSize": "128"}, current={}, reload="rolling")
+
+        self.assertEqual(out["nodes"], ["A", "B"])
+        self.assertEqual(sleep.call_count, 1)
+
+    def test_rolling_reload_fails_on_servers_without_per_node_restart(self):
+        ctx, http = self._ctx([_group({"A": "Ok", "B": "Ok"})] * 2, version="5.4.120")
+
+        with patch.object(setsvc, "put_settings") as put, patch.object(setsvc, "reload_all") as reload_all:
+            with self.assertRaises(setsvc.RollingReloadUnsupported):
+                setsvc.apply(ctx, "db1", {"Indexing.MapBatchSize": "128"}, current={}, reload="rolling")
+
+        put.assert_not_called()
+        reload_all.assert_not_called()
+        http.post.assert_not_called()
+
+    def test_failed_node_restart_is_not_retried_as_full_reload(self):
+        ctx, http = self._ctx([_group({"A": "Ok", "B": "Ok"})] * 2)
+        http.post.return_value.raise_for_status.side_effect = RuntimeError("404 Not Found")
+
+        with patch.object(setsvc, "put_settings"), patch.object(setsvc, "reload_all") as reload_all:
+            with self.assertRaises(RuntimeError):
+                setsvc.apply(ctx, "db1", {"Indexing.MapBatchSize": "128"}, current={}, reload="rolling")
+
+        reload_all.assert_not_called()
+
+
 class TestValidationFunctions(TestCase):
     def test_valid_url(self):
         self.assertTrue(is_valid_url("https://example.com"))
@@ -0,0 +1,476 @@
+# tests/unit/test_healthcheck.py
+# Copyright (c), RavenDB
+# GNU General Public License v3.0 or later (see COPYING or
+# https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import json
+import os
+import tempfile
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import Mock, patch
+from types import SimpleNamespace
+
+from ansible_collections.ravendb.ravendb.plugins.module_utils.services import healthcheck_service as hcsvc
+from ansible_collections.ravendb.ravendb.plugins.module_utils.services import notification_service as notifications
+from ansible_collections.ravendb.ravendb.plugins.module_utils.services import retry_service
+from ansible_collections.ravendb.ravendb.plugins.module_utils.services.retry_service import (
+    retry_until, RetryStrategy, BreakRetry
+)
+
+
+def _db(name, last_status="Ok", last_error=None, rf=2):
+    status = {tag: {"LastStatus": last_status, "LastError": last_error} for tag in ("A", "B")}
+    return {
+        "Name": name,
+        "ReplicationFactor": rf,
+        "NodesTopology": {"Members": [{"NodeTag": "A"}, {"NodeTag": "B"}], "Status": status},
+    }
+
+
+def _ctx(*snapshots):
+    http = Mock()
+    http.get.side_effect = [Mock(json=Mock(return_value={"Databases": dbs})) for dbs in snapshots]
+    return SimpleNamespace(base_url=Mock(return_value="http://localhost:8080"), http=Mock(return_value=http)), http
+
+
+class TestDatabaseGroupsSnapshot(TestCase):
+
+    def test_one_request_per_poll(self):
+        ctx, http = _ctx([_db("db{}".format(i)) for i in range(2000)])
+
+        ok, detail = hcsvc._check_all_databases_online(ctx, None, sleep=Mock())
+
+        self.assertTrue(ok)
+        self.assertEqual(detail, {"checked": 2000})
+        self.assertEqual(http.get.call_count, 1)
+        ctx.http.assert_called_once_with(retries=0)
+
+    def test_only_hard_error_groups_are_rechecked(self):
+        broken = _db("broken", last_status="Error", last_error="System.IO.EndOfStreamException")
+        healthy_again = _db("broken")
+        ctx, http = _ctx([_db("a"), broken, _db("c")], [_db("a"), healthy_again, _db("c")])
+        sleep = Mock()
+
+        ok, _ = hcsvc._check_all_databases_online(ctx, None, sleep=sleep)
+
+        self.assertTrue(ok)
+        self.assertEqual(http.get.call_count, 2)
+        sleep.assert_called_once_with(hcsvc.HARD_ERROR_RECHECK_SECONDS)
+
+    def test_persistent_hard_error_fails_group(self):
+        broken = _db("broken", last_status="Error", last_error="System.IO.EndOfStreamException")
+        ctx, _ = _ctx([_db("a"), broken], [_db("a"), broken])
+
+        ok, detail = hcsvc._check_all_databases_online(ctx, None, sleep=Mock())
+
+        self.assertFalse(ok)
+        self.assertEqual(list(detail["failing"]), ["broken"])
+        self.assertEqual(detail["failing"]["broken"]["reason"], "load_error")
+
+
+class TestProbeNodes(TestCase):
+
+    def _alive(self, session, url, max_time_to_wait, interval, strategy=None, sleep=None, on_attempt=None):
+        if "bad" in url:
+            return {"ok": False, "attempts": 1, "error": "timeout", "detail": None}
+        return {"ok": True, "attempts": 1, "error": None, "detail": {"status": 200, "latency_ms": 1.5}}
+
+    def test_nodes_are_probed_concurrently(self):
+        urls = ["http://node-{}:8080".format(i) for i in range(6)]
+        lock = threading.Lock()
+        all_in_flight = threading.Event()
+        state = {"in_flight": 0, "peak": 0}
+
+        def alive(session, url, *args, **kwargs):
+            with lock:
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+                if state["in_flight"] == len(urls):
+                    all_in_flight.set()
+            # every probe holds its worker until all of them are running at once
+            all_in_flight.wait(2)
+            with lock:
+                state["in_flight"] -= 1
+            return {"ok": True, "attempts": 1, "error": None, "detail": {"status": 200, "latency_ms": 1.5}}
+
+        with patch.object(hcsvc, "build_session", return_value=Mock()), \
+                patch.object(hcsvc, "wait_for_node_alive", side_effect=alive):
+            nodes = hcsvc.probe_nodes(urls, None, lambda u: True, True, False, 10, 1)
+
+        self.assertEqual(state["peak"], len(urls))
+        self.assertEqual(sorted(nodes), sorted(urls))
+        self.assertTrue(all(n["ok"] for n in nodes.values()))
+        self.assertEqual(nodes[urls[0]]["latency_ms"], 1.5)
+
+    def test_failing_node_is_reported(self):
+        with patch.object(hcsvc, "build_session", return_value=Mock()), \
+                patch.object(hcsvc, "wait_for_node_alive", side_effect=self._alive), \
+                patch.object(hcsvc, "wait_for_cluster_connectivity") as conn:
+            nodes = hcsvc.probe_nodes(["http://ok:8080", "http://bad:8080"], None, lambda u: True, True, True, 10, 1)
+
+        self.assertTrue(nodes["http://ok:8080"]["ok"])
+        self.assertFalse(nodes["http://bad:8080"]["ok"])
+        # connectivity is skipped on a node that is not alive
+        self.assertEqual(conn.call_count, 1)
+
+
+class _FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRetryUntil(TestCase):
+
+    def test_adaptive_strategy_starts_fast_then_backs_off_to_interval(self):
+        strategy = RetryStrategy.adaptive(5)
+        strategy.rng = lambda: 0.5  # no jitter
+
+        delays = [strategy.delay(n) for n in range(1, 9)]
+
+        self.assertEqual(delays[:3], [0.5, 0.5, 0.5])
+        self.assertEqual(delays[3:], [1.0, 2.0, 4.0, 5.0, 5.0])
+
+    def test_jitter_stays_within_bounds(self):
+        low = RetryStrategy(10, jitter=0.2, rng=lambda: 0.0).delay(1)
+        high = RetryStrategy(10, jitter=0.2, rng=lambda: 1.0).delay(1)
+
+        self.assertAlmostEqual(low, 8.0)
+        self.assertAlmostEqual(high, 12.0)
+
+    def test_timeout_is_clipped_to_remaining_deadline(self):
+        clock = _FakeClock()
+        seen = []
+
+        def probe(timeout=None):
+            seen.append(timeout)
+            clock.now += 1
+            return False, "not yet"
+
+        result = retry_until(probe, 12, 4, timeout=20, timeout_kwarg="timeout",
+                             clock=clock, sleep=clock.sleep)
+
+        self.assertFalse(result["ok"])
+        self.assertEqual(result["error"], "not yet")
+        self.assertEqual(seen[0], 12.0)
+        self.assertEqual(seen[1], 7.0)
+        self.assertTrue(all(t >= 1.0 for t in seen))
+        # never sleeps past the deadline
+        self.assertLessEqual(clock.now, 12 + 1)
+
+    def test_history_records_each_attempt(self):
+        outcomes = iter([(False, "refused"), (False, "refused"), (True, {"status": 200})])
+        clock = _FakeClock()
+
+        result = retry_until(lambda: next(outcomes), 60, 1, clock=clock, sleep=clock.sleep)
+
+        self.assertTrue(result["ok"])
+        self.assertEqual(result["attempts"], 3)
+        self.assertEqual([h["ok"] for h in result["history"]], [False, False, True])
+        self.assertEqual(result["history"][0]["error"], "refused")
+        self.assertEqual(clock.sleeps, [1.0, 1.0])
+        self.assertEqual(result["elapsed"], 2.0)
+
+    def test_break_retry_stops_immediately(self):
+        def probe():
+            raise BreakRetry("fatal", detail={"code": 1})
+
+        result = retry_until(probe, 60, 1, sleep=Mock())
+
+        self.assertFalse(result["ok"])
+        self.assertEqual(result["attempts"], 1)
+        self.assertEqual(result["detail"], {"code": 1})
+
+
+class _FakeSocket(object):
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.released = threading.Event()
+        self.closed = False
+
+    def settimeout(self, timeout):
+        pass
+
+    def recv(self):
+        if self.messages:
+            return self.messages.pop(0)
+        self.released.wait(5)
+        raise Exception("closed")
+
+    def abort(self):
+        self.closed = True
+        self.released.set()
+
+
+class TestNotificationWatcher(TestCase):
+
+    def _watcher(self, messages, min_interval=0.2):
+        sock = _FakeSocket(messages)
+        fake_ws = SimpleNamespace(create_connection=Mock(return_value=sock))
+        with patch.object(notifications, "_websocket", return_value=fake_ws):
+            watcher = notifications.NotificationWatcher("https://node-a:443", min_interval=min_interval)
+            self.assertTrue(watcher.start())
+        self.assertEqual(fake_ws.create_connection.call_args[0][0],
+                         "wss://node-a:443" + notifications.WATCH_ENDPOINT)
+        return watcher, sock
+
+    def test_relevant_notification_wakes_sleep_early(self):
+        watcher, sock = self._watcher(['{"Type": "DatabaseChanged", "DatabaseName": "db1"}'])
+        try:
+            started = time.time()
+            watcher.sleep(5)
+            elapsed = time.time() - started
+            self.assertLess(elapsed, 1)
+            self.assertGreaterEqual(elapsed, 0.2)
+            self.assertEqual(watcher.events, 1)
+            self.assertEqual(watcher.wakeups, 1)
+            self.assertEqual(watcher.mode, notifications.WAIT_MODE_EVENTS)
+        finally:
+            watcher.close()
+        self.assertTrue(sock.closed)
+
+    def test_unrelated_notifications_do_not_wake(self):
+        watcher, _ = self._watcher(['{"Type": "AlertRaised"}', 'not json', '{"DatabaseName": "db1"}'])
+        try:
+            started = time.time()
+            watcher.sleep(0.3)
+            self.assertGreaterEqual(time.time() - started, 0.3)
+            self.assertEqual(watcher.events, 0)
+        finally:
+            watcher.close()
+
+    def test_burst_of_notifications_is_coalesced(self):
+        burst = ['{{"Type": "DatabaseChanged", "DatabaseName": "db{}"}}'.format(i) for i in range(50)]
+        watcher, _ = self._watcher(burst, min_interval=0.3)
+        try:
+            started = time.time()
+            watcher.sleep(5)
+            self.assertGreaterEqual(time.time() - started, 0.3)
+            # the whole burst was consumed by one wakeup; the next sleep runs to its end
+            started = time.time()
+            watcher.sleep(0.2)
+            self.assertGreaterEqual(time.time() - started, 0.2)
+            self.assertEqual(watcher.events, 50)
+            self.assertEqual(watcher.wakeups, 1)
+        finally:
+            watcher.close()
+
+    def test_reconnect_does_not_end_the_sleep(self):
+        sock = _FakeSocket([])
+        fake_ws = SimpleNamespace(create_connection=Mock(side_effect=[Exception("refused"), sock]))
+        with patch.object(notifications, "_websocket", return_value=fake_ws):
+            watcher = notifications.NotificationWatcher("http://node-a:8080", min_interval=0.1)
+            self.assertFalse(watcher.start())
+            try:
+                started = time.time()
+                watcher.sleep(0.3)
+                self.assertGreaterEqual(time.time() - started, 0.3)
+                self.assertTrue(watcher.connected)
+            finally:
+                watcher.close()
+
+    def test_falls_back_to_polling_without_websocket_client(self):
+        with patch.object(notifications, "_websocket", return_value=None), \
+                patch.object(notifications.time, "sleep") as sleep:
+            watcher = notifications.open_watcher("events", "http://node-a:8080")
+            watcher.sleep(2)
+
+        self.assertFalse(watcher.connected)
+        self.assertEqual(watcher.summary()["mode"], notifications.WAIT_MODE_POLL)
+        self.assertIn("websocket-client", watcher.error)
+        sleep.assert_called_once()
+
+    def test_poll_mode_has_no_watcher(self):
+        self.assertIsNone(notifications.open_watcher("poll", "http://node-a:8080"))
+
+
+def _session(routes):
+    """Mock session answering GET <url> from {path suffix: json}."""
+    def get(url, params=None, timeout=None):
+        for suffix, body in routes.items():
+            if url.endswith(suffix):
+                return Mock(status_code=200, json=Mock(return_value=body))
+        return Mock(status_code=404, text="")
+    return Mock(get=Mock(side_effect=get))
+
+
+class TestThresholdChecks(TestCase):
+
+    def setUp(self):
+        self.limits = dict(hcsvc.DEFAULT_THRESHOLDS)
+
+    def test_normalize_thresholds(self):
+        ok, merged, _ = hcsvc.normalize_thresholds({"max_cpu_percent": "70"})
+        self.assertTrue(ok)
+        self.assertEqual(merged["max_cpu_percent"], 70.0)
+        self.assertEqual(merged["max_latency_ms"], hcsvc.DEFAULT_THRESHOLDS["max_latency_ms"])
+
+        ok, _, err = hcsvc.normalize_thresholds({"max_cpu": 70})
+        self.assertFalse(ok)
+        self.assertIn("max_cpu", err)
+
+    def test_replication_lag_from_change_vectors(self):
+        vectors = {
+            "A": hcsvc.parse_change_vector("A:120-dbA, B:40-dbB"),
+            "B": hcsvc.parse_change_vector("A:100-dbA, B:40-dbB"),
+            "C": hcsvc.parse_change_vector("A:120-dbA"),
+        }
+        self.assertEqual(hcsvc.replication_lag(vectors), {"A": 0, "B": 20, "C": 40})
+
+    def test_replication_check_queries_every_member(self):
+        topology = {"Members": [{"NodeTag": "A"}, {"NodeTag": "B"}]}
+        routes = {
+            "a:8080/databases": {"Databases": [
+                {"Name": "orders", "NodesTopology": topology},
+                {"Name": "single", "NodesTopology": {"Members": [{"NodeTag": "A"}]}},
+            ]},
+            "a:8080/databases/orders/stats": {"DatabaseChangeVector": "A:10-x"},
+            "b:8080/databases/orders/stats": {"DatabaseChangeVector": "A:7-x"},
+        }
+        nodes = {"A": "http://a:8080", "B": "http://b:8080"}
+
+        self.limits["max_replication_lag"] = 2
+        ok, detail = hcsvc.check_replication_lag(_session(routes), "http://a:8080", self.limits, node_urls=nodes)
+        self.assertFalse(ok)
+        self.assertEqual(detail["lagging"], {"orders": {"A": 0, "B": 3}})
+
+        self.limits["max_replication_lag"] = 5
+        ok, _ = hcsvc.check_replication_lag(_session(routes), "http://a:8080", self.limits, node_urls=nodes)
+        self.assertTrue(ok)
+
+    def test_index_staleness_sums_all_databases(self):
+        session = _session({"/admin/monitoring/v1/databases": {"Results": [
+            {"DatabaseName": "a", "Indexes": {"StaleCount": 2}},
+            {"DatabaseName": "b", "Indexes": {"StaleCount": 0}},
+        ]}})
+
+        ok, detail = hcsvc.check_index_staleness(session, "http://a:8080", self.limits)
+
+        self.assertFalse(ok)
+        self.assertEqual(detail["stale_indexes"], 2)
+        self.assertEqual(detail["databases"], {"a": 2})
+
+    def test_resource_usage_and_disk_space(self):
+        session = _session({
+            "/admin/monitoring/v1/server": {
+                "Cpu": {"ProcessUsage": 35},
+                "Memory": {"PhysicalMemoryInMb": 1000, "AllocatedMemoryInMb": 950},
+                "Disk": {"TotalFreeSpaceInMb": 500},
+            },
+            "/admin/monitoring/v1/databases": {"Results": [
+                {"DatabaseName": "a", "Storage": {"TotalAllocatedStorageFileInMb": 400}},
+            ]},
+        })
+
+        ok, detail = hcsvc.check_resource_usage(session, "http://a:8080", self.limits)
+        self.assertFalse(ok)
+        self.assertEqual(detail["memory_percent"], 95.0)
+
+        ok, detail = hcsvc.check_disk_space(session, "http://a:8080", self.limits)
+        self.assertTrue(ok)
+        self.assertEqual(detail["free_ratio"], 1.25)
+
+    def test_default_thresholds_pass_a_healthy_node(self):
+        session = _session({
+            "/admin/monitoring/v1/server": {"Disk": {"TotalFreeSpaceInMb": 100}},
+            "/admin/monitoring/v1/databases": {"Results": [
+                {"DatabaseName": "a", "Storage": {"TotalAllocatedStorageFileInMb": 400}},
+            ]},
+        })
+
+        ok, detail = hcsvc.check_disk_space(session, "http://a:8080", dict(hcsvc.DEFAULT_THRESHOLDS))
+        self.assertTrue(ok)
+        self.assertEqual(detail["free_ratio"], 0.25)
+        self.assertEqual(hcsvc.DEFAULT_THRESHOLDS["max_replication_lag"], 1000)
+        self.assertEqual(hcsvc.DEFAULT_THRESHOLDS["min_free_disk_ratio"], 0.2)
+
+    def test_replication_lag_without_node_urls_does_not_pass(self):
+        routes = {
+            "a:8080/databases": {"Databases": [
+                {"Name": "orders", "NodesTopology": {"Members": [{"NodeTag": "A"}, {"NodeTag": "B"}]}},
+            ]},
+        }
+
+        ok, detail = hcsvc.check_replication_lag(_session(routes), "http://a:8080", self.limits, node_urls={})
+
+        self.assertFalse(ok)
+        self.assertEqual(detail["databases"], 0)
+        self.assertEqual(sorted(detail["errors"]["orders"]), ["A", "B"])
+
+    def test_missing_monitoring_endpoint_stops_retrying(self):
+        result = hcsvc.wait_for_threshold("resource_usage", _session({}), "http://a:8080", self.limits, 60, 1,
+                                          sleep=Mock())
+
+        self.assertFalse(result["ok"])
+        self.assertEqual(result["attempts"], 1)
+        self.assertIn("not available", result["error"])
+
+
+class TestRetryTelemetry(TestCase):
+
+    def test_latency_stats(self):
+        stats = retry_service.latency_stats([float(v) for v in range(1, 21)])
+        self.assertEqual(stats, {"min": 1.0, "avg": 10.5, "p95": 19.0, "max": 20.0})
+        self.assertIsNone(retry_service.latency_stats([])["p95"])
+
+    def test_telemetry_reports_time_to_ready_and_sleep(self):
+        outcomes = iter([(False, "loading"), (True, {"status": 200})])
+        clock = _FakeClock()
+
+        result = retry_until(lambda: next(outcomes), 60, 3, clock=clock, sleep=clock.sleep)
+
+        telemetry = result["telemetry"]
+        self.assertEqual(telemetry["time_to_ready"], 3.0)
+        self.assertEqual(telemetry["slept"], 3.0)
+        self.assertEqual(sorted(telemetry["latency_ms"]), ["avg", "max", "min", "p95"])
+
+    def test_database_wait_reports_databases_per_poll(self):
+        ctx, _ = _ctx([_db("a"), _db("b"), _db("c", last_status="Error", last_error="loading")],
+                      [_db("a"), _db("b"), _db("c")])
+
+        result = hcsvc.wait_for_node_databases_online(ctx, 60, 0, None, sleep=Mock())
+
+        self.assertTrue(result["ok"])
+        self.assertEqual([h["databases"] for h in result["history"]], [3, 3])
+        self.assertEqual(result["telemetry"]["databases_per_poll"], 3)
+
+    def test_trace_writes_json_lines(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "trace.jsonl")
+            trace = retry_service.AttemptTrace(path)
+            outcomes = iter([(False, "refused"), (True, {})])
+
+            result = retry_until(lambda: next(outcomes), 60, 0, sleep=Mock(),
+                                 on_attempt=trace.for_check("node_alive", node="http://a:8080"))
+            trace.done("node_alive", result, node="http://a:8080")
+
+            with open(path) as f:
+                lines = [json.loads(line) for line in f]
+        self.assertIsNone(trace.error)
+        self.assertEqual([line.get("attempt") for line in lines], [1, 2, None])
+        self.assertEqual(lines[0]["error"], "refused")
+        self.assertTrue(all(line["node"] == "http://a:8080" for line in lines))
+        self.assertTrue(lines[-1]["done"])
+        self.assertIn("time_to_ready", lines[-1])
+
+    def test_unwritable_trace_does_not_abort_the_wait(self):
+        with tempfile.TemporaryDirectory() as folder:
+            trace = retry_service.AttemptTrace(folder)
+            outcomes = iter([(False, "refused"), (True, {})])
+
+            result = retry_until(lambda: next(outcomes), 60, 0, sleep=Mock(),
+                                 on_attempt=trace.for_check("node_alive", node="http://a:8080"))
+            trace.done("node_alive", result, node="http://a:8080")
+
+        self.assertTrue(result["ok"])
+        self.assertEqual(result["attempts"], 2)
+        self.assertIsNotNone(trace.error)
@@ -4,8 +4,10 @@
 
 import os
 import sys
+from types import SimpleNamespace
 from ravendb_test_driver import RavenTestDriver
 from unittest import TestCase
+from unittest.mock import Mock, patch
 
 from ansible_collections.ravendb.ravendb.plugins.module_utils.core.validation import (
     is_valid_url,
@@ -19,12 +21,16 @@ from ansible_collections.ravendb.ravendb.plugins.module_utils.core.validation im
 )
 from ansible_collections.ravendb.ravendb.plugins.module_utils.reconcilers.index_reconciler import (
     IndexReconciler,
+    IndexRollout,
 )
+from ansible_collections.ravendb.ravendb.plugins.module_utils.core.result import ModuleResult
 from ansible_collections.ravendb.ravendb.plugins.module_utils.dto.index import (
     IndexSpec,
     IndexDefinitionSpec,
 )
 from ansible_collections.ravendb.ravendb.plugins.module_utils.core.client import StoreContext
+from ansible_collections.ravendb.ravendb.plugins.module_utils.services import index_service as idxsvc
+from ansible_collections.ravendb.ravendb.plugins.module_utils.services import index_config_service as cfgsvc
 from ravendb.documents.operations.indexes import GetIndexesOperation
 
 
@@ -210,6 +216,157 @@ class TestReconcileState(TestCase):
         self.assertIn("Index 'test/index' is already absent.", r.msg)
 
 
+class TestIndexSnapshot(TestCase):
+
+    def _ctx(self, *names):
+        maintenance = Mock()
+        maintenance.send.return_value = [
+            SimpleNamespace(name=n, maps={"from d in docs select new { d.Name }"}, reduce=None, configuration={"Indexing.MapBatchSize": "64"})
+            for n in names
+        ]
+        return SimpleNamespace(maintenance_for_db=Mock(return_value=maintenance)), maintenance
+
+    def test_lookups_share_one_fetch(self):
+        ctx, maintenance = self._ctx("a", "b", "c")
+
+        self.assertTrue(idxsvc.index_exists(ctx, "db", "b"))
+        self.assertIsNotNone(idxsvc.get_definition(ctx, "db", "c"))
+        self.assertIsNone(idxsvc.get_definition(ctx, "db", "missing"))
+        self.assertEqual(len(idxsvc.list_definitions(ctx, "db")), 3)
+        self.assertEqual(cfgsvc.get_current(ctx, "db", "a"), {"Indexing.MapBatchSize": "64"})
+
+        self.assertEqual(maintenance.send.call_count, 1)
+
+    def test_snapshots_are_per_database(self):
+        ctx, maintenance = self._ctx("a")
+
+        idxsvc.get_definition(ctx, "db1", "a")
+        idxsvc.get_definition(ctx, "db2", "a")
+        idxsvc.get_definition(ctx, "db1", "a")
+
+        self.assertEqual(maintenance.send.call_count, 2)
+
+    def test_delete_invalidates_snapshot(self):
+        ctx, maintenance = self._ctx("a")
+
+        idxsvc.get_definition(ctx, "db", "a")
+        idxsvc.delete_index(ctx, "db", "a")
+        idxsvc.get_definition(ctx, "db", "a")
+
+        # initial fetch + delete + refetch
+        self.assertEqual(maintenance.send.call_count, 3)
+
+
+class TestIndexFingerprint(TestCase):
+
+    def _existing(self, maps, **kwargs):
+        values = dict(name="a", maps=set(maps), reduce=None, configuration={}, deployment_mode=None)
+        values.update(kwargs)
+        return SimpleNamespace(**values)
+
+    def test_formatting_and_comments_are_not_changes(self):
+        existing = self._existing(["from c in docs.Users select new { Name = c.name }"])
+        declared = {"map": ["from c in docs.Users  // users only\n    select new {\n  Name = c.name /* key */ }"]}
+
+        self.assertEqual(idxsvc.index_changes(existing, declared), [])
+        self.assertTrue(idxsvc.index_matches(existing, declared))
+
+    def test_string_literals_are_kept_verbatim(self):
+        self.assertEqual(
+            idxsvc.canonical_source('select new { X = "a  // b" }'),
+            'select new{X="a  // b"}',
+        )
+        self.assertNotEqual(
+            idxsvc.canonical_source('where c.Name == "a b"'),
+            idxsvc.canonical_source('where c.Name == "ab"'),
+        )
+
+    def test_differing_fields_are_reported(self):
+        existing = self._existing(["from c in docs.Users select new { c.Name }"], configuration={"Indexing.MapBatchSize": "64"})
+        declared = {"map": ["from c in docs.Users select new { c.Email }"], "reduce": "from r in results select r"}
+
+        changes = idxsvc.index_changes(existing, declared, {"Indexing.MapBatchSize": "128"})
+
+        self.assertEqual(changes, ["configuration", "maps", "reduce"])
+
+    def test_fingerprint_covers_full_definition(self):
+        a = self._existing(["from c in docs.Users select new { c.Name }"])
+        b = self._existing(["from c in docs.Users select new { c.Name }"], additional_sources={"Helpers": "class X {}"})
+
+        fa = idxsvc.fingerprint(idxsvc.canonical_definition(a))
+        fb = idxsvc.fingerprint(idxsvc.canonical_definition(b))
+
+        self.assertNotEqual(fa, fb)
+        self.assertEqual(fa, idxsvc.fingerprint(idxsvc.canonical_definition(a)))
+
+
+class TestIndexSet(TestCase):
+
+    MAP = "from d in docs select new { d.Name }"
+
+    def _ctx(self, *names):
+        maintenance = Mock()
+        maintenance.send.return_value = [
+            SimpleNamespace(name=n, maps={self.MAP}, reduce=None, configuration={}, deployment_mode=None)
+            for n in names
+        ]
+        return SimpleNamespace(cache={}, maintenance_for_db=Mock(return_value=maintenance)), maintenance
+
+    def _spec(self, name, maps=None, configuration=None):
+        definition = IndexDefinitionSpec(maps=maps or [self.MAP])
+        return IndexSpec(db_name="db", name=name, definition=definition, configuration=configuration)
+
+    def test_changes_are_sent_in_one_put(self):
+        ctx, maintenance = self._ctx("same", "changed")
+        specs = [
+            self._spec("same"),
+            self._spec("changed", configuration={"Indexing.MapBatchSize": "128"}),
+            self._spec("new1"),
+            self._spec("new2"),
+        ]
+
+        res = IndexReconciler(ctx, "db").ensure_set(specs, prune=False, check_mode=False)
+
+        self.assertTrue(res.changed)
+        self.assertEqual(res.extras["created"], ["new1", "new2"])
+        self.assertEqual(res.extras["updated"], ["changed"])
+        self.assertEqual(res.extras["unchanged"], ["same"])
+        # snapshot fetch + one batched PUT
+        self.assertEqual(maintenance.send.call_count, 2)
+
+    def test_prune_skips_server_managed_indexes(self):
+        ctx, maintenance = self._ctx("keep", "stale", "Auto/Users/ByName", "ReplacementOf/keep")
+
+        res = IndexReconciler(ctx, "db").ensure_set([self._spec("keep")], prune=True, check_mode=True)
+
+        self.assertTrue(res.changed)
+        self.assertEqual(res.extras["deleted"], ["stale"])
+        self.assertEqual(maintenance.send.call_count, 1)
+
+    def test_definition_and_configuration_change_is_one_put(self):
+        ctx, maintenance = self._ctx("a")
+        spec = self._spec("a", maps=["from d in docs select new { d.Email }"],
+                          configuration={"Indexing.MapBatchSize": "128"})
+
+        res = IndexReconciler(ctx, "db").ensure_present(spec, check_mode=False)
+
+        self.assertTrue(res.changed)
+        self.assertEqual(res.extras["changed_fields"], ["configuration", "maps"])
+        # snapshot fetch + one PUT carrying both maps and configuration
+        self.assertEqual(maintenance.send.call_count, 2)
+        definition = maintenance.send.call_args[0][0]._indexes_to_add[0]
+        self.assertEqual(definition.maps, {"from d in docs select new { d.Email }"})
+        self.assertEqual(definition.configuration, {"Indexing.MapBatchSize": "128"})
+
+    def test_no_changes(self):
+        ctx, maintenance = self._ctx("a")
+
+        res = IndexReconciler(ctx, "db").ensure_set([self._spec("a")], prune=True, check_mode=False)
+
+        self.assertFalse(res.changed)
+        self.assertEqual(maintenance.send.call_count, 1)
+
+
 class TestValidationFunctions(TestCase):
     def test_valid_url(self):
         self.assertTrue(is_valid_url("https://example.com"))
@@ -268,3 +425,177 @@ class TestValidationFunctions(TestCase):
         self.assertTrue(is_valid_bool(False))
         self.assertFalse(is_valid_bool(1))
         self.assertFalse(is_valid_bool("true"))
+
+
+class TestWaitForNonStale(TestCase):
+
+    def _ctx(self, *polls):
+        responses = [Mock(json=Mock(return_value={"Results": results})) for results in polls]
+        http = Mock()
+        http.get.side_effect = responses
+        return SimpleNamespace(base_url=Mock(return_value="http://localhost:8080"), http=Mock(return_value=http)), http
+
+    def _entry(self, name, to_process, total, rate, status="Running"):
+        return {
+            "Name": name, "IsStale": True, "IndexRunningStatus": status, "ProcessedPerSecond": rate,
+            "Collections": {"Users": {"NumberOfItemsToProcess": to_process, "TotalNumberOfItems": total}},
+        }
+
+    def test_waits_for_side_by_side_replacement(self):
+        ctx, http = self._ctx(
+            [self._entry("ReplacementOf/a", 300, 1000, 100.0)],
+            [self._entry("ReplacementOf/a", 100, 1000, 100.0)],
+            [],
+        )
+
+        with patch("time.sleep"):
+            res = idxsvc.wait_for_non_stale(ctx, "db", "a", max_wait=60, poll_interval=1)
+
+        self.assertTrue(res["ok"])
+        self.assertEqual(res["attempts"], 3)
+        self.assertEqual(http.get.call_count, 3)
+
+    def test_timeout_reports_progress(self):
+        ctx, _ = self._ctx(*([[self._entry("a", 250, 1000, 50.0)]] * 3))
+
+        with patch("time.sleep"):
+            res = idxsvc.wait_for_non_stale(ctx, "db", "a", max_wait=0, poll_interval=1)
+
+        self.assertFalse(res["ok"])
+        self.assertEqual(res["error"], "timeout")
+        progress = res["detail"]
+        self.assertEqual((progress["processed"], progress["total"]), (750, 1000))
+        self.assertEqual(progress["eta_seconds"], 5.0)
+        self.assertFalse(progress["replacement"])
+
+    def test_paused_index_breaks_wait(self):
+        ctx, http = self._ctx([self._entry("a", 10, 10, 0, status="Paused")])
+
+        res = idxsvc.wait_for_non_stale(ctx, "db", "a", max_wait=60, poll_interval=1)
+
+        self.assertFalse(res["ok"])
+        self.assertIn("paused", res["error"])
+        self.assertEqual(http.get.call_count, 1)
+
+
+class TestIndexRollout(TestCase):
+
+    def setUp(self):
+        self.now = [0.0]
+        self.in_flight = set()
+        self.max_in_flight = 0
+        # each database stays stale for two polls after its deployment
+        self.polls_left = {}
+
+    def _clock(self):
+        return self.now[0]
+
+    def _sleep(self, seconds):
+        self.now[0] += seconds
+
+    def _ensure_set(self, reconciler, specs, prune, check_mode):
+        if reconciler.db_name == "bad":
+            return ModuleResult.error("boom")
+        self.in_flight.add(reconciler.db_name)
+        self.max_in_flight = max(self.max_in_flight, len(self.in_flight))
+        self.polls_left[reconciler.db_name] = 2
+        return ModuleResult.ok(msg="ok", changed=True, created=[], updated=["a"], deleted=[])
+
+    def _stale_progress(self, ctx, db_name, names):
+        self.polls_left[db_name] -= 1
+        if self.polls_left[db_name] > 0:
+            return [{"name": "a", "status": "Running"}]
+        self.in_flight.discard(db_name)
+        return []
+
+    def _run(self, dbs, concurrency, max_wait=600):
+        rollout = IndexRollout(Mock(), dbs, concurrency, max_wait=max_wait, poll_interval=5,
+                               clock=self._clock, sleep=self._sleep)
+        with patch.object(IndexReconciler, "ensure_set", autospec=True, side_effect=self._ensure_set), \
+                patch.object(idxsvc, "stale_progress", side_effect=self._stale_progress):
+            return rollout.run([], prune=False, check_mode=False)
+
+    def test_concurrency_budget_is_respected(self):
+        res = self._run(["t1", "t2", "t3", "t4", "t5"], concurrency=2)
+
+        self.assertFalse(res.failed)
+        self.assertTrue(res.changed)
+        self.assertEqual(self.max_in_flight, 2)
+        self.assertEqual([o["status"] for o in res.extras["rollout"]], ["done"] * 5)
+        self.assertEqual(res.extras["rollout"][0]["wait_seconds"], 10.0)
+
+    def test_failure_halts_rollout(self):
+        res = self._run(["t1", "bad", "t3"], concurrency=1)
+
+        self.assertTrue(res.failed)
+        self.assertEqual([o["status"] for o in res.extras["rollout"]], ["done", "failed", "skipped"])
+
+
+class TestBulkIndexMode(TestCase):
+
+    def _ctx(self, **statuses):
+        from ravendb.documents.indexes.definitions import IndexRunningStatus
+        maintenance = Mock()
+        maintenance.send.return_value = SimpleNamespace(
+            status=IndexRunningStatus.RUNNING,
+            indexes=[SimpleNamespace(name=n.replace("_", "/"), status=IndexRunningStatus(s)) for n, s in statuses.items()],
+        )
+        return SimpleNamespace(cache={}, maintenance_for_db=Mock(return_value=maintenance)), maintenance
+
+    def test_all_uses_one_database_wide_operation(self):
+        from ravendb.documents.operations.indexes import StopIndexingOperation
+        ctx, maintenance = self._ctx(Orders_A="Running", Orders_B="Paused", Users_A="Running")
+
+        res = IndexReconciler(ctx, "db").ensure_mode_bulk(["all"], "paused", False, check_mode=False)
+
+        self.assertTrue(res.changed)
+        self.assertTrue(res.extras["database_wide"])
+        self.assertEqual(res.extras["changed_indexes"], ["Orders/A", "Users/A"])
+        # one status read + one StopIndexingOperation
+        self.assertEqual(maintenance.send.call_count, 2)
+        self.assertIsInstance(maintenance.send.call_args[0][0], StopIndexingOperation)
+
+    def test_glob_acts_only_on_differing_indexes(self):
+        from ravendb.documents.operations.indexes import StartIndexOperation
+        ctx, maintenance = self._ctx(Orders_A="Running", Orders_B="Paused", Users_A="Paused")
+
+        res = IndexReconciler(ctx, "db").ensure_mode_bulk(["Orders/*"], "resumed", False, check_mode=False)
+
+        self.assertFalse(res.extras["database_wide"])
+        self.assertEqual(res.extras["changed_indexes"], ["Orders/B"])
+        self.assertEqual(res.extras["unchanged_indexes"], ["Orders/A"])
+        self.assertEqual(maintenance.send.call_count, 2)
+        self.assertIsInstance(maintenance.send.call_args[0][0], StartIndexOperation)
+
+    def test_already_in_mode_and_missing_names(self):
+        ctx, maintenance = self._ctx(Orders_A="Disabled")
+
+        res = IndexReconciler(ctx, "db").ensure_mode_bulk(["Orders/A"], "disabled", True, check_mode=False)
+        self.assertFalse(res.changed)
+        self.assertEqual(maintenance.send.call_count, 1)
+
+        res = IndexReconciler(ctx, "db").ensure_mode_bulk(["Orders/A", "Nope"], "disabled", True, check_mode=False)
+        self.assertTrue(res.failed)
+        self.assertIn("Nope", res.msg)
+
+
+class TestIndexInfo(TestCase):
+
+    def test_stats_come_from_one_bulk_call(self):
+        maintenance = Mock()
+        maintenance.send.return_value = [
+            {"Name": "Orders/ByCompany", "EntriesCount": 830, "MapAttempts": 830, "MapErrors": 0, "IsStale": False,
+             "Memory": {"DiskSize": {"SizeInBytes": 3145728, "HumaneSize": "3 MBytes"},
+                        "ThreadAllocations": {"SizeInBytes": 1024}}},
+            {"Name": "Users/ByName", "EntriesCount": 10, "IsStale": True, "ReduceAttempts": 4, "ReduceErrors": 1},
+        ]
+        ctx = SimpleNamespace(maintenance_for_db=Mock(return_value=maintenance))
+
+        stats = idxsvc.list_index_stats(ctx, "db")
+
+        self.assertEqual(maintenance.send.call_count, 1)
+        self.assertEqual(stats[0]["disk_size_bytes"], 3145728)
+        self.assertEqual(stats[0]["memory_allocated_bytes"], 1024)
+        self.assertFalse(stats[0]["is_stale"])
+        self.assertEqual((stats[1]["reduce_attempts"], stats[1]["reduce_errors"]), (4, 1))
+        self.assertIsNone(stats[1]["disk_size_bytes"])